@@ -12,41 +12,60 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 from . import auto_load
+
+auto_load.init()
+
 from . import node_trees
 from . import exporter
-from . import animation_clips
 from . import serializers
-from deepdiff import DeepDiff
+from . import lod
+from . import live_link
+from . import profiling
+from . import artifact_cache
+from . import asset_requests
+from . import live_stats
+from .update_scheduler import scheduler
+from .profiling import timed
 import bpy
 from bpy.app.handlers import persistent
-from websocket_server import WebsocketServer
 import json
 import os
-
-auto_load.init()
+import queue
+import tempfile
+import time
+from functools import partial
 
 last_serialized_trees = {}
 active_scene = None
-pending_updates = {}  # key -> {'cancelled': bool}
 
-DEBOUNCE_MS = 300  # ms to wait before sending after last update for a given id
+SUBSCRIBE_GRACE_MS = 250  # new clients get this long to subscribe before they are sent every tree
+REALTIME_BINARY_MAX_BYTES = 16 * 1024 * 1024  # larger realtime GLBs are written next to the .blend and fetched over http
+PREWARM_BUDGET_MS = 8  # serialization time per timer tick while prewarming a switched-to scene
+PREWARM_INTERVAL_MS = 20  # pause between prewarm ticks, leaves the UI room to redraw
+INCOMING_INTERVAL_MS = 20  # how often the main thread handles what websocket clients sent
+INCOMING_BUDGET_MS = 8  # time spent on queued client events per tick, the rest waits for the next one
 
 pending_realtime_objects = set()
-realtime_export_scheduled = False
+
+pending_action_updates = set()
+
+prewarm_queue = []  # (kind, name, target) trees of the scene being prewarmed, see start_prewarm
+
+# (event, client, message) from the websocket server thread, handled on the main thread by handle_incoming
+incoming = queue.Queue()
+prewarm_scene = None
+prewarm_started = 0.0
 
 
 def schedule_realtime_export(object_name):
-    global pending_realtime_objects, realtime_export_scheduled
     pending_realtime_objects.add(object_name)
+    asset_requests.touch_realtime(object_name)
 
-    if not realtime_export_scheduled:
-        realtime_export_scheduled = True
-        bpy.app.timers.register(do_realtime_export, first_interval=DEBOUNCE_MS / 1000.0)
+    scheduler.schedule('realtimeGeometry', 'realtime', do_realtime_export)
 
 
 def do_realtime_export():
-    global pending_realtime_objects, realtime_export_scheduled
-    realtime_export_scheduled = False
+    global pending_realtime_objects
 
     if not pending_realtime_objects:
         return None
@@ -54,50 +73,148 @@ def do_realtime_export():
     batch = list(pending_realtime_objects)
     pending_realtime_objects = set()
 
+    send_realtime_geometry(batch)
+    return None
+
+
+def send_realtime_geometry(batch, client=None, **header):
+    """
+    Export the objects to a GLB and send it as a realtimeGeometry message, to the interested clients or only to client
+    (an answered request, header carries its version and id). Nothing is exported when no client wants it.
+    """
     blend_path = bpy.data.filepath
-    if not blend_path:
-        return None
+    if not blend_path or not server:
+        return False
 
     blend_name = os.path.splitext(os.path.basename(blend_path))[0]
-    realtime_path = f'//{blend_name}.realtime.glb'
+    name = f'{blend_name}.realtime.glb'
+    names = [name] + batch
+    if client is None and not live_link.any_interested(server, 'realtimeGeometry', names, bpy.context.scene.name):
+        live_stats.count('realtime exports skipped (no subscriber)')
+        return False
+
+    # undoing an edit or sending the same objects to another client reuses the earlier export
+    cache = artifact_cache.blend_cache()
+    cache_key = exporter.realtime_cache_key(batch) if cache else None
+    glb_bytes = cache.get('realtimeGeometry', cache_key) if cache else None
+
+    if glb_bytes is not None:
+        live_stats.count('realtime exports cached')
+    else:
+        # export outside the project directory so dev servers / file watchers don't pick up every edit
+        temp_path = os.path.join(tempfile.gettempdir(), f'sprixle-{name}')
+        started = time.perf_counter()
+        if not exporter.realtime_export(batch, temp_path):
+            return False
+
+        with open(temp_path, 'rb') as file:
+            glb_bytes = file.read()
+        os.remove(temp_path)
+        live_stats.record_timing('realtime export', (time.perf_counter() - started) * 1000)
+        live_stats.count('realtime export bytes', len(glb_bytes))
+        if cache:
+            cache.put('realtimeGeometry', cache_key, glb_bytes)
+
+    header = dict({"type": "realtimeGeometry", "name": name, "objects": batch}, **header)
+
+    if len(glb_bytes) <= REALTIME_BINARY_MAX_BYTES:
+        if client is None:
+            live_link.send_binary_to_subscribers(server, header, glb_bytes, bpy.context.scene.name, names)
+        else:
+            live_link.send_binary_to_all(server, header, glb_bytes, [client])
+        return True
 
-    successful = exporter.realtime_export(batch, realtime_path)
+    live_stats.log('warning', 'GLB exceeds binary size cap, writing', name, len(glb_bytes), scope='Realtime')
+    with open(bpy.path.abspath(f'//{name}'), 'wb') as file:
+        file.write(glb_bytes)
 
-    if successful:
-        global server
-        if server:
-            server.send_message_to_all(json.dumps({
-                "type": "realtimeGeometry",
-                "name": f"{blend_name}.realtime.glb"
-            }))
+    if client is None:
+        send_update(header, names=names)
+    else:
+        live_link.send_text(server, client, json.dumps(header))
+
+    return True
+
+
+def schedule_action_update(action_name):
+    pending_action_updates.add(action_name)
+
+    scheduler.schedule('action', 'actions', do_action_updates)
+
+
+def do_action_updates():
+    """Push edited actions, diffed against their last serialization so only changed fcurves are sent"""
+    global pending_action_updates, server
+
+    batch = list(pending_action_updates)
+    pending_action_updates = set()
+
+    for action_name in batch:
+        action = bpy.data.actions.get(action_name)
+        if action is None or not server: continue
+        if not live_link.any_interested(server, 'action', [action_name], bpy.context.scene.name):
+            live_stats.count('action updates skipped (no subscriber)')
+            continue
+
+        from . import animation_clips
+        update = animation_clips.live_action_update(action)
+        if update is None:
+            live_stats.count('action updates unchanged')
+            continue
+
+        (message_type, data) = update
+        live_stats.log('info', 'sending', message_type, action_name)
+        send_update({
+            "name": action_name,
+            "type": message_type,
+            "data": data
+        })
 
     return None
 
 
-def debounced_send(key, message_data):
-    """Schedule a throttled send. Cancels any pending send for the same key."""
-    global pending_updates, server
+def send_update(message, names=None, clients=None):
+    """Send a live link message to the clients (all or the given ones) subscribed to it, see live_link.subscribe"""
+    if not server:
+        return 0
 
-    # Cancel previous pending send for this key
-    if key in pending_updates:
-        pending_updates[key]['data'] = message_data
-        return
-        # debounce approach over throttle
-        # pending_updates[key]['cancelled'] = True
+    return live_link.send_to_subscribers(server, message, bpy.context.scene.name, names, clients)
+
+
+def wants_update(message_type, name):
+    """
+    Whether an edited tree should be serialized: false when clients are connected but none would receive it.
+    Without clients trees are still serialized on change, keeping the json files next to the .blend current.
+    """
+    if not server or not server.clients:
+        return True
+    if live_link.any_interested(server, message_type, [name.replace('.', '')], bpy.context.scene.name):
+        return True
 
-    pending_info = {'cancelled': False, 'data': message_data}
-    pending_updates[key] = pending_info
+    live_stats.count('tree updates skipped (no subscriber)')
+    return False
 
-    def delayed_send():
-        if not pending_info['cancelled'] and server:
-            server.send_message_to_all(json.dumps(pending_info['data'], indent=0))
-        # Only clean up if we're still the active entry — a cancelled timer
-        # must not remove the newer pending_info that replaced us.
-        if pending_updates.get(key) is pending_info:
-            pending_updates.pop(key, None)
-        return None  # Don't repeat
 
-    bpy.app.timers.register(delayed_send, first_interval=DEBOUNCE_MS / 1000.0)
+def schedule_tree_update(kind, key, resolve_target):
+    """
+    Serialize and send an edited tree once the scheduler runs it (see update_scheduler), the target is looked up
+    again then since it may have been renamed or removed meanwhile.
+    """
+    def update():
+        target = resolve_target()
+        if target is None:
+            return
+
+        (data, name) = node_trees.serialize(target)
+        if data and server:
+            live_stats.log('info', 'sending', kind, name)
+            send_update({
+                "name": name.replace('.', ''),
+                "type": kind,
+                "data": data
+            })
+
+    scheduler.schedule(kind, key, update)
 
 @persistent
 def checkScene():
@@ -105,24 +222,83 @@ def checkScene():
     global active_scene
     if not bpy.context.scene == active_scene:
         active_scene = bpy.context.scene
-        print('sceneChanged', active_scene)
-        # TODO export scene if necessary
+        live_stats.log('info', 'scene changed', active_scene.name)
 
         if server:
-            server.send_message_to_all(json.dumps({
+            send_update({
                 "name": active_scene.name,
                 "type": "sceneChange"
-            }, indent=0))
+            })
         else:
-            print('no server to send sceneChange to')
+            live_stats.log('debug', 'no server to send sceneChange to')
+
+        start_prewarm(active_scene)
 
     # print('checked scene')
     return 0.5
 
+
+def start_prewarm(scene):
+    """
+    Serialize the scene's materials, world, compositor and logic trees in PREWARM_BUDGET_MS slices across timer ticks,
+    pushing each tree to the interested clients when it is ready and `sceneReady` once all are.
+    Replaces the prewarm of a previous scene. A single tree is never split, a large one can overrun the budget.
+    """
+    global prewarm_queue, prewarm_scene, prewarm_started
+
+    # shader trees first, like the initial state
+    prewarm_queue = sorted(asset_requests.tree_targets(scene), key=lambda target: target[0] != 'shaderTree')
+    prewarm_scene = scene.name
+    prewarm_started = time.perf_counter()
+
+    # an empty queue doesn't mean the timer stopped (nor the other way around), ask the timers
+    if not bpy.app.timers.is_registered(prewarm_step):
+        bpy.app.timers.register(prewarm_step, first_interval=0.0)
+
+
+def prewarm_step():
+    global prewarm_queue
+    if prewarm_scene != bpy.context.scene.name:
+        prewarm_queue = []
+        return None
+
+    start = time.perf_counter()
+    while prewarm_queue and (time.perf_counter() - start) * 1000 < PREWARM_BUDGET_MS:
+        (kind, name, target) = prewarm_queue.pop(0)
+        try:
+            (data, name) = node_trees.serialize(target)
+        except ReferenceError:
+            # removed since the scene switch
+            continue
+        if not data: continue
+
+        send_update({
+            "name": name if kind == 'shaderTree' else name.replace('.', ''),
+            "type": kind,
+            "data": data
+        })
+
+    if prewarm_queue:
+        return PREWARM_INTERVAL_MS / 1000.0
+
+    prewarm_ms = (time.perf_counter() - prewarm_started) * 1000
+    live_stats.record_timing('prewarm', prewarm_ms)
+    live_stats.log('info', f'{prewarm_scene} ready in {prewarm_ms:.0f}ms', scope='Prewarm')
+    send_update({
+        "name": prewarm_scene,
+        "type": "sceneReady"
+    })
+    return None
+
 @persistent
 def handleFileLoaded(temp):
+    node_trees.clear_tree_keys()
     checkScene()
 
+@persistent
+def handleUndoRedo(scene):
+    node_trees.clear_tree_keys()
+
 @persistent
 def handleDepsGraphUpdate(scene, graph):
     global server
@@ -130,53 +306,32 @@ def handleDepsGraphUpdate(scene, graph):
 
     graphs_serialized = []
     for update in graph.updates:
-        print(update, update.id)
+        if live_stats.enabled('debug'):
+            live_stats.log('debug', 'depsgraph update', update.id)
+        node_trees.invalidate_tree_keys(update.id)
         if isinstance(update.id, bpy.types.World):
-            world = bpy.data.worlds[update.id.name]
-            (data, name) = node_trees.serialize(world)
-
-            if data and server:
-                print('sending world shader', update.id.name)
-                # graphs_serialized.append(material)
-                debounced_send(('world', update.id.name), {
-                    "name": name.replace('.',''),
-                    "type": 'shaderTree',
-                    "data": data
-                })
+            if not wants_update('shaderTree', update.id.name): continue
+            schedule_tree_update('shaderTree', ('world', update.id.name), partial(bpy.data.worlds.get, update.id.name))
 
         if isinstance(update.id, bpy.types.CompositorNodeTree):
-            # scene = bpy.data.scenes[update.id.name]
-            (data, name) = node_trees.serialize(bpy.context.scene)
-
-            print('serialized scene compositor tree on change', update.id.name)
-
-            if data and server:
-                print('sending compositor shader', name)
-                debounced_send(('compositor', update.id.name), {
-                    "name": name.replace('.',''),
-                    "type": 'shaderTree',
-                    "data": data
-                })
+            if not wants_update('shaderTree', update.id.name): continue
+            schedule_tree_update('shaderTree', ('compositor', update.id.name), lambda: bpy.context.scene)
         
         elif isinstance(update.id, bpy.types.Scene):
-            serializers.view_layer(bpy.context.view_layer)
+            # other scenes don't change the active view layer
+            if update.id.original != bpy.context.scene: continue
+            if not serializers.view_layer(bpy.context.view_layer):
+                live_stats.count('view layer writes unchanged')
+
+        elif isinstance(update.id, bpy.types.Action):
+            schedule_action_update(update.id.name)
 
         elif isinstance(update.id, bpy.types.Material):
-            material = bpy.data.materials[update.id.name]
-            (data, name) = node_trees.serialize(material)
-
-            if data and server:
-                print('sending shaderTree', update.id.name)
-                graphs_serialized.append(material)
-                debounced_send(('material', update.id.name), {
-                    "name": name.replace('.',''),
-                    "type": 'shaderTree',
-                    "data": data
-                })
+            if not wants_update('shaderTree', update.id.name): continue
+            schedule_tree_update('shaderTree', ('material', update.id.name), partial(bpy.data.materials.get, update.id.name))
 
             # TODO define and send update types?
             # if update.id.name in last_serialized_trees:
-                # print(DeepDiff(last_serialized_trees[update.id.name], data))
 
             # last_serialized_trees[update.id.name] = data
     for object in graph.objects:
@@ -192,21 +347,14 @@ def handleDepsGraphUpdate(scene, graph):
         
         if not modifier.node_group.name in (update.id.name for update in graph.updates): continue
         if modifier in graphs_serialized: continue
+        if not wants_update('logicTree', modifier.node_group.name): continue
 
-        print('logic tree update for')
-        print(object)
-        
-        (data, name) = node_trees.serialize(object)
+        live_stats.log('debug', 'logic tree update for', object.name)
 
-        if data and server:
-            graphs_serialized.append(modifier)
-            debounced_send(('logic', object.name), {
-                "name": name.replace('.', ''),
-                "type": 'logicTree',
-                "data": data
-            })
+        graphs_serialized.append(modifier)
+        schedule_tree_update('logicTree', ('logic', object.name), partial(bpy.data.objects.get, object.name))
 
-def prepAllNodeTrees():
+def prepAllNodeTrees(profile=None, tree_format='full'):
     logicObjects = {}
     materials = {}
     handledTreeParent = []
@@ -214,7 +362,8 @@ def prepAllNodeTrees():
     for object in bpy.context.scene.objects:
         if object.name in handledTreeParent: continue
         handledTreeParent.append(object.name)
-        (data, name) = node_trees.serialize(object)
+        with timed(profile, 'node_trees', object.name):
+            (data, name) = node_trees.serialize(object, tree_format)
         if data:
             logicObjects[name] = data
 
@@ -222,85 +371,281 @@ def prepAllNodeTrees():
             material = material_slot.material
             if material == None or not material or material.name in handledTreeParent: continue
             handledTreeParent.append(material.name)
-            (data, name) = node_trees.serialize(material)
+            with timed(profile, 'node_trees', material.name):
+                (data, name) = node_trees.serialize(material, tree_format)
 
             if data:
                 materials[name] = data
 
-    (sceneData, compositorName) = node_trees.serialize(bpy.context.scene)
+    with timed(profile, 'node_trees', 'compositor'):
+        (sceneData, compositorName) = node_trees.serialize(bpy.context.scene, tree_format)
     if sceneData:
         materials[compositorName] = sceneData
 
-    (worldData, worldName) = node_trees.serialize(bpy.context.scene.world)
+    with timed(profile, 'node_trees', 'world'):
+        (worldData, worldName) = node_trees.serialize(bpy.context.scene.world, tree_format)
     if worldData:
         materials[worldName] = worldData
 
     return (logicObjects, materials)
     
 
-# Called for every client connecting (after handshake)
+def send_initial_state(client_id, subscribed=False):
+    """
+    Send the current trees to a newly connected (or newly subscribed) client, filtered by its subscription.
+    Runs on Blender's main thread, as a timer after the grace window or right after the client subscribed.
+    """
+    client = next((client for client in server.clients if client['id'] == client_id), None) if server else None
+    if client is None:
+        return None
+    # subscribing within the grace period already sent the filtered state, pull clients request what they need
+    if (not subscribed and client_id in live_link.subscriptions) or live_link.is_pull(client):
+        return None
+
+    scene = bpy.context.scene
+    # shader trees first, only the trees the client is subscribed to get serialized
+    targets = sorted(asset_requests.tree_targets(scene), key=lambda target: target[0] != 'shaderTree')
+    for (kind, name, target) in targets:
+        name = name if kind == 'shaderTree' else name.replace('.', '')
+        if not live_link.is_interested(client, kind, [name], scene.name): continue
+
+        (data, _) = node_trees.serialize(target)
+        if not data: continue
+
+        live_stats.log('info', 'sending', kind, name)
+        send_update({
+            "name": name,
+            "type": kind,
+            "data": data
+        }, clients=[client])
+
+    return None
+
+
+def handle_request(client_id, request):
+    """
+    Answer a client's on-demand request (see asset_requests), from handle_incoming on Blender's main thread
+    like the `watch` it adds to a pull subscription.
+    """
+    client = next((client for client in server.clients if client['id'] == client_id), None) if server else None
+    if client is None:
+        return None
+
+    name = request.get('name')
+    if isinstance(name, str):
+        live_link.watch(client, name)
+
+    started = time.perf_counter()
+    if request.get('kind') == 'realtimeGeometry':
+        object = bpy.data.objects.get(name) if isinstance(name, str) else None
+        version = asset_requests.realtime_version(name) if object is not None and object.type == 'MESH' else None
+        if version is None:
+            response = asset_requests.reply(request, 'requestError', error='not found')
+        elif version == request.get('version'):
+            response = asset_requests.reply(request, 'notModified', version=version)
+        elif send_realtime_geometry([name], client, version=version, requestId=request.get('id')):
+            response = {"type": 'realtimeGeometry'}
+        else:
+            response = asset_requests.reply(request, 'requestError', error='export failed')
+    else:
+        response = asset_requests.answer(request, bpy.context.scene)
+
+    if response['type'] != 'realtimeGeometry':
+        live_link.send_text(server, client, json.dumps(response, indent=0))
+
+    live_stats.record_timing(f"request {request.get('kind')}", (time.perf_counter() - started) * 1000)
+    live_stats.count(f"requests answered {response['type']}")
+    live_stats.log('info', 'answered', request.get('kind'), name, 'with', response['type'])
+
+
+def stats_snapshot():
+    """live_stats with the pending queue sizes and the scheduler's metrics"""
+    return live_stats.snapshot({
+        "scheduled updates": scheduler.pending_count(),
+        "realtime objects": len(pending_realtime_objects),
+        "actions": len(pending_action_updates),
+        "prewarm trees": len(prewarm_queue),
+    }, scheduler.metrics())
+
+
+def send_stats(client_id, request_id=None):
+    client = next((client for client in server.clients if client['id'] == client_id), None) if server else None
+    if client is not None:
+        live_link.send_text(server, client, json.dumps({"type": "stats", "requestId": request_id, "data": stats_snapshot()}))
+
+
+# The websocket server calls these on its own thread, where bpy (including bpy.app.timers) isn't safe to use
+# and the subscriptions are read by the main thread, so they only queue the event for handle_incoming
 @persistent
 def new_client(client, server):
-    print("New client connected and was given id %d" % client['id'])
-    server.send_message_to_all(json.dumps({
+    incoming.put(('connected', client, None))
+
+
+@persistent
+def client_left(client, server):
+    incoming.put(('left', client, None))
+
+
+@persistent
+def message_received(client, server, message):
+    incoming.put(('message', client, message))
+
+
+def handle_incoming():
+    """Persistent timer handling the queued websocket events on Blender's main thread, within INCOMING_BUDGET_MS"""
+    start = time.perf_counter()
+    while (time.perf_counter() - start) * 1000 < INCOMING_BUDGET_MS:
+        try:
+            (event, client, message) = incoming.get_nowait()
+        except queue.Empty:
+            break
+
+        try:
+            if event == 'connected':
+                client_connected(client)
+            elif event == 'left':
+                client_disconnected(client)
+            else:
+                handle_message(client, message)
+        except Exception as error:
+            # keep the timer alive for the other clients
+            live_stats.log('error', 'handling', event, 'of client', client['id'], 'failed', repr(error))
+
+    return 0.0 if not incoming.empty() else INCOMING_INTERVAL_MS / 1000.0
+
+
+def client_connected(client):
+    live_stats.log('info', "New client connected and was given id %d" % client['id'])
+    live_link.send_text(server, client, json.dumps({
         "type": "sceneChange",
         "name": bpy.context.scene.name
     }))
 
-    (logicObjects, materials) = prepAllNodeTrees()
+    bpy.app.timers.register(partial(send_initial_state, client['id']), first_interval=SUBSCRIBE_GRACE_MS / 1000.0)
 
-    for material in materials:
-        print('sending shaderTree', material)
-        server.send_message_to_all(json.dumps({
-            "name": material,
-            "type": 'shaderTree',
-            "data": materials[material]
-        }, indent=0))
 
-    for object in logicObjects:
-        server.send_message_to_all(json.dumps({
-            "name": object.replace('.', ''),
-            "type": 'logicTree',
-            "data": logicObjects[object]
-        }, indent=0))
+def client_disconnected(client):
+    live_stats.log('info', "Client(%d) disconnected" % client['id'])
+    live_link.unsubscribe(client)
+    live_stats.forget_client(client)
 
 
-# Called for every client disconnecting
-@persistent
-def client_left(client, server):
-    print("Client(%d) disconnected" % client['id'])
+def handle_message(client, message):
+    try:
+        request = json.loads(message)
+    except ValueError:
+        request = None
+
+    if isinstance(request, dict) and request.get('type') == 'subscribe':
+        subscription = live_link.subscribe(client, request)
+        live_stats.log('info', "Client(%d) subscribed to" % client['id'], subscription)
+        live_link.send_text(server, client, json.dumps({"type": "subscribed", "data": subscription}))
+        send_initial_state(client['id'], True)
+        return
 
+    if isinstance(request, dict) and request.get('type') == 'request':
+        handle_request(client['id'], request)
+        return
 
-# Called when a client sends a message
-@persistent
-def message_received(client, server, message):
-    if len(message) > 200:
-        message = message[:200]+'..'
-    print("Client(%d) said something: %s" % (client['id'], message))
+    if isinstance(request, dict) and request.get('type') == 'stats':
+        send_stats(client['id'], request.get('id'))
+        return
+
+    if live_stats.enabled('debug'):
+        if len(message) > 200:
+            message = message[:200]+'..'
+        live_stats.log('debug', "Client(%d) said something: %s" % (client['id'], message))
 
 
 PORT=9001
 server = False
 
+def export_scene(animation_settings=None, tree_format='full', **options):
+    """
+    Full Sprixle export of the current scene: node trees, animation properties, view layer and GLB.
+    animation_settings override `animation_clips.DEFAULT_EXPORT_SETTINGS`, tree_format is passed to `node_trees.serialize`,
+    other options are passed through to `exporter.export`.
+
+    Returns:
+        dict: the export profile report
+    """
+    # numpy heavy, imported on first use so registering the addon doesn't pay for it
+    from . import animation_clips
+    profile = profiling.ExportProfile(bpy.context.scene.name)
+
+    with timed(profile, 'node_trees'):
+        prepAllNodeTrees(profile, tree_format)
+    with timed(profile, 'animation_properties'):
+        profile.extra['animation'] = animation_clips.prepare_animation_properties(profile, animation_settings)
+
+    with timed(profile, 'view_layer'):
+        serializers.view_layer(bpy.context.view_layer, force=True)
+
+    report = exporter.export(bpy.context.scene.name, profile=profile, **options)
+
+    profile.extra['lods'] = report['lods']
+    if 'optimize' in report:
+        profile.extra['optimize'] = report['optimize']
+    if 'environment' in report:
+        profile.extra['environment'] = report['environment']
+
+    return profile.write(report['filepath'])
+
 class SprixleExport(bpy.types.Operator):
     """Uses Sprixle addon's export for the current scene"""      # Use this as a tooltip for menu items and buttons.
     bl_idname = "export.sprixle_export"        # Unique identifier for buttons and menu items to reference.
     bl_label = "Sprixle Export (.glb)"         # Display name in the interface.
 
-    def execute(self, context):        # execute() is called when running the operator.
-        prepAllNodeTrees()
-        animation_clips.prepare_animation_properties()
-
-        serializers.view_layer(bpy.context.view_layer)
-        
-        exporter.export(bpy.context.scene.name)
+    lod_enabled: bpy.props.BoolProperty(name="Generate LODs", default=False)
+    lod_ratios: bpy.props.StringProperty(name="LOD Ratios", description="Comma separated decimation ratio per LOD level", default="0.5,0.25")
+    lod_distances: bpy.props.StringProperty(name="LOD Distances", description="Comma separated switch distance per LOD level", default="15,40")
+    lod_min_triangles: bpy.props.IntProperty(name="LOD Min Triangles", description="Meshes with fewer triangles are exported without LODs", default=500, min=0)
+    optimize_meshes: bpy.props.BoolProperty(name="Optimize Meshes", description="Reorder the exported GLB for the vertex cache and vertex fetch", default=False)
+    quantize: bpy.props.BoolProperty(name="Quantize Attributes", description="Store normals and UVs as normalized integers (KHR_mesh_quantization)", default=False)
+    quantize_positions: bpy.props.BoolProperty(name="Quantize Positions", description="Store positions as int16, the dequantization is folded into the mesh node transform", default=False)
+    position_error: bpy.props.FloatProperty(name="Position Error", description="Maximum position quantization error, meshes exceeding it keep float positions", default=0.0005, min=0.0, precision=5)
+    animation_sample_rate: bpy.props.FloatProperty(name="Animation Sample Rate", description="Animation curve samples per frame", default=1.0, min=0.01)
+    animation_use_frame_range: bpy.props.BoolProperty(name="Use Action Frame Range", description="Sample actions over their frame range instead of their keyframe span", default=False)
+    animation_binary_samples: bpy.props.BoolProperty(name="Binary Animation Samples", description="Write sampled curves as float32 arrays to animations/<scene>.bin", default=False)
+    animation_simplify: bpy.props.BoolProperty(name="Simplify Animation", description="Drop sampled points that linear interpolation reproduces within tolerance", default=False)
+    animation_keys_only: bpy.props.BoolProperty(name="Keys Only Animation", description="Export keyframes, handles and easing instead of sampled curves (curves with modifiers are still sampled)", default=False)
+    tolerance_location: bpy.props.FloatProperty(name="Location Tolerance", default=0.0005, min=0.0, precision=5)
+    tolerance_rotation: bpy.props.FloatProperty(name="Rotation Tolerance", default=0.0005, min=0.0, precision=5)
+    tolerance_scale: bpy.props.FloatProperty(name="Scale Tolerance", default=0.0005, min=0.0, precision=5)
+    tolerance_value: bpy.props.FloatProperty(name="Value Tolerance", description="Tolerance for node socket values and other properties", default=0.0005, min=0.0, precision=5)
+    prefilter_environment: bpy.props.BoolProperty(name="Prefilter Environment", description="Precompute the world environment's specular mip chain and diffuse SH (cached in //environments)", default=False)
+    compact_trees: bpy.props.BoolProperty(name="Compact Node Trees", description="Write node tree json with a string table and integer node indices", default=False)
 
-        global server
-        if server:
-            server.send_message_to_all(json.dumps({
-                "type": "export",
-                "name": bpy.context.scene.name
-            }))
+    def execute(self, context):        # execute() is called when running the operator.
+        export_scene(
+            animation_settings={
+                "sample_rate": self.animation_sample_rate,
+                "use_frame_range": self.animation_use_frame_range,
+                "binary_samples": self.animation_binary_samples,
+                "simplify": self.animation_simplify,
+                "keys_only": self.animation_keys_only,
+                "simplify_tolerances": {
+                    "location": self.tolerance_location,
+                    "rotation": self.tolerance_rotation,
+                    "scale": self.tolerance_scale,
+                    "value": self.tolerance_value,
+                },
+            },
+            tree_format='compact' if self.compact_trees else 'full',
+            lod_ratios=lod.parse_float_list(self.lod_ratios) if self.lod_enabled else None,
+            lod_distances=lod.parse_float_list(self.lod_distances),
+            lod_min_triangles=self.lod_min_triangles,
+            optimize=self.optimize_meshes,
+            quantize=self.quantize,
+            quantize_positions=self.quantize_positions,
+            position_error=self.position_error,
+            prefilter_environment=self.prefilter_environment,
+        )
+
+        send_update({
+            "type": "export",
+            "name": bpy.context.scene.name
+        })
 
         return {'FINISHED'}            # Lets Blender know the operator finished successfully.
 
@@ -308,6 +653,51 @@ class SprixleExport(bpy.types.Operator):
 def menu_func_export(self, context):
     self.layout.operator(SprixleExport.bl_idname, text="Sprixle Export (.glb)")
 
+def format_bytes(count):
+    for unit in ('B', 'KB', 'MB'):
+        if count < 1024:
+            return f'{count:.0f}{unit}'
+        count /= 1024
+    return f'{count:.1f}GB'
+
+
+def draw_live_link_stats(layout, context):
+    """Live link counters of live_stats, shared by both panels"""
+    box = layout.box()
+    box.label(text="Live Link", icon="LINKED")
+    if not server:
+        box.label(text="Server not running")
+        return
+
+    stats = stats_snapshot()
+    clients = stats['clients']
+    box.label(text=f"Clients: {len(server.clients)}, sent {sum(client['messages'] for client in clients.values())} msgs / {format_bytes(sum(client['bytes'] for client in clients.values()))}")
+    for (id, client) in list(clients.items())[:4]:
+        box.label(text=f"  #{id} {client['address'] or ''}: {client['messages']} msgs / {format_bytes(client['bytes'])}")
+
+    pending = stats['pending']
+    box.label(text="Pending: " + ", ".join(f"{name} {count}" for name, count in pending.items()))
+
+    export = stats['timings'].get('realtime export')
+    if export:
+        box.label(text=f"Realtime export: {export['last_ms']:.0f}ms last, {export['max_ms']:.0f}ms max ({export['count']})")
+
+    for (name, tree) in list(stats['trees'].items())[:3]:
+        box.label(text=f"  {name}: {tree['last_ms']:.1f}ms last, {tree['total_ms']:.0f}ms total ({tree['count']}, {tree['cached']} cached)")
+
+    for (kind, metrics) in stats['scheduler'].items():
+        box.label(text=f"  {kind}: debounce {metrics['debounce_ms']:.0f}ms, {metrics['runs']} runs, {metrics['coalesced']} coalesced, {metrics['forced']} forced")
+
+    for (name, count) in stats['counters'].items():
+        box.label(text=f"  {name}: {format_bytes(count) if name.endswith('bytes') else count}")
+
+    box.prop(context.window_manager, 'sprixle_log_level')
+
+
+def update_log_level(self, context):
+    live_stats.set_log_level(self.sprixle_log_level)
+
+
 class SprixleInfoPanel(bpy.types.Panel):
     bl_idname = "OBJECT_PT_sprixle"
     bl_category = 'Sprixle'
@@ -321,6 +711,7 @@ class SprixleInfoPanel(bpy.types.Panel):
         self.layout.label(text="Addon Version: 0.1.0")
 
         self.layout.operator(SprixleExport.bl_idname, text="Export Scene", icon="EXPORT")
+        draw_live_link_stats(self.layout, context)
 
 class SprixleInfoPanelInTree(bpy.types.Panel):
     bl_idname = "TREE_PT_sprixle"
@@ -335,20 +726,12 @@ class SprixleInfoPanelInTree(bpy.types.Panel):
         self.layout.label(text="Addon Version: 0.1.0")
 
         self.layout.operator(SprixleExport.bl_idname, text="Export Scene", icon="EXPORT")
+        draw_live_link_stats(self.layout, context)
 
 
-def register():
-    auto_load.register()
-    bpy.app.handlers.depsgraph_update_post.append(handleDepsGraphUpdate)
-    bpy.app.handlers.load_post.append(handleFileLoaded)
-    bpy.app.timers.register(checkScene, first_interval = 0.5, persistent=True)
-    # exporter.register()
-
-    # bpy.utils.unregister_class(SprixleExport)
-    bpy.utils.register_class(SprixleExport)
-    bpy.utils.register_class(SprixleInfoPanel)
-    bpy.utils.register_class(SprixleInfoPanelInTree)
-    # bpy.types.TOPBAR_MT_file_export.append(menu_func_export)
+def start_server():
+    # imported on first use so exports (batch.py) that never start the live link don't pay for it
+    from websocket_server import WebsocketServer
 
     global server
     server = WebsocketServer(host = '0.0.0.0', port = PORT)
@@ -358,19 +741,59 @@ def register():
     server.run_forever(threaded=True)
 
 
+def register():
+    auto_load.register()
+    with auto_load.startup_step('handlers'):
+        bpy.app.handlers.depsgraph_update_post.append(handleDepsGraphUpdate)
+        bpy.app.handlers.load_post.append(handleFileLoaded)
+        bpy.app.handlers.undo_post.append(handleUndoRedo)
+        bpy.app.handlers.redo_post.append(handleUndoRedo)
+        bpy.app.timers.register(checkScene, first_interval = 0.5, persistent=True)
+        bpy.app.timers.register(handle_incoming, first_interval = 0.0, persistent=True)
+    # exporter.register()
+
+    with auto_load.startup_step('register operator and panels'):
+        bpy.types.WindowManager.sprixle_log_level = bpy.props.EnumProperty(
+            name="Log Level",
+            description="Live link messages printed to the console",
+            items=[(level, level.title(), '') for level in live_stats.LOG_LEVELS],
+            default=live_stats.log_level,
+            update=update_log_level,
+        )
+        # bpy.utils.unregister_class(SprixleExport)
+        bpy.utils.register_class(SprixleExport)
+        bpy.utils.register_class(SprixleInfoPanel)
+        bpy.utils.register_class(SprixleInfoPanelInTree)
+        # bpy.types.TOPBAR_MT_file_export.append(menu_func_export)
+
+    with auto_load.startup_step('websocket server'):
+        start_server()
+
+    auto_load.print_startup_report()
+
+
 def unregister():
     auto_load.unregister()
     global server
     if server:
         server.shutdown_gracefully()
         server = False
+    scheduler.clear()
+    prewarm_queue.clear()
+    if bpy.app.timers.is_registered(prewarm_step):
+        bpy.app.timers.unregister(prewarm_step)
+    artifact_cache.close()
     # exporter.unregister()
     bpy.app.handlers.depsgraph_update_post.remove(handleDepsGraphUpdate)
     bpy.app.handlers.load_post.remove(handleFileLoaded)
+    bpy.app.handlers.undo_post.remove(handleUndoRedo)
+    bpy.app.handlers.redo_post.remove(handleUndoRedo)
     bpy.app.timers.unregister(checkScene)
+    bpy.app.timers.unregister(handle_incoming)
 
     bpy.utils.unregister_class(SprixleExport)
     bpy.utils.unregister_class(SprixleInfoPanel)
     bpy.utils.unregister_class(SprixleInfoPanelInTree)
+    del bpy.types.WindowManager.sprixle_log_level
     # bpy.types.TOPBAR_MT_file_export.remove(menu_func_export)
 
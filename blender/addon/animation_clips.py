@@ -1,24 +1,103 @@
 import bpy
+import hashlib
 import json
+import math
+import os
+import sys
+import numpy as np
+from .profiling import timed
+from . import artifact_cache
+from .animation_eval import KEYFRAME_THRESHOLD
+
+DEFAULT_EXPORT_SETTINGS = {
+    # samples per frame, values above 1 sample sub-frames (2 -> every half frame)
+    "sample_rate": 1.0,
+    # sample the action's frame_range instead of the span between the first and last keyframe
+    "use_frame_range": False,
+    # write sampled curves to a float32 side buffer (animations/<scene>.bin) instead of `sampled_points` lists
+    "binary_samples": False,
+    # drop samples that linear interpolation reproduces within the property's tolerance
+    "simplify": False,
+    "simplify_tolerances": {
+        "location": 0.0005,
+        "rotation": 0.0005,
+        "scale": 0.0005,
+        # node socket values and any other property
+        "value": 0.0005,
+    },
+    # only ship keyframes and handles, curves with modifiers are still sampled (see animation_eval)
+    "keys_only": False,
+}
+
+# (action name, settings key) -> {"fingerprint", "fcurves", "data", "samples", "report"}, see serialize_action_cached
+action_cache = {}
+
+class SampleBuffer:
+    """
+    Packed float32 storage for sampled curves, each curve is `count` frames followed by `count` values.
+    Curves reference their data with {"offset": byte offset, "count": samples}.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.byte_length = 0
+
+    def append(self, frames, values):
+        chunk = np.concatenate([frames.astype('<f4'), values.astype('<f4')]).tobytes()
+        reference = {"offset": self.byte_length, "count": len(frames)}
+
+        self.chunks.append(chunk)
+        self.byte_length += len(chunk)
+
+        return reference
+
+    def extend(self, chunks):
+        """Append another buffer's chunks, returns the byte offset they start at"""
+        base = self.byte_length
+        self.chunks.extend(chunks)
+        self.byte_length += sum(len(chunk) for chunk in chunks)
+
+        return base
+
+    def tobytes(self):
+        return b''.join(self.chunks)
 
-def prepare_animation_properties():
+def prepare_animation_properties(profile=None, export_settings=None):
     """
     Export all animations to custom properties using Blender 4.4 action slots system
+
+    Returns:
+        dict: simplification report keyed by action name (empty when not simplifying)
     """
     scene = bpy.context.scene
     
     # Store all actions in scene custom properties
-    export_actions_to_scene(scene)
+    return export_actions_to_scene(scene, profile, export_settings)
 
     # TODO add action_name and action_slot to object, material, and node trees
     
 
-def export_actions_to_scene(scene):
+def export_actions_to_scene(scene, profile=None, export_settings=None):
     """Export all actions with their slots and fcurves to scene custom properties"""
+    export_settings = dict(DEFAULT_EXPORT_SETTINGS, **(export_settings or {}))
+    if export_settings['binary_samples']:
+        export_settings['sample_buffer'] = SampleBuffer()
+    export_settings['simplify_report'] = {}
     actions_data = {}
+    cached = 0
     
     for action in bpy.data.actions:
-        action_data = serialize_action_with_slots(action)
+        with timed(profile, 'animation_properties', action.name):
+            (entry, changed) = serialize_action_cached(action, export_settings)
+        if not changed:
+            cached += 1
+
+        action_data = entry['data']
+        if export_settings['binary_samples']:
+            action_data = rebase_samples(action_data, export_settings['sample_buffer'].extend(entry['samples']))
+        if entry['report']:
+            export_settings['simplify_report'][action.name] = entry['report']
+
         if action_data:
             actions_data[action.name] = action_data
 
@@ -42,11 +121,249 @@ def export_actions_to_scene(scene):
                         "action_slot": animation_data.action_slot.name_display,
                     })
     
+    prune_action_cache(export_settings)
+    print('[Sprixle.Export Animation]', cached, 'of', len(bpy.data.actions), 'actions unchanged since the last export')
+
     if actions_data:
         scene['anim_actions'] = json.dumps(actions_data, indent=0)
 
-def serialize_action_with_slots(action):
+    if export_settings['binary_samples']:
+        write_sample_buffer(scene, export_settings['sample_buffer'])
+    elif 'anim_buffer' in scene:
+        del scene['anim_buffer']
+
+    for name, report in export_settings['simplify_report'].items():
+        print('[Sprixle.Export Animation]', name, ':', report['samples_before'], '->', report['samples_after'], 'samples,',
+            report['constant_curves'], 'of', report['curves'], 'curves constant')
+
+    return export_settings['simplify_report']
+
+def write_sample_buffer(scene, sample_buffer):
+    """Write the sample buffer next to the .blend and reference it from the scene as `anim_buffer`"""
+    uri = 'animations/' + scene.name.replace('.', '-') + '.bin'
+    os.makedirs(bpy.path.abspath('//animations'), exist_ok=True)
+    with open(bpy.path.abspath('//' + uri), 'wb') as file:
+        file.write(sample_buffer.tobytes())
+
+    scene['anim_buffer'] = json.dumps({
+        "uri": uri,
+        "byteLength": sample_buffer.byte_length,
+        "componentType": "float32",
+        "layout": "frames[count] values[count]",
+    })
+
+def settings_key(export_settings):
+    """Cache key of the settings that change the serialized output"""
+    return json.dumps({key: value for key, value in export_settings.items() if key in DEFAULT_EXPORT_SETTINGS}, sort_keys=True)
+
+def modifier_signature(modifier):
+    """Every editable setting of an FCurve modifier as a string"""
+    values = []
+    for prop in modifier.bl_rna.properties:
+        if prop.identifier == 'rna_type' or prop.type in ('POINTER', 'COLLECTION'): continue
+        value = getattr(modifier, prop.identifier)
+        values.append(f'{prop.identifier}={tuple(value) if getattr(prop, "is_array", False) else value}')
+
+    if hasattr(modifier, 'control_points'):
+        values.extend(f'{point.frame},{point.min},{point.max}' for point in modifier.control_points)
+
+    return ';'.join(values)
+
+def fcurve_fingerprint(fcurve):
+    """Hash of everything serialize_fcurve reads from an FCurve"""
+    keyframe_points = fcurve.keyframe_points
+    count = len(keyframe_points)
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'{fcurve.data_path}|{fcurve.array_index}|{fcurve.extrapolation}|{fcurve.group.name if fcurve.group else ""}|{count}'.encode('utf-8'))
+
+    for attribute, size in (('co', 2), ('handle_left', 2), ('handle_right', 2), ('back', 1), ('amplitude', 1), ('period', 1)):
+        values = np.empty(count * size, np.float32)
+        keyframe_points.foreach_get(attribute, values)
+        digest.update(values.tobytes())
+
+    digest.update('|'.join(f'{keyframe.interpolation},{keyframe.easing},{keyframe.handle_left_type},{keyframe.handle_right_type}' for keyframe in keyframe_points).encode('utf-8'))
+    for modifier in fcurve.modifiers:
+        digest.update(modifier_signature(modifier).encode('utf-8'))
+
+    return digest.hexdigest()
+
+def action_fingerprint(action):
+    """
+    Hash an action's frame range, slots and fcurves without serializing it.
+
+    Returns:
+        tuple: (action fingerprint, {(slot name, data_path, array_index): fcurve fingerprint})
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'{action.name}|{tuple(action.frame_range)}'.encode('utf-8'))
+
+    fcurves = {}
+    strip = action.layers[0].strips[0] if action.layers and action.layers[0].strips else None
+    for slot in action.slots:
+        digest.update(f'|{slot.name_display}|{slot.select}'.encode('utf-8'))
+
+        channelbag = strip.channelbag(slot) if strip else None
+        if not channelbag: continue
+
+        for fcurve in channelbag.fcurves:
+            fingerprint = fcurve_fingerprint(fcurve)
+            fcurves[(slot.name_display, fcurve.data_path, fcurve.array_index)] = fingerprint
+            digest.update(fingerprint.encode('utf-8'))
+
+    return (digest.hexdigest(), fcurves)
+
+def serialize_action_cached(action, export_settings):
+    """
+    Serialize an action unless its fingerprint matches the cached serialization for the same settings.
+    Sample buffer references in the cached data are relative to the entry's own `samples` chunks.
+
+    Returns:
+        tuple: (cache entry, whether it was serialized again)
+    """
+    key = (action.name, settings_key(export_settings))
+    (fingerprint, fcurves) = action_fingerprint(action)
+
+    entry = action_cache.get(key)
+    if entry and entry['fingerprint'] == fingerprint:
+        return (entry, False)
+
+    entry = load_cached_action(key, fingerprint, fcurves)
+    if entry:
+        action_cache[key] = entry
+        return (entry, True)
+
+    action_settings = dict(export_settings, simplify_report={})
+    if export_settings['binary_samples']:
+        action_settings['sample_buffer'] = SampleBuffer()
+
+    entry = {
+        "fingerprint": fingerprint,
+        "fcurves": fcurves,
+        "data": serialize_action_with_slots(action, action_settings),
+        "samples": action_settings['sample_buffer'].chunks if export_settings['binary_samples'] else [],
+        "report": action_settings['simplify_report'].get(action.name),
+    }
+    action_cache[key] = entry
+    store_cached_action(key, entry)
+
+    return (entry, True)
+
+def cached_action_data(action, export_settings, fingerprint, fcurves):
+    """
+    Serialized action for an on-demand request (see asset_requests), reusing a fresh cached serialization.
+    Unlike serialize_action_cached it doesn't replace the in-memory entry, which live_action_update diffs against.
+    """
+    key = (action.name, settings_key(export_settings))
+
+    entry = action_cache.get(key)
+    if entry and entry['fingerprint'] == fingerprint:
+        return entry['data']
+
+    entry = load_cached_action(key, fingerprint, fcurves)
+    if entry:
+        return entry['data']
+
+    action_settings = dict(export_settings, simplify_report={})
+    data = serialize_action_with_slots(action, action_settings)
+    store_cached_action(key, {"fingerprint": fingerprint, "data": data, "samples": [], "report": action_settings['simplify_report'].get(action.name)})
+
+    return data
+
+def action_artifact_key(key, fingerprint):
+    return artifact_cache.fingerprint(key[1], fingerprint, artifact_cache.source_version(sys.modules[__name__]))
+
+def load_cached_action(key, fingerprint, fcurves):
+    """Entry for the fingerprint from the on-disk artifact cache, None on a miss"""
+    cache = artifact_cache.blend_cache()
+    cached = cache.get_json('action', action_artifact_key(key, fingerprint)) if cache else None
+    if cached is None:
+        return None
+
+    (value, samples) = cached
+    chunks = []
+    offset = 0
+    for length in value['sample_lengths']:
+        chunks.append(samples[offset:offset + length])
+        offset += length
+
+    return {"fingerprint": fingerprint, "fcurves": fcurves, "data": value['data'], "samples": chunks, "report": value['report']}
+
+def store_cached_action(key, entry):
+    cache = artifact_cache.blend_cache()
+    if not cache: return
+
+    cache.put_json('action', action_artifact_key(key, entry['fingerprint']), {
+        "data": entry['data'],
+        "report": entry['report'],
+        "sample_lengths": [len(chunk) for chunk in entry['samples']],
+    }, b''.join(entry['samples']))
+
+def rebase_samples(action_data, base):
+    """Copy of action_data with its `samples` offsets moved by base bytes"""
+    if base == 0:
+        return action_data
+
+    slots = {}
+    for name, slot in action_data['slots'].items():
+        strip = slot.get('strip')
+        if strip and 'fcurves' in strip:
+            fcurves = [
+                dict(fcurve, samples={"offset": fcurve['samples']['offset'] + base, "count": fcurve['samples']['count']}) if 'samples' in fcurve else fcurve
+                for fcurve in strip['fcurves']
+            ]
+            slot = dict(slot, strip=dict(strip, fcurves=fcurves))
+        slots[name] = slot
+
+    return dict(action_data, slots=slots)
+
+def prune_action_cache(export_settings):
+    """Drop cached serializations of deleted or renamed actions"""
+    key = settings_key(export_settings)
+    for (name, settings) in list(action_cache):
+        if settings == key and name not in bpy.data.actions:
+            del action_cache[(name, settings)]
+
+def live_action_update(action, export_settings=None):
+    """
+    Serialize an edited action for the live link, diffing fcurve fingerprints against the last serialization.
+
+    Returns:
+        tuple: ("action", action data) when fcurves or slots were added or removed,
+            ("actionFCurves", {slot name: [changed fcurve data]}) when only curves changed,
+            None when nothing changed
+    """
+    export_settings = dict(DEFAULT_EXPORT_SETTINGS, **(export_settings or {}))
+    export_settings['binary_samples'] = False
+    previous = action_cache.get((action.name, settings_key(export_settings)))
+
+    (entry, changed) = serialize_action_cached(action, export_settings)
+    if not changed:
+        return None
+
+    if not previous or previous['fcurves'].keys() != entry['fcurves'].keys() or previous['data']['slots'].keys() != entry['data']['slots'].keys():
+        return ("action", entry['data'])
+
+    changed_fcurves = {key for key, fingerprint in entry['fcurves'].items() if previous['fcurves'][key] != fingerprint}
+    slots = {}
+    for slot_name, slot in entry['data']['slots'].items():
+        fcurves = [
+            fcurve for fcurve in slot.get('strip', {}).get('fcurves', [])
+            if (slot_name, fcurve['data_path'], fcurve['array_index']) in changed_fcurves
+        ]
+        if fcurves:
+            slots[slot_name] = fcurves
+
+    # slot selection or frame range changed
+    if not slots:
+        return ("action", entry['data'])
+
+    return ("actionFCurves", slots)
+
+def serialize_action_with_slots(action, export_settings=None):
     """Serialize an action with its slots, layers, strips, and fcurves"""
+    if export_settings is None:
+        export_settings = DEFAULT_EXPORT_SETTINGS
     action_data = {
         "name": action.name,
         "frame_range": [action.frame_range[0], action.frame_range[1]],
@@ -68,7 +385,7 @@ def serialize_action_with_slots(action):
             channelbag = strip.channelbag(slot)
 
             if channelbag:
-                slot_data["strip"] = serialize_channelbag(channelbag)
+                slot_data["strip"] = serialize_channelbag(channelbag, export_settings)
 
             action_data["slots"][slot.name_display] = slot_data
 
@@ -100,7 +417,7 @@ def serialize_action_with_slots(action):
     
     return action_data
 
-def serialize_channelbags(strip):
+def serialize_channelbags(strip, export_settings=None):
     """Serialize channelbags and their fcurves for a strip"""
     channelbags_data = {}
     
@@ -110,35 +427,45 @@ def serialize_channelbags(strip):
         
             
         slot_name = channelbag.slot.name_display # f"slot_{slot_idx}"
-        channelbags_data[slot_name] = serialize_channelbag(channelbag)
+        channelbags_data[slot_name] = serialize_channelbag(channelbag, export_settings)
     
     return channelbags_data
 
-def serialize_channelbag(channelbag):
+def serialize_channelbag(channelbag, export_settings=None):
     if not channelbag.fcurves:
         return {}
 
     return {
-        "fcurves": serialize_fcurves(channelbag.fcurves, channelbag)
+        "fcurves": serialize_fcurves(channelbag.fcurves, channelbag, export_settings)
     }
 
-def serialize_fcurves(fcurves, owner):
+def serialize_fcurves(fcurves, owner, export_settings=None):
     """Serialize a collection of fcurves"""
     fcurves_data = []
     
     for fcurve in fcurves:
-        fcurve_data = serialize_fcurve(fcurve, owner)
+        fcurve_data = serialize_fcurve(fcurve, owner, export_settings)
         if fcurve_data:
             fcurves_data.append(fcurve_data)
     
     return fcurves_data
 
-def serialize_fcurve(fcurve, owner):
+def serialize_fcurve(fcurve, owner, export_settings=None):
     """Serialize an FCurve with keyframes"""
+    if export_settings is None:
+        export_settings = DEFAULT_EXPORT_SETTINGS
+
     # Parse data path to determine what's being animated
     target_type, target_name, property_name = parse_animation_data_path(fcurve.data_path, owner)
 
-    sampled_points = sample_keyframes(fcurve)
+    sampled = not export_settings['keys_only'] or len(fcurve.modifiers) > 0
+    constant = None
+    if sampled:
+        frame_range = tuple(fcurve.id_data.frame_range) if export_settings['use_frame_range'] else None
+        (frames, values) = sample_keyframes(fcurve, export_settings['sample_rate'], frame_range)
+
+        if export_settings['simplify'] and len(frames):
+            (frames, values, constant) = simplify_fcurve_samples(fcurve, frames, values, export_settings)
 
     fcurve_data = {
         "data_path": fcurve.data_path,
@@ -147,41 +474,228 @@ def serialize_fcurve(fcurve, owner):
         "target_name": target_name,
         "property_name": property_name,
         "keyframes": serialize_keyframes(fcurve.keyframe_points),
-        "sampled_points": sampled_points,
-        "interpolation": get_interpolation_type(fcurve.keyframe_points[0]) if fcurve.keyframe_points else "LINEAR"
+        "interpolation": get_interpolation_type(fcurve.keyframe_points[0]) if fcurve.keyframe_points else "LINEAR",
+        "extrapolation": fcurve.extrapolation,
     }
     
+    if not sampled:
+        fcurve_data["keys_only"] = True
+    elif constant is not None:
+        fcurve_data["constant"] = constant
+    elif 'sample_buffer' in export_settings:
+        fcurve_data["samples"] = export_settings['sample_buffer'].append(frames, values)
+    else:
+        fcurve_data["sampled_points"] = sampled_points_list(frames, values)
+
     # Add group information if available
     if fcurve.group:
         fcurve_data["group"] = fcurve.group.name
     
     return fcurve_data
 
-def sample_keyframes(fcurve):
-    sampled_points = []
+def keyframe_coordinates(fcurve):
+    """Keyframe (frame, value) pairs as a (count, 2) float array"""
+    count = len(fcurve.keyframe_points)
+    coordinates = np.empty(count * 2, np.float32)
+    fcurve.keyframe_points.foreach_get('co', coordinates)
 
-    last_keyframe = None
+    return coordinates.reshape(count, 2)
 
-    # Iterate through frames and evaluate the FCurve
-    for keyframe in fcurve.keyframe_points:
-        if not last_keyframe:
-            last_keyframe = keyframe
-            continue
+# Newton steps solving a bezier segment's x(t) for a frame, and how close x(t) has to land to the frame
+BEZIER_NEWTON_STEPS = 6
+BEZIER_FRAME_TOLERANCE = 1e-5
+# below this many BEZIER samples in a curve numpy's fixed cost outweighs calling fcurve.evaluate per frame
+BEZIER_BULK_MIN_SAMPLES = 128
+
+def keyframe_handles(fcurve, attribute):
+    count = len(fcurve.keyframe_points)
+    handles = np.empty(count * 2, np.float32)
+    fcurve.keyframe_points.foreach_get(attribute, handles)
+
+    return handles.reshape(count, 2).astype(np.float64)
+
+def bezier_samples(key_frames, key_values, handles_left, handles_right, segment, frames):
+    """
+    Values of BEZIER segments at frames (segment: the key each frame follows), the bulk version of
+    animation_eval.bezier: handles corrected like BKE_fcurve_correct_bezpart, x(t) solved for every frame at once.
+
+    Returns:
+        tuple: (values, converged) arrays, frames where x(t) wasn't solved (handles flat at a key) need evaluate
+    """
+    (x1, y1) = (key_frames[segment], key_values[segment].astype(np.float64))
+    (x2, y2) = (handles_right[segment, 0], handles_right[segment, 1])
+    (x3, y3) = (handles_left[segment + 1, 0], handles_left[segment + 1, 1])
+    (x4, y4) = (key_frames[segment + 1], key_values[segment + 1].astype(np.float64))
+
+    length1 = np.abs(x1 - x2)
+    length2 = np.abs(x4 - x3)
+    total = length1 + length2
+    factor = np.divide(x4 - x1, total, out=np.ones_like(total), where=(total > 0) & (total > x4 - x1))
+    (x2, y2) = (x1 - factor * (x1 - x2), y1 - factor * (y1 - y2))
+    (x3, y3) = (x4 - factor * (x4 - x3), y4 - factor * (y4 - y3))
+
+    # x(t) = ((a t + b) t + c) t + x1 is monotonic after the correction, Newton's method from the linear guess
+    a = x4 - x1 + 3 * (x2 - x3)
+    b = 3 * (x1 - 2 * x2 + x3)
+    c = 3 * (x2 - x1)
+    target = frames - x1
+    t = np.clip(np.divide(target, x4 - x1, out=np.zeros_like(target), where=x4 > x1), 0, 1)
+    for _ in range(BEZIER_NEWTON_STEPS):
+        slope = (3 * a * t + 2 * b) * t + c
+        t = np.clip(t - (((a * t + b) * t + c) * t - target) / np.maximum(slope, 1e-9), 0, 1)
+    converged = np.abs(((a * t + b) * t + c) * t - target) < BEZIER_FRAME_TOLERANCE
+
+    u = 1 - t
+    values = u * u * u * y1 + 3 * u * u * t * y2 + 3 * u * t * t * y3 + t * t * t * y4
+    flat = (np.abs(y1 - y4) < 1e-7) & (np.abs(y2 - y3) < 1e-7) & (np.abs(y3 - y4) < 1e-7)
+    return (np.where(flat, y1, values), converged | flat)
+
+def sample_frames(start, end, sample_rate):
+    """Evenly spaced frames on a grid anchored at the whole frame before start, end included when on the grid"""
+    step = 1.0 / sample_rate
+    first = math.floor(start)
+    count = int(math.floor((end - first) / step + 1e-6)) + 1
+
+    return first + np.arange(max(count, 0), dtype=np.float64) * step
+
+def sample_keyframes(fcurve, sample_rate=1.0, frame_range=None):
+    """
+    Sample an FCurve at `sample_rate` samples per frame between its first and last keyframe (or frame_range).
+    Curves without modifiers are evaluated in bulk: samples on a key, CONSTANT extrapolation and CONSTANT / LINEAR /
+    BEZIER segments. Eased segments (SINE, BACK, ...), LINEAR extrapolation and modifiers go through fcurve.evaluate.
+
+    Returns:
+        tuple: (frames, values) float arrays
+    """
+    if len(fcurve.keyframe_points) < 2:
+        return (np.empty(0, np.float64), np.empty(0, np.float32))
+
+    coordinates = keyframe_coordinates(fcurve)
+    key_frames = coordinates[:, 0].astype(np.float64)
+    key_values = coordinates[:, 1]
+
+    (start, end) = frame_range if frame_range else (key_frames[0], key_frames[-1])
+    frames = sample_frames(start, end, sample_rate)
+    values = np.empty(len(frames), np.float32)
+
+    # fcurve modifiers (noise, cycles, ...) are only applied by evaluate
+    needs_evaluate = np.ones(len(frames), bool)
+    if not len(fcurve.modifiers):
+        interpolations = np.array([keyframe.interpolation for keyframe in fcurve.keyframe_points])
+        inside = (frames >= key_frames[0]) & (frames <= key_frames[-1])
+        segment = np.clip(np.searchsorted(key_frames, frames, side='right') - 1, 0, len(key_frames) - 2)
+        segment_interpolation = interpolations[segment]
+
+        # Blender returns a key's value for frames this close to it
+        on_left = inside & (np.abs(frames - key_frames[segment]) < KEYFRAME_THRESHOLD)
+        on_right = inside & ~on_left & (np.abs(frames - key_frames[segment + 1]) < KEYFRAME_THRESHOLD)
+        values[on_left] = key_values[segment[on_left]]
+        values[on_right] = key_values[segment[on_right] + 1]
+        between = inside & ~on_left & ~on_right
+
+        outside = ~inside if fcurve.extrapolation == 'CONSTANT' else np.zeros(len(frames), bool)
+        values[outside] = np.where(frames[outside] < key_frames[0], key_values[0], key_values[-1])
+
+        constant = between & (segment_interpolation == 'CONSTANT')
+        values[constant] = key_values[segment[constant]]
+
+        linear = between & (segment_interpolation == 'LINEAR')
+        left = segment[linear]
+        span = key_frames[left + 1] - key_frames[left]
+        factor = np.divide(frames[linear] - key_frames[left], span, out=np.zeros_like(span), where=span > 0)
+        values[linear] = key_values[left] + (key_values[left + 1] - key_values[left]) * factor
+
+        bezier = between & (segment_interpolation == 'BEZIER')
+        if bezier.sum() < BEZIER_BULK_MIN_SAMPLES:
+            bezier[:] = False
+        else:
+            handles = (keyframe_handles(fcurve, 'handle_left'), keyframe_handles(fcurve, 'handle_right'))
+            (bezier_values, converged) = bezier_samples(key_frames, key_values, *handles, segment[bezier], frames[bezier])
+            values[bezier] = bezier_values
+            bezier[bezier] = converged
+
+        needs_evaluate = ~(on_left | on_right | outside | constant | linear | bezier)
+
+    evaluate = fcurve.evaluate
+    values[needs_evaluate] = np.fromiter((evaluate(frame) for frame in frames[needs_evaluate].tolist()), np.float32, int(needs_evaluate.sum()))
+
+    return (frames, values)
+
+def curve_tolerance(data_path, tolerances):
+    """Simplification tolerance for an fcurve by the kind of property it animates"""
+    for kind in ('location', 'rotation', 'scale'):
+        if data_path.startswith(kind):
+            return tolerances[kind]
+
+    return tolerances['value']
+
+def simplify_samples(frames, values, tolerance):
+    """
+    Ramer-Douglas-Peucker on sampled points, measuring the value error of linear interpolation between kept samples.
+
+    Returns:
+        ndarray: boolean mask of samples to keep
+    """
+    count = len(frames)
+    keep = np.zeros(count, bool)
+    if count == 0:
+        return keep
+
+    keep[0] = keep[-1] = True
+    values = values.astype(np.float64)
+    segments = [(0, count - 1)]
+    while segments:
+        (start, end) = segments.pop()
+        if end - start < 2: continue
+
+        factor = (frames[start + 1:end] - frames[start]) / (frames[end] - frames[start])
+        error = np.abs(values[start + 1:end] - (values[start] + (values[end] - values[start]) * factor))
+        worst = int(np.argmax(error))
+        if error[worst] <= tolerance: continue
+
+        middle = start + 1 + worst
+        keep[middle] = True
+        segments.append((start, middle))
+        segments.append((middle, end))
+
+    return keep
+
+def simplify_fcurve_samples(fcurve, frames, values, export_settings):
+    """
+    Reduce sampled points within the curve's tolerance, constant curves collapse to a single value.
+
+    Returns:
+        tuple: (frames, values, constant value or None)
+    """
+    tolerance = curve_tolerance(fcurve.data_path, export_settings['simplify_tolerances'])
+
+    report = export_settings['simplify_report'].setdefault(fcurve.id_data.name, {
+        "curves": 0, "constant_curves": 0, "samples_before": 0, "samples_after": 0,
+    })
+    report['curves'] += 1
+    report['samples_before'] += len(frames)
+
+    if float(values.max() - values.min()) <= tolerance:
+        report['constant_curves'] += 1
+        return (frames[:0], values[:0], float(values[0]))
 
-        start_frame = int(last_keyframe.co[0])
-        end_frame = int(keyframe.co[0])
+    keep = simplify_samples(frames, values, tolerance)
+    report['samples_after'] += int(keep.sum())
 
-        for frame in range(start_frame, end_frame + 1): 
-            value = fcurve.evaluate(float(frame))
-            sampled_points.append([frame, value])
+    return (frames[keep], values[keep], None)
 
-        last_keyframe = keyframe
+def sampled_points_list(frames, values):
+    """[[frame, value], ...] with whole frames written as ints"""
+    frame_list = frames.tolist()
+    if np.all(frames == np.floor(frames)):
+        frame_list = [int(frame) for frame in frame_list]
 
-    return sampled_points
+    return [[frame, value] for frame, value in zip(frame_list, values.tolist())]
 
 def serialize_keyframes(keyframe_points):
     """Serialize keyframe points"""
     keyframes = []
+    previous_bezier = False
     
     for kf in keyframe_points:
         keyframe_data = {
@@ -191,8 +705,18 @@ def serialize_keyframes(keyframe_points):
             "easing": get_easing_type(kf)
         }
         
-        # Add handle data for Bezier interpolation
-        if keyframe_data["interpolation"] == "BEZIER":
+        # easing interpolations (SINE, BOUNCE, ...) export as LINEAR, keep the real one for exact evaluation
+        if kf.interpolation not in ('BEZIER', 'LINEAR', 'CONSTANT'):
+            keyframe_data["easing_interpolation"] = kf.interpolation
+            if kf.interpolation == 'BACK':
+                keyframe_data["back"] = kf.back
+            elif kf.interpolation == 'ELASTIC':
+                keyframe_data["amplitude"] = kf.amplitude
+                keyframe_data["period"] = kf.period
+
+        # Add handle data for Bezier interpolation (easing keys need them for linear extrapolation, a key
+        # after a BEZIER one for the segment's handle_left)
+        if keyframe_data["interpolation"] == "BEZIER" or "easing_interpolation" in keyframe_data or previous_bezier:
             keyframe_data.update({
                 "handle_left": [kf.handle_left[0], kf.handle_left[1]],
                 "handle_right": [kf.handle_right[0], kf.handle_right[1]],
@@ -201,6 +725,7 @@ def serialize_keyframes(keyframe_points):
             })
         
         keyframes.append(keyframe_data)
+        previous_bezier = keyframe_data["interpolation"] == "BEZIER"
     
     return keyframes
 
@@ -0,0 +1,305 @@
+"""
+Reference evaluation of exported keyframes, mirroring Blender's FCurve evaluation
+(fcurve.cc `fcurve_eval_keyframes`, BLI_easing.c). Works on the serialized keyframe dicts
+from `animation_clips.serialize_keyframes` so it checks what the runtime actually receives.
+"""
+import math
+
+# Blender snaps to a keyframe's value when evaluating this close to it (the binary search threshold in
+# fcurve_eval_keyframes_interpolate, BEZT_BINARYSEARCH_THRESH = 0.01 is only used when inserting keys)
+KEYFRAME_THRESHOLD = 0.0001
+
+POW_MIN = 0.0009765625  # 2^-10
+POW_SCALE = 1.0 / (1.0 - POW_MIN)
+
+# easing used by each interpolation when the keyframe easing is AUTO
+AUTO_EASING = {
+    'BACK': 'EASE_OUT',
+    'BOUNCE': 'EASE_OUT',
+    'ELASTIC': 'EASE_OUT',
+}
+
+def back(easing, time, begin, change, duration, overshoot):
+    if easing == 'EASE_IN':
+        time /= duration
+        return change * time * time * ((overshoot + 1) * time - overshoot) + begin
+    if easing == 'EASE_OUT':
+        time = time / duration - 1
+        return change * (time * time * ((overshoot + 1) * time + overshoot) + 1) + begin
+
+    overshoot *= 1.525
+    time /= duration / 2
+    if time < 1:
+        return change / 2 * (time * time * ((overshoot + 1) * time - overshoot)) + begin
+    time -= 2
+    return change / 2 * (time * time * ((overshoot + 1) * time + overshoot) + 2) + begin
+
+def bounce_out(time, begin, change, duration):
+    time /= duration
+    if time < 1 / 2.75:
+        return change * (7.5625 * time * time) + begin
+    if time < 2 / 2.75:
+        time -= 1.5 / 2.75
+        return change * (7.5625 * time * time + 0.75) + begin
+    if time < 2.5 / 2.75:
+        time -= 2.25 / 2.75
+        return change * (7.5625 * time * time + 0.9375) + begin
+    time -= 2.625 / 2.75
+    return change * (7.5625 * time * time + 0.984375) + begin
+
+def bounce(easing, time, begin, change, duration):
+    if easing == 'EASE_IN':
+        return change - bounce_out(duration - time, 0, change, duration) + begin
+    if easing == 'EASE_OUT':
+        return bounce_out(time, begin, change, duration)
+
+    if time < duration / 2:
+        return (change - bounce_out(duration - time * 2, 0, change, duration)) * 0.5 + begin
+    return bounce_out(time * 2 - duration, 0, change, duration) * 0.5 + change * 0.5 + begin
+
+def circ(easing, time, begin, change, duration):
+    if easing == 'EASE_IN':
+        time /= duration
+        return -change * (math.sqrt(max(0.0, 1 - time * time)) - 1) + begin
+    if easing == 'EASE_OUT':
+        time = time / duration - 1
+        return change * math.sqrt(max(0.0, 1 - time * time)) + begin
+
+    time /= duration / 2
+    if time < 1:
+        return -change / 2 * (math.sqrt(max(0.0, 1 - time * time)) - 1) + begin
+    time -= 2
+    return change / 2 * (math.sqrt(max(0.0, 1 - time * time)) + 1) + begin
+
+def power(exponent):
+    """CUBIC, QUART and QUINT easing"""
+    odd = exponent % 2 == 1
+
+    def ease(easing, time, begin, change, duration):
+        if easing == 'EASE_IN':
+            time /= duration
+            return change * time ** exponent + begin
+        if easing == 'EASE_OUT':
+            time = time / duration - 1
+            return change * (time ** exponent + 1) + begin if odd else -change * (time ** exponent - 1) + begin
+
+        time /= duration / 2
+        if time < 1:
+            return change / 2 * time ** exponent + begin
+        time -= 2
+        return change / 2 * (time ** exponent + 2) + begin if odd else -change / 2 * (time ** exponent - 2) + begin
+
+    return ease
+
+def quad(easing, time, begin, change, duration):
+    if easing == 'EASE_IN':
+        time /= duration
+        return change * time * time + begin
+    if easing == 'EASE_OUT':
+        time /= duration
+        return -change * time * (time - 2) + begin
+
+    time /= duration / 2
+    if time < 1:
+        return change / 2 * time * time + begin
+    time -= 1
+    return -change / 2 * (time * (time - 2) - 1) + begin
+
+def expo(easing, time, begin, change, duration):
+    if time == 0:
+        return begin
+    if easing == 'EASE_IN':
+        return change * (math.pow(2, 10 * (time / duration - 1)) - POW_MIN) * POW_SCALE + begin
+    if easing == 'EASE_OUT':
+        return change * (1 - (math.pow(2, -10 * time / duration) - POW_MIN) * POW_SCALE) + begin
+
+    duration *= 0.5
+    time /= duration
+    if time < 1:
+        time -= 1
+        return change / 2 * (math.pow(2, 10 * time) - POW_MIN) * POW_SCALE + begin
+    time -= 1
+    return change / 2 * (2 - (math.pow(2, -10 * time) - POW_MIN) * POW_SCALE) + begin
+
+def sine(easing, time, begin, change, duration):
+    if easing == 'EASE_IN':
+        return -change * math.cos(time / duration * (math.pi / 2)) + change + begin
+    if easing == 'EASE_OUT':
+        return change * math.sin(time / duration * (math.pi / 2)) + begin
+
+    return -change / 2 * (math.cos(math.pi * time / duration) - 1) + begin
+
+def elastic_blend(time, change, duration, amplitude, s, f):
+    if change:
+        t = abs(s)
+        f = f * amplitude / abs(change) if amplitude else 0.0
+
+        if abs(time * duration) < t:
+            l = abs(time * duration) / t
+            f = (f * l) + (1.0 - l)
+
+    return f
+
+def elastic(easing, time, begin, change, duration, amplitude, period):
+    if time == 0:
+        return begin
+
+    f = 1.0
+    if easing == 'EASE_IN_OUT':
+        time /= duration / 2
+        if time == 2:
+            return begin + change
+        time -= 1
+        if not period:
+            period = duration * (0.3 * 1.5)
+    else:
+        time /= duration
+        if time == 1:
+            return begin + change
+        time = time - 1 if easing == 'EASE_IN' else -time
+        if not period:
+            period = duration * 0.3
+
+    if not amplitude or amplitude < abs(change):
+        s = period / 4
+        f = elastic_blend(time, change, duration, amplitude, s, f)
+        amplitude = change
+    else:
+        s = period / (2 * math.pi) * math.asin(change / amplitude)
+
+    wave = amplitude * math.pow(2, 10 * time) * math.sin((time * duration - s) * (2 * math.pi) / period)
+
+    if easing == 'EASE_IN':
+        return -f * wave + begin
+    if easing == 'EASE_OUT':
+        return f * wave + change + begin
+
+    if time < 0:
+        return -0.5 * f * wave + begin
+    time = -time
+    wave = amplitude * math.pow(2, 10 * time) * math.sin((time * duration - s) * (2 * math.pi) / period)
+    return 0.5 * f * wave + change + begin
+
+def correct_bezier_part(p1, h1, h2, p2):
+    """Scale handles so the segment's x never doubles back (BKE_fcurve_correct_bezpart)"""
+    handle1 = (p1[0] - h1[0], p1[1] - h1[1])
+    handle2 = (p2[0] - h2[0], p2[1] - h2[1])
+    length = p2[0] - p1[0]
+    length1 = abs(handle1[0])
+    length2 = abs(handle2[0])
+
+    if length1 + length2 == 0 or length1 + length2 <= length:
+        return (h1, h2)
+
+    factor = length / (length1 + length2)
+    return (
+        (p1[0] - factor * handle1[0], p1[1] - factor * handle1[1]),
+        (p2[0] - factor * handle2[0], p2[1] - factor * handle2[1]),
+    )
+
+def cubic(a, b, c, d, t):
+    u = 1 - t
+    return u * u * u * a + 3 * u * u * t * b + 3 * u * t * t * c + t * t * t * d
+
+def bezier(p1, h1, h2, p2, frame):
+    if abs(p1[1] - p2[1]) < 1e-7 and abs(h1[1] - h2[1]) < 1e-7 and abs(h2[1] - p2[1]) < 1e-7:
+        return p1[1]
+
+    (h1, h2) = correct_bezier_part(p1, h1, h2, p2)
+
+    # x(t) is monotonic after correction, bisect for the parameter
+    low, high = 0.0, 1.0
+    for _ in range(60):
+        t = (low + high) / 2
+        if cubic(p1[0], h1[0], h2[0], p2[0], t) < frame:
+            low = t
+        else:
+            high = t
+
+    return cubic(p1[1], h1[1], h2[1], p2[1], (low + high) / 2)
+
+def interpolate(previous, next, frame):
+    interpolation = previous.get('easing_interpolation') or {'STEP': 'CONSTANT'}.get(previous['interpolation'], previous['interpolation'])
+    begin = previous['value']
+    change = next['value'] - begin
+    duration = next['frame'] - previous['frame']
+    time = frame - previous['frame']
+
+    if interpolation == 'CONSTANT':
+        return begin
+    if interpolation == 'LINEAR':
+        return begin + change * time / duration if duration else begin
+    if interpolation == 'BEZIER':
+        return bezier(
+            (previous['frame'], previous['value']), tuple(previous['handle_right']),
+            tuple(next['handle_left']), (next['frame'], next['value']),
+            frame,
+        )
+
+    easing = previous.get('easing', 'AUTO')
+    if easing == 'AUTO':
+        easing = AUTO_EASING.get(interpolation, 'EASE_IN')
+
+    if interpolation == 'BACK':
+        return back(easing, time, begin, change, duration, previous.get('back', 1.70158))
+    if interpolation == 'BOUNCE':
+        return bounce(easing, time, begin, change, duration)
+    if interpolation == 'CIRC':
+        return circ(easing, time, begin, change, duration)
+    if interpolation == 'CUBIC':
+        return power(3)(easing, time, begin, change, duration)
+    if interpolation == 'ELASTIC':
+        return elastic(easing, time, begin, change, duration, previous.get('amplitude', 0.8), previous.get('period', 4.1))
+    if interpolation == 'EXPO':
+        return expo(easing, time, begin, change, duration)
+    if interpolation == 'QUAD':
+        return quad(easing, time, begin, change, duration)
+    if interpolation == 'QUART':
+        return power(4)(easing, time, begin, change, duration)
+    if interpolation == 'QUINT':
+        return power(5)(easing, time, begin, change, duration)
+    if interpolation == 'SINE':
+        return sine(easing, time, begin, change, duration)
+
+    raise ValueError(f'unsupported interpolation {interpolation}')
+
+def extrapolate(key, neighbour, frame, extrapolation, before):
+    """Value outside the keyed range, LINEAR extrapolation follows the outer segment (LINEAR keys) or the outer handle"""
+    if extrapolation != 'LINEAR' or key['interpolation'] == 'STEP' or neighbour is None:
+        return key['value']
+
+    if (key['interpolation'] == 'BEZIER' or 'easing_interpolation' in key) and 'handle_left' in key:
+        handle = key['handle_left'] if before else key['handle_right']
+        run = key['frame'] - handle[0]
+        slope = (key['value'] - handle[1]) / run if run else 0.0
+    else:
+        run = neighbour['frame'] - key['frame']
+        slope = (neighbour['value'] - key['value']) / run if run else 0.0
+
+    return key['value'] + slope * (frame - key['frame'])
+
+def evaluate(keyframes, frame, extrapolation='CONSTANT'):
+    """Evaluate serialized keyframes at a frame the way Blender evaluates the FCurve (without modifiers)"""
+    if not keyframes:
+        return 0.0
+
+    first = keyframes[0]
+    last = keyframes[-1]
+    if frame <= first['frame']:
+        return extrapolate(first, keyframes[1] if len(keyframes) > 1 else None, frame, extrapolation, True)
+    if frame >= last['frame']:
+        return extrapolate(last, keyframes[-2] if len(keyframes) > 1 else None, frame, extrapolation, False)
+
+    low, high = 0, len(keyframes) - 1
+    while high - low > 1:
+        middle = (low + high) // 2
+        if keyframes[middle]['frame'] <= frame:
+            low = middle
+        else:
+            high = middle
+
+    for key in (keyframes[low], keyframes[high]):
+        if abs(key['frame'] - frame) < KEYFRAME_THRESHOLD:
+            return key['value']
+
+    return interpolate(keyframes[low], keyframes[high], frame)
@@ -0,0 +1,185 @@
+"""
+Content addressed cache of serialized node trees, actions and other derived artifacts, stored in a SQLite
+database next to the .blend (`//.sprixle-cache.sqlite`, shared by the .blend files of that directory).
+
+Entries are keyed by kind and a fingerprint of their source (plus the settings and the serializer sources
+that shaped the output), so reopening a file, reconnecting a client or exporting again reuses every
+serialization whose source didn't change. The database is kept under `max_bytes` by evicting the least
+recently used entries; other .blend files of the directory and parallel batch exports write to the same
+database, so the size is read from it inside each write transaction.
+"""
+import bpy
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+import threading
+import time
+
+CACHE_FILE = '.sprixle-cache.sqlite'
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# larger artifacts are not cached
+MAX_ENTRY_BYTES = 32 * 1024 * 1024
+# evicting goes down to this fraction of max_bytes so the next few writes don't evict again
+EVICT_TO = 0.8
+# seconds a write waits for another process's transaction before giving up on the entry
+BUSY_TIMEOUT = 30.0
+
+# open cache of the current .blend, see blend_cache
+current_cache = None
+
+def fingerprint(*parts):
+    """Hash of strings / bytes, the key format of every entry"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+source_versions = {}
+
+def source_version(*modules):
+    """Hash of the given modules' source files, entries written by other serializer versions miss"""
+    names = tuple(module.__name__ for module in modules)
+    version = source_versions.get(names)
+    if version is None:
+        digest = hashlib.blake2b(digest_size=8)
+        for module in modules:
+            with open(module.__file__, 'rb') as file:
+                digest.update(file.read())
+        version = source_versions[names] = digest.hexdigest()
+    return version
+
+def pack(value, payload=b''):
+    """`[uint32 json length][json][payload]`"""
+    header = json.dumps(value, separators=(',', ':')).encode('utf-8')
+    return struct.pack('<I', len(header)) + header + payload
+
+def unpack(data):
+    (length,) = struct.unpack_from('<I', data)
+    return (json.loads(data[4:4 + length]), data[4 + length:])
+
+class ArtifactCache:
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # the live link reads from the websocket thread
+        self.lock = threading.Lock()
+
+        self.connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False, isolation_level=None)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute('''
+            CREATE TABLE IF NOT EXISTS artifacts (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            )
+        ''')
+        # covers the size sum and the eviction order, neither has to read the rows and their blobs
+        self.connection.execute('DROP INDEX IF EXISTS artifacts_last_used')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS artifacts_usage ON artifacts (last_used, size, kind, key)')
+        (self.total_bytes,) = self.connection.execute('SELECT COALESCE(SUM(size), 0) FROM artifacts').fetchone()
+
+    def get(self, kind, key):
+        """Stored bytes or None, marks the entry as recently used"""
+        with self.lock:
+            row = self.connection.execute('SELECT data FROM artifacts WHERE kind = ? AND key = ?', (kind, key)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.connection.execute('UPDATE artifacts SET last_used = ? WHERE kind = ? AND key = ?', (time.time(), kind, key))
+            return bytes(row[0])
+
+    def put(self, kind, key, data):
+        if len(data) > MAX_ENTRY_BYTES:
+            return
+
+        with self.lock:
+            try:
+                # BEGIN IMMEDIATE takes the write lock up front, no other process can change the total until COMMIT
+                self.connection.execute('BEGIN IMMEDIATE')
+                self.connection.execute('INSERT OR REPLACE INTO artifacts (kind, key, data, size, last_used) VALUES (?, ?, ?, ?, ?)',
+                    (kind, key, data, len(data), time.time()))
+                (self.total_bytes,) = self.connection.execute('SELECT COALESCE(SUM(size), 0) FROM artifacts').fetchone()
+
+                if self.total_bytes > self.max_bytes:
+                    self.evict(int(self.max_bytes * EVICT_TO))
+                self.connection.execute('COMMIT')
+            except sqlite3.Error as error:
+                if self.connection.in_transaction:
+                    self.connection.execute('ROLLBACK')
+                print('[Sprixle.Cache] unable to store', kind, key, error)
+
+    def evict(self, target_bytes):
+        """Delete least recently used entries until the cache holds at most target_bytes, inside put's transaction"""
+        removed = 0
+        rows = self.connection.execute('SELECT kind, key, size FROM artifacts ORDER BY last_used').fetchall()
+        for (kind, key, size) in rows:
+            if self.total_bytes <= target_bytes: break
+            self.connection.execute('DELETE FROM artifacts WHERE kind = ? AND key = ?', (kind, key))
+            self.total_bytes -= size
+            removed += 1
+
+        print('[Sprixle.Cache] evicted', removed, 'entries,', self.total_bytes, 'bytes left')
+
+    def get_json(self, kind, key):
+        """
+        Returns:
+            tuple: (value, payload bytes) or None
+        """
+        data = self.get(kind, key)
+        return unpack(data) if data is not None else None
+
+    def put_json(self, kind, key, value, payload=b''):
+        self.put(kind, key, pack(value, payload))
+
+    def stats(self):
+        with self.lock:
+            kinds = self.connection.execute('SELECT kind, COUNT(*), SUM(size) FROM artifacts GROUP BY kind').fetchall()
+        return {
+            "path": self.path,
+            "bytes": sum(size for (kind, count, size) in kinds),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "kinds": {kind: {"entries": count, "bytes": size} for (kind, count, size) in kinds},
+        }
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+def blend_cache():
+    """The cache next to the open .blend, None for unsaved files or when the database can't be opened"""
+    global current_cache
+    if not bpy.data.filepath:
+        return None
+
+    path = os.path.join(os.path.dirname(bpy.data.filepath), CACHE_FILE)
+    if current_cache is not None and current_cache.path == path:
+        return current_cache
+
+    close()
+    try:
+        current_cache = ArtifactCache(path)
+    except sqlite3.Error as error:
+        print('[Sprixle.Cache] unable to open', path, error)
+        return None
+
+    return current_cache
+
+def close():
+    global current_cache
+    if current_cache is not None:
+        current_cache.close()
+        current_cache = None
@@ -0,0 +1,140 @@
+"""
+On-demand requests over the live link. A client can ask for one shader / logic tree, action, view layer or
+realtime mesh by name, passing the version it already holds:
+
+    {"type": "request", "id": 3, "kind": "shaderTree", "name": "Water", "version": "<version or null>"}
+
+and gets the asset back as the push message of that kind, with its version and the request id:
+
+    {"type": "shaderTree", "name": "Water", "version": "...", "requestId": 3, "data": {...}}
+
+or `{"type": "notModified", ...}` when its version is current, `{"type": "requestError", ..., "error"}` when
+there is no such asset. `{"kind": "index"}` lists what can be requested (`assetIndex`).
+
+Versions are content fingerprints (the artifact cache keys for trees, the fcurve fingerprint for actions), so
+a current version is answered without serializing and stale ones reuse cached serializations. View layers
+are serialized to compute theirs. Realtime meshes are versioned by depsgraph updates this session and
+answered with a binary `realtimeGeometry` message by `__init__.handle_request`.
+"""
+import bpy
+import json
+import uuid
+from . import node_trees
+from . import serializers
+from . import artifact_cache
+
+KINDS = ('shaderTree', 'logicTree', 'action', 'viewLayer', 'realtimeGeometry')
+
+# realtime mesh versions are only comparable within one Blender session
+session = uuid.uuid4().hex[:8]
+# object name -> depsgraph updates seen, see touch_realtime
+realtime_updates = {}
+
+def live_settings():
+    """The action export settings of the live link, see animation_clips.live_action_update"""
+    from . import animation_clips
+    return dict(animation_clips.DEFAULT_EXPORT_SETTINGS, binary_samples=False)
+
+def tree_targets(scene):
+    """
+    (kind, name, target) of every tree serialize finds in the scene: +logic objects, materials of its objects,
+    the compositor and the world. Nothing is serialized.
+    """
+    targets = []
+    seen = set()
+
+    def add(kind, target):
+        (node_group, name) = node_trees.tree_source(target)
+        if node_group and (kind, name) not in seen:
+            seen.add((kind, name))
+            targets.append((kind, name, target))
+
+    for object in scene.objects:
+        add('logicTree', object)
+        for material_slot in object.material_slots:
+            if material_slot.material:
+                add('shaderTree', material_slot.material)
+    add('shaderTree', scene)
+    add('shaderTree', scene.world)
+
+    return targets
+
+def touch_realtime(object_name):
+    realtime_updates[object_name] = realtime_updates.get(object_name, 0) + 1
+
+def realtime_version(object_name):
+    return f'{session}-{realtime_updates.get(object_name, 0)}'
+
+def index(scene):
+    """Everything a client can request in the scene as [{"kind", "name"}]"""
+    assets = [{"kind": kind, "name": name.replace('.', '')} for (kind, name, target) in tree_targets(scene)]
+    assets.extend({"kind": 'action', "name": action.name} for action in bpy.data.actions)
+    assets.extend({"kind": 'viewLayer', "name": view_layer.name} for view_layer in scene.view_layers)
+    assets.extend({"kind": 'realtimeGeometry', "name": object.name} for object in scene.objects if object.type == 'MESH')
+    return assets
+
+# Resolvers: (version, function producing the data) of a named asset, None when it doesn't exist
+#################################################
+
+def tree_asset(kind, name, scene):
+    # trees are pushed with their dots removed, accept either spelling
+    for (target_kind, tree_name, target) in tree_targets(scene):
+        if target_kind == kind and name in (tree_name, tree_name.replace('.', '')):
+            return (node_trees.tree_version(target), lambda: node_trees.serialize(target)[0])
+    return None
+
+def action_asset(name, scene):
+    action = bpy.data.actions.get(name)
+    if action is None:
+        return None
+
+    from . import animation_clips
+    (fingerprint, fcurves) = animation_clips.action_fingerprint(action)
+    return (fingerprint, lambda: animation_clips.cached_action_data(action, live_settings(), fingerprint, fcurves))
+
+def view_layer_asset(name, scene):
+    view_layer = scene.view_layers.get(name)
+    if view_layer is None:
+        return None
+
+    data = serializers.serialize_bpy_object(view_layer)
+    return (artifact_cache.fingerprint(json.dumps(data, sort_keys=True)), lambda: data)
+
+RESOLVERS = {
+    'shaderTree': lambda name, scene: tree_asset('shaderTree', name, scene),
+    'logicTree': lambda name, scene: tree_asset('logicTree', name, scene),
+    'action': action_asset,
+    'viewLayer': view_layer_asset,
+}
+
+# Responses
+#################################################
+
+def reply(request, message_type, **fields):
+    return dict({"type": message_type, "kind": request.get('kind'), "name": request.get('name'), "requestId": request.get('id')}, **fields)
+
+def answer(request, scene):
+    """Response message to a request for anything but a realtime mesh"""
+    kind = request.get('kind')
+    name = request.get('name')
+
+    if kind == 'index':
+        return reply(request, 'assetIndex', data=index(scene))
+
+    resolver = RESOLVERS.get(kind)
+    if resolver is None or not isinstance(name, str):
+        return reply(request, 'requestError', error=f'unknown request kind {kind!r}' if resolver is None else 'missing name')
+
+    asset = resolver(name, scene)
+    if asset is None:
+        return reply(request, 'requestError', error='not found')
+
+    (version, produce) = asset
+    if version is not None and version == request.get('version'):
+        return reply(request, 'notModified', version=version)
+
+    data = produce()
+    if data is None:
+        return reply(request, 'requestError', error='nothing to serialize')
+
+    return {"type": kind, "name": name, "version": version, "requestId": request.get('id'), "data": data}
@@ -1,39 +1,73 @@
 import bpy
+import os
+import sys
+import json
+import time
 import typing
 import inspect
 import pkgutil
 import importlib
+from contextlib import contextmanager
 from pathlib import Path
 
 __all__ = (
     "init",
     "register",
     "unregister",
+    "startup_step",
+    "print_startup_report",
 )
 
 blender_version = bpy.app.version
 
+ORDER_CACHE_FILE = "register-order.json"
+
 modules = None
 ordered_classes = None
+order_cached = False
+
+# milliseconds per submodule import (including the modules it imports first) and per startup step
+startup_timings = {"imports": {}, "steps": {}}
 
 
 def init():
+    """
+    Import the submodules and find the order to register their classes in. With a valid order cache only the
+    submodules holding classes or register hooks are imported, the others load when something imports them.
+    """
     global modules
     global ordered_classes
+    global order_cached
+
+    directory = Path(__file__).parent
+    names = sorted(iter_submodule_names(directory))
+    signature = modules_signature(directory, names)
+    cache = load_order_cache(signature)
 
-    modules = get_all_submodules(Path(__file__).parent)
-    ordered_classes = get_ordered_classes_to_register(modules)
+    with startup_step("import submodules"):
+        modules = import_submodules(cache["modules"] if cache else names)
+
+    with startup_step("class order"):
+        ordered_classes = resolve_cached_order(cache) if cache else None
+        order_cached = ordered_classes is not None
+        if not order_cached:
+            if cache:
+                modules = import_submodules(names)
+            ordered_classes = get_ordered_classes_to_register(modules)
+            save_cached_order(signature, modules, ordered_classes)
 
 
 def register():
-    for cls in ordered_classes:
-        bpy.utils.register_class(cls)
+    with startup_step("register classes"):
+        for cls in ordered_classes:
+            bpy.utils.register_class(cls)
 
     for module in modules:
         if module.__name__ == __name__:
             continue
         if hasattr(module, "register"):
-            module.register()
+            with startup_step("register " + module.__name__.rpartition(".")[2]):
+                module.register()
 
 
 def unregister():
@@ -51,13 +85,13 @@ def unregister():
 #################################################
 
 
-def get_all_submodules(directory):
-    return list(iter_submodules(directory, __package__))
-
-
-def iter_submodules(path, package_name):
-    for name in sorted(iter_submodule_names(path)):
-        yield importlib.import_module("." + name, package_name)
+def import_submodules(names):
+    modules = []
+    for name in names:
+        start = time.perf_counter()
+        modules.append(importlib.import_module("." + name, __package__))
+        startup_timings["imports"].setdefault(name, (time.perf_counter() - start) * 1000)
+    return modules
 
 
 def iter_submodule_names(path, root=""):
@@ -164,6 +198,132 @@ def get_register_base_types():
     )
 
 
+# Cache the registration order between sessions
+#################################################
+
+
+def order_cache_path():
+    try:
+        directory = bpy.utils.extension_path_user(__package__, create=True)
+        return os.path.join(directory, ORDER_CACHE_FILE)
+    except (ValueError, AttributeError):
+        pass
+
+    # installed as a legacy add-on or imported as a plain package (batch.py), the package name tells them apart
+    try:
+        directory = bpy.utils.user_resource("CONFIG", path="sprixle", create=True)
+    except (ValueError, OSError):
+        return None
+    return os.path.join(directory, __package__ + "-" + ORDER_CACHE_FILE)
+
+
+def modules_signature(directory, names):
+    """
+    Blender version and mtime / size of every submodule file, read without importing them.
+    The cached order is reused while they match.
+    """
+    files = {}
+    for name in names:
+        path = directory.joinpath(*name.split(".")).with_suffix(".py")
+        if path.exists():
+            stat = path.stat()
+            files[name] = [stat.st_mtime_ns, stat.st_size]
+    return {"blender": list(blender_version), "files": files}
+
+
+def class_key(cls):
+    return [cls.__module__, cls.__qualname__]
+
+
+def resolve_class(key):
+    value = sys.modules.get(key[0])
+    for name in key[1].split("."):
+        value = getattr(value, name, None)
+    return value if inspect.isclass(value) else None
+
+
+def load_order_cache(signature):
+    """{"signature", "modules", "classes"} when the cache matches the submodule files, otherwise None"""
+    path = order_cache_path()
+    if path is None or not os.path.exists(path):
+        return None
+
+    try:
+        with open(path) as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    if cache.get("signature") != signature or "modules" not in cache:
+        return None
+    return cache
+
+
+def resolve_cached_order(cache):
+    classes = [resolve_class(key) for key in cache.get("classes", [])]
+    if any(cls is None for cls in classes):
+        return None
+
+    return [cls for cls in classes if not getattr(cls, "is_registered", False)]
+
+
+def save_cached_order(signature, modules, classes):
+    path = order_cache_path()
+    if path is None:
+        return
+
+    # the submodules init has to import: the ones holding classes to register or register hooks
+    class_modules = {cls.__module__ for cls in classes}
+    needed = [
+        module.__name__[len(__package__) + 1:] for module in modules
+        if module.__name__ != __name__ and (module.__name__ in class_modules or hasattr(module, "register") or hasattr(module, "unregister"))
+    ]
+
+    try:
+        with open(path, "w") as file:
+            json.dump({"signature": signature, "modules": needed, "classes": [class_key(cls) for cls in classes]}, file)
+    except OSError as error:
+        print("[Sprixle.Startup] could not write the registration order cache", error)
+
+
+# Startup report
+#################################################
+
+
+@contextmanager
+def startup_step(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        steps = startup_timings["steps"]
+        steps[name] = steps.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+
+def startup_report():
+    imports = startup_timings["imports"]
+    steps = startup_timings["steps"]
+    return {
+        # submodule imports run inside the "import submodules" step
+        "total_ms": round(sum(steps.values()), 3),
+        "class_order_cached": order_cached,
+        "imports_ms": {name: round(ms, 3) for name, ms in sorted(imports.items(), key=lambda item: -item[1])},
+        "steps_ms": {name: round(ms, 3) for name, ms in steps.items()},
+    }
+
+
+def print_startup_report():
+    """One line summary, the full breakdown as json when SPRIXLE_STARTUP_REPORT is set"""
+    report = startup_report()
+    slowest = list(report["imports_ms"].items())[:3]
+    print("[Sprixle.Startup]", report["total_ms"], "ms,", "cached" if order_cached else "computed", "class order,",
+        ", ".join(f"{name} {ms}ms" for name, ms in report["steps_ms"].items()),
+        "| slowest imports:", ", ".join(f"{name} {ms}ms" for name, ms in slowest))
+
+    if os.environ.get("SPRIXLE_STARTUP_REPORT"):
+        print(json.dumps(report, indent=2))
+
+
 # Find order to register to solve dependencies
 #################################################
 
@@ -0,0 +1,123 @@
+"""
+Headless Sprixle export of every scene in a .blend file:
+
+    blender -b file.blend --python blender/addon/batch.py -- [--scene NAME] [--lod] [--optimize] ...
+
+Prints a `SPRIXLE_BATCH_RESULT <json>` line that `blender/tools/batch_export.py` collects.
+"""
+import argparse
+import json
+import sys
+import time
+
+RESULT_PREFIX = 'SPRIXLE_BATCH_RESULT '
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog='batch.py', description='Sprixle export of every scene in the opened .blend')
+    parser.add_argument('--scene', action='append', help='only export these scenes (repeatable)')
+    parser.add_argument('--lod', action='store_true', help='generate LODs')
+    parser.add_argument('--lod-ratios', default='0.5,0.25')
+    parser.add_argument('--lod-distances', default='15,40')
+    parser.add_argument('--lod-min-triangles', type=int, default=500)
+    parser.add_argument('--optimize', action='store_true', help='vertex cache / fetch optimize the GLB')
+    parser.add_argument('--quantize', action='store_true', help='quantize normals and UVs')
+    parser.add_argument('--quantize-positions', action='store_true')
+    parser.add_argument('--position-error', type=float, default=0.0005)
+    parser.add_argument('--sample-rate', type=float, default=1.0, help='animation curve samples per frame')
+    parser.add_argument('--use-frame-range', action='store_true', help="sample actions over their frame range")
+    parser.add_argument('--binary-samples', action='store_true', help='write sampled curves to animations/<scene>.bin')
+    parser.add_argument('--simplify', action='store_true', help='drop animation samples within tolerance')
+    parser.add_argument('--keys-only', action='store_true', help='export keyframes and handles instead of samples')
+    parser.add_argument('--tolerance-location', type=float, default=0.0005)
+    parser.add_argument('--tolerance-rotation', type=float, default=0.0005)
+    parser.add_argument('--tolerance-scale', type=float, default=0.0005)
+    parser.add_argument('--tolerance-value', type=float, default=0.0005)
+    parser.add_argument('--prefilter-environment', action='store_true', help='precompute world IBL mip chain and SH')
+    parser.add_argument('--compact-trees', action='store_true', help='write node trees in the compact string table format')
+
+    return parser.parse_args(argv)
+
+def export_options(args):
+    from . import lod
+
+    return {
+        "animation_settings": {
+            "sample_rate": args.sample_rate,
+            "use_frame_range": args.use_frame_range,
+            "binary_samples": args.binary_samples,
+            "simplify": args.simplify,
+            "keys_only": args.keys_only,
+            "simplify_tolerances": {
+                "location": args.tolerance_location,
+                "rotation": args.tolerance_rotation,
+                "scale": args.tolerance_scale,
+                "value": args.tolerance_value,
+            },
+        },
+        "tree_format": 'compact' if args.compact_trees else 'full',
+        "lod_ratios": lod.parse_float_list(args.lod_ratios) if args.lod else None,
+        "lod_distances": lod.parse_float_list(args.lod_distances),
+        "lod_min_triangles": args.lod_min_triangles,
+        "optimize": args.optimize,
+        "quantize": args.quantize,
+        "quantize_positions": args.quantize_positions,
+        "position_error": args.position_error,
+        "prefilter_environment": args.prefilter_environment,
+    }
+
+def export_all_scenes(options, scene_names=None):
+    """Run the same pipeline as SprixleExport for every scene (or the given ones) of the open file"""
+    import bpy
+    from . import export_scene
+
+    results = []
+    for scene in bpy.data.scenes:
+        if scene_names and scene.name not in scene_names: continue
+
+        start = time.perf_counter()
+        try:
+            with bpy.context.temp_override(scene=scene, view_layer=scene.view_layers[0]):
+                report = export_scene(**options)
+            results.append({
+                "scene": scene.name,
+                "ok": True,
+                "ms": round((time.perf_counter() - start) * 1000, 3),
+                "outputs": [report['glb_path'], report['report_path']],
+            })
+        except Exception as error:
+            print('[Sprixle.Batch] export failed for scene', scene.name, error)
+            results.append({"scene": scene.name, "ok": False, "error": str(error)})
+
+    return results
+
+def main(argv):
+    import bpy
+    import addon_utils
+
+    addon_utils.enable('io_scene_gltf2', default_set=False)
+
+    args = parse_args(argv)
+    start = time.perf_counter()
+    results = export_all_scenes(export_options(args), args.scene)
+
+    print(RESULT_PREFIX + json.dumps({
+        "blend": bpy.data.filepath,
+        "ms": round((time.perf_counter() - start) * 1000, 3),
+        "scenes": results,
+    }))
+
+    return 0 if all(result['ok'] for result in results) else 1
+
+if __name__ == '__main__':
+    # run as `--python` script: import the addon as a package so relative imports work
+    import glob
+    import importlib
+    import os
+
+    addon_directory = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.dirname(addon_directory))
+    sys.path.extend(glob.glob(os.path.join(addon_directory, 'wheels', '*.whl')))
+
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    batch = importlib.import_module(os.path.basename(addon_directory) + '.batch')
+    sys.exit(batch.main(argv))
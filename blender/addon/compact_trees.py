@@ -0,0 +1,169 @@
+"""
+Compact node tree format: a per-tree string table with nodes and links referenced by integer index.
+
+    {
+        "$format": "sprixle.compactTree",
+        "version": 1,
+        "strings": [string, ...],
+        "tree": compact tree,
+    }
+
+A compact tree is {"nodes": [node, ...], "meta": [key, value, ...], "internalTrees": [name, compact tree, ...]},
+a node is [id, type, name, properties, inputs, outputs, rest] and a socket list is [name, duplicated, socket, ...].
+Dicts are flattened to [key, value, ...] with keys as string indices. String values of STRING_FIELDS are
+interned too, their key is written as `-index - 1` so a negative key marks a string index value and any other
+value under those keys stays as is. Link targets become [node index, socket name]. `expand` restores the full
+format exactly.
+"""
+
+FORMAT = 'sprixle.compactTree'
+FORMAT_VERSION = 2
+
+# socket / property fields whose values are always strings, these are interned as well
+STRING_FIELDS = {'type', 'intended_type', 'vector_space', 'incoming_vector_space', 'label', 'internalNodeTree'}
+
+class StringTable:
+    def __init__(self):
+        self.strings = []
+        self.indices = {}
+
+    def index(self, string):
+        if string not in self.indices:
+            self.indices[string] = len(self.strings)
+            self.strings.append(string)
+        return self.indices[string]
+
+def is_node(key, value):
+    return not key.startswith('$') and isinstance(value, dict) and 'id' in value and 'inputs' in value
+
+def pack_dict(data, strings, node_indices=None):
+    packed = []
+    for key, value in data.items():
+        if key == 'links' and node_indices is not None:
+            value = [
+                [node_indices[link['node']], strings.index(link['socket'])] if link['node'] in node_indices else link
+                for link in value
+            ]
+        elif key in STRING_FIELDS and isinstance(value, str):
+            packed.extend((-strings.index(key) - 1, strings.index(value)))
+            continue
+        packed.extend((strings.index(key), value))
+    return packed
+
+def unpack_dict(packed, strings, node_ids=None):
+    data = {}
+    for i in range(0, len(packed), 2):
+        value = packed[i + 1]
+        if packed[i] < 0:
+            data[strings[-packed[i] - 1]] = strings[value]
+            continue
+
+        key = strings[packed[i]]
+        if key == 'links' and node_ids is not None:
+            value = [
+                {"node": node_ids[link[0]], "socket": strings[link[1]]} if isinstance(link, list) else link
+                for link in value
+            ]
+        data[key] = value
+    return data
+
+def pack_sockets(sockets, strings, node_indices):
+    packed = []
+    for name, value in sockets.items():
+        duplicated = isinstance(value, list)
+        packed.append([strings.index(name), 1 if duplicated else 0] + [pack_dict(socket, strings, node_indices) for socket in (value if duplicated else [value])])
+    return packed
+
+def unpack_sockets(packed, strings, node_ids):
+    sockets = {}
+    for entry in packed:
+        values = [unpack_dict(socket, strings, node_ids) for socket in entry[2:]]
+        sockets[strings[entry[0]]] = values if entry[1] else values[0]
+    return sockets
+
+NODE_FIELDS = ('id', 'type', 'name', 'properties', 'inputs', 'outputs')
+
+def compact_tree(tree, strings):
+    node_keys = [key for key, value in tree.items() if is_node(key, value)]
+    node_indices = {tree[key]['id']: i for i, key in enumerate(node_keys)}
+
+    nodes = []
+    for key in node_keys:
+        node = tree[key]
+        nodes.append([
+            strings.index(node['id']),
+            strings.index(node['type']),
+            strings.index(node['name']),
+            pack_dict(node['properties'], strings),
+            pack_sockets(node['inputs'], strings, node_indices),
+            pack_sockets(node['outputs'], strings, node_indices),
+            pack_dict({field: value for field, value in node.items() if field not in NODE_FIELDS}, strings),
+        ])
+
+    meta = []
+    internal_trees = []
+    for key, value in tree.items():
+        if is_node(key, value): continue
+        if key == '$internalTrees':
+            for name, internal_tree in value.items():
+                internal_trees.extend((strings.index(name), compact_tree(internal_tree, strings)))
+        meta.extend((strings.index(key), None if key == '$internalTrees' else value))
+
+    return {"nodes": nodes, "meta": meta, "internalTrees": internal_trees}
+
+def expand_tree(compact, strings, internal_trees=None):
+    node_ids = [strings[node[0]] for node in compact['nodes']]
+
+    # keys in their original order: metadata first as serialize writes it, then nodes
+    tree = {}
+    for i in range(0, len(compact['meta']), 2):
+        key = strings[compact['meta'][i]]
+        if key == '$internalTrees':
+            internal = compact['internalTrees']
+            tree[key] = {strings[internal[j]]: expand_tree(internal[j + 1], strings) for j in range(0, len(internal), 2)}
+        else:
+            tree[key] = compact['meta'][i + 1]
+
+    for node in compact['nodes']:
+        (id, type, name, properties, inputs, outputs, rest) = node
+        node_data = {
+            "id": strings[id],
+            "type": strings[type],
+            "name": strings[name],
+            "inputs": unpack_sockets(inputs, strings, node_ids),
+            "outputs": unpack_sockets(outputs, strings, node_ids),
+            "properties": unpack_dict(properties, strings),
+        }
+        node_data.update(unpack_dict(rest, strings))
+        tree[node_data['id']] = node_data
+
+    return tree
+
+def compact(tree):
+    """
+    Convert a serialized node tree to the compact format.
+
+    Returns:
+        dict: the compact document, see the module docstring
+    """
+    strings = StringTable()
+    compact_data = compact_tree(tree, strings)
+
+    return {
+        "$format": FORMAT,
+        "version": FORMAT_VERSION,
+        "strings": strings.strings,
+        "tree": compact_data,
+    }
+
+def is_compact(data):
+    return isinstance(data, dict) and data.get('$format') == FORMAT
+
+def expand(data):
+    """Full-format tree from a compact document, anything else is returned unchanged"""
+    if not is_compact(data):
+        return data
+    if data['version'] != FORMAT_VERSION:
+        raise ValueError(f"compact tree version {data['version']} is not supported ({FORMAT_VERSION}), export the tree again")
+
+    return expand_tree(data['tree'], data['strings'])
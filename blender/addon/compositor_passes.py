@@ -0,0 +1,184 @@
+"""
+Pass fusion analysis for serialized compositor trees, stored as `$passes` next to the nodes:
+
+    {
+        "version": 1,
+        "regions": [{"nodes": [id, ...], "inputs": [[node, socket], ...], "outputs": [[node, socket], ...]}, ...],
+        "boundaries": {node id: reason, ...},
+        "order": [["region", index] | ["node", id], ...],
+        "passes_before": count,
+        "passes_after": count,
+    }
+
+Regions are connected per-pixel nodes that can run as one full-screen pass, `inputs` are the values they
+read from boundaries or other regions and `outputs` the values read outside the region. Boundaries need
+their own pass (or are the tree's sources and outputs), `order` runs regions and boundaries dependencies first.
+"""
+
+PASSES_VERSION = 1
+
+# value of the output pixel only depends on the input pixels at the same coordinate
+PER_PIXEL_TYPES = {
+    'REROUTE', 'VALUE', 'RGB', 'MIX', 'MIX_RGB', 'MATH', 'VECT_MATH', 'VECTOR_ROTATE', 'CLAMP',
+    'MAP_RANGE', 'MAP_VALUE', 'VALTORGB', 'CURVE_RGB', 'CURVE_VEC', 'CURVE_FLOAT', 'HUECORRECT',
+    'HUE_SAT', 'BRIGHTCONTRAST', 'GAMMA', 'INVERT', 'EXPOSURE', 'COLORBALANCE', 'COLORCORRECTION',
+    'RGBTOBW', 'SEPARATE_COLOR', 'COMBINE_COLOR', 'SEPRGBA', 'COMBRGBA', 'SEPHSVA', 'COMBHSVA',
+    'SEPYCCA', 'COMBYCCA', 'SEPYUVA', 'COMBYUVA', 'SEPXYZ', 'COMBXYZ', 'SEPARATE_XYZ', 'COMBINE_XYZ',
+    'ALPHAOVER', 'SETALPHA', 'PREMULKEY', 'ZCOMBINE', 'NORMAL', 'CONVERT_COLORSPACE',
+    'CHROMA_MATTE', 'COLOR_MATTE', 'DIFF_MATTE', 'DISTANCE_MATTE', 'LUMA_MATTE', 'CHANNEL_MATTE', 'COLOR_SPILL',
+    'TEX_NOISE', 'TEX_VORONOI', 'TEX_WHITE_NOISE', 'TEX_GRADIENT', 'TEX_CHECKER', 'TEX_WAVE', 'TEX_MAGIC',
+    'CompositorNodeImageCoordinates', 'CompositorNodeImageInfo', 'SCENE_TIME', 'TIME',
+}
+
+BOUNDARY_TYPES = {
+    # read neighbouring pixels
+    'BLUR': 'neighbourhood', 'BILATERALBLUR': 'neighbourhood', 'DBLUR': 'neighbourhood',
+    'VECBLUR': 'neighbourhood', 'BOKEHBLUR': 'neighbourhood', 'DEFOCUS': 'neighbourhood',
+    'GLARE': 'neighbourhood', 'FILTER': 'neighbourhood', 'DILATEERODE': 'neighbourhood',
+    'DESPECKLE': 'neighbourhood', 'INPAINT': 'neighbourhood', 'KUWAHARA': 'neighbourhood',
+    'PIXELATE': 'neighbourhood', 'SUNBEAMS': 'neighbourhood', 'ANTIALIASING': 'neighbourhood',
+    'DENOISE': 'neighbourhood', 'KEYING': 'neighbourhood', 'DOUBLEEDGEMASK': 'neighbourhood',
+    # sample their input at another coordinate
+    'TRANSLATE': 'offset_sampler', 'ROTATE': 'offset_sampler', 'SCALE': 'offset_sampler',
+    'FLIP': 'offset_sampler', 'TRANSFORM': 'offset_sampler', 'LENSDIST': 'offset_sampler',
+    'MAP_UV': 'offset_sampler', 'DISPLACE': 'offset_sampler', 'CROP': 'offset_sampler',
+    'STABILIZE2D': 'offset_sampler', 'MOVIEDISTORTION': 'offset_sampler', 'CORNERPIN': 'offset_sampler',
+    'PLANETRACKDEFORM': 'offset_sampler',
+    # whole-image reductions
+    'TONEMAP': 'global', 'NORMALIZE': 'global', 'LEVELS': 'global',
+    # image sources
+    'R_LAYERS': 'render_layer', 'IMAGE': 'image', 'MOVIECLIP': 'image', 'MASK': 'image', 'TEXTURE': 'image',
+    # results
+    'COMPOSITE': 'output', 'VIEWER': 'output', 'OUTPUT_FILE': 'output', 'GROUP_OUTPUT': 'output',
+}
+
+def boundary_reason(node):
+    """None for fusable nodes, otherwise why the node needs its own pass"""
+    if node['type'] in PER_PIXEL_TYPES:
+        return None
+    if node['type'] == 'GROUP':
+        return 'group'
+    return BOUNDARY_TYPES.get(node['type'], 'unknown')
+
+def tree_nodes(tree):
+    return {key: node for key, node in tree.items() if not key.startswith('$') and isinstance(node, dict) and 'id' in node and node.get('type') != 'FRAME'}
+
+def input_links(node, nodes):
+    """(source node id, source socket) pairs the node reads, links to unknown nodes skipped"""
+    for value in node['inputs'].values():
+        for socket in (value if isinstance(value, list) else [value]):
+            if isinstance(socket, dict) and socket.get('type') == 'linked':
+                for link in socket['links']:
+                    if link['node'] in nodes:
+                        yield (link['node'], link['socket'])
+
+def topological_order(nodes, sources):
+    order = []
+    state = {}
+    for root in nodes:
+        if root in state: continue
+        stack = [(root, False)]
+        while stack:
+            (id, expanded) = stack.pop()
+            if expanded:
+                state[id] = 'done'
+                order.append(id)
+                continue
+            if id in state: continue
+            state[id] = 'visiting'
+            stack.append((id, True))
+            for source in sources[id]:
+                if source not in state:
+                    stack.append((source, False))
+    return order
+
+def fusion_plan(tree):
+    """
+    Group per-pixel compositor nodes into fusable regions.
+
+    Returns:
+        dict: the `$passes` plan, see the module docstring
+    """
+    nodes = tree_nodes(tree)
+    links = {id: list(input_links(node, nodes)) for id, node in nodes.items()}
+    sources = {id: {source for (source, _) in links[id]} for id in nodes}
+    boundaries = {id: reason for id, node in nodes.items() if (reason := boundary_reason(node))}
+
+    # pass depth: how many boundaries lie on the longest path from a source, nodes at different
+    # depths can't share a pass without a boundary result being needed in the middle of it
+    order = topological_order(nodes, sources)
+    depth = {}
+    for id in order:
+        depth[id] = max((depth[source] + (1 if source in boundaries else 0) for source in sources[id]), default=0)
+
+    # union directly linked per-pixel nodes at the same depth
+    parent = {id: id for id in nodes if id not in boundaries}
+
+    def find(id):
+        while parent[id] != id:
+            parent[id] = parent[parent[id]]
+            id = parent[id]
+        return id
+
+    for id in parent:
+        for source in sources[id]:
+            if source in parent and depth[source] == depth[id]:
+                parent[find(source)] = find(id)
+
+    members = {}
+    for id in order:
+        if id in parent:
+            members.setdefault(find(id), []).append(id)
+
+    region_of = {}
+    regions = []
+    for root, ids in members.items():
+        for id in ids:
+            region_of[id] = len(regions)
+        regions.append({"nodes": ids, "inputs": [], "outputs": []})
+
+    for id in order:
+        for (source, socket) in links[id]:
+            if source in region_of and region_of.get(id) == region_of[source]: continue
+
+            if id in region_of and [source, socket] not in regions[region_of[id]]['inputs']:
+                regions[region_of[id]]['inputs'].append([source, socket])
+            if source in region_of and [source, socket] not in regions[region_of[source]]['outputs']:
+                regions[region_of[source]]['outputs'].append([source, socket])
+
+    # regions whose results nobody reads (dead per-pixel branches) are dropped
+    regions_used = [bool(region['outputs']) for region in regions]
+
+    # schedule regions and boundaries as units, the depth rule above keeps this graph acyclic
+    def unit(id):
+        return ('region', region_of[id]) if id in region_of else ('node', id)
+
+    units = []
+    unit_sources = {}
+    for id in order:
+        if id in region_of and not regions_used[region_of[id]]: continue
+        if unit(id) not in unit_sources:
+            units.append(unit(id))
+            unit_sources[unit(id)] = set()
+        unit_sources[unit(id)].update(unit(source) for source in sources[id] if unit(source) != unit(id))
+
+    execution = []
+    scheduled = set()
+    while len(execution) < len(units):
+        ready = next((candidate for candidate in units if candidate not in scheduled and unit_sources[candidate] <= scheduled), None)
+        if ready is None:
+            print('[Sprixle.Export Compositor] cycle between passes, leaving', len(units) - len(execution), 'unscheduled')
+            break
+        scheduled.add(ready)
+        execution.append(list(ready))
+
+    renders = [id for id, reason in boundaries.items() if reason not in ('render_layer', 'image', 'output')]
+
+    return {
+        "version": PASSES_VERSION,
+        "regions": regions,
+        "boundaries": boundaries,
+        "order": execution,
+        "passes_before": len([id for id, node in nodes.items() if node['type'] not in ('REROUTE', 'VALUE', 'RGB') and boundaries.get(id) not in ('render_layer', 'image', 'output')]),
+        "passes_after": len([unit for unit in execution if unit[0] == "region"]) + len(renders),
+    }
@@ -0,0 +1,226 @@
+"""
+Precompile driver expressions into a small JSON expression tree so the runtime doesn't parse Python.
+
+Nodes are dicts keyed by "op":
+    {"op": "number", "value": 1.5}
+    {"op": "frame"}
+    {"op": "variable", "name": "var"}                      name of one of the driver's "variables"
+    {"op": "unary", "operator": "-" | "+" | "not", "operand": node}
+    {"op": "binary", "operator": "+" | "-" | "*" | "/" | "//" | "%" | "**", "left": node, "right": node}
+    {"op": "compare", "operator": "<" | "<=" | ">" | ">=" | "==" | "!=", "left": node, "right": node}
+    {"op": "logical", "operator": "and" | "or", "operands": [node, ...]}
+    {"op": "condition", "test": node, "then": node, "else": node}
+    {"op": "call", "function": name, "arguments": [node, ...]}
+"""
+import ast
+
+CONSTANTS = {
+    "pi": 3.141592653589793,
+    "tau": 6.283185307179586,
+    "e": 2.718281828459045,
+}
+
+# function -> (min arguments, max arguments), the subset of Blender's driver namespace with a JS equivalent
+FUNCTIONS = {
+    "sin": (1, 1), "cos": (1, 1), "tan": (1, 1),
+    "asin": (1, 1), "acos": (1, 1), "atan": (1, 1), "atan2": (2, 2),
+    "sinh": (1, 1), "cosh": (1, 1), "tanh": (1, 1),
+    "floor": (1, 1), "ceil": (1, 1), "trunc": (1, 1), "int": (1, 1), "round": (1, 1),
+    "abs": (1, 1), "sqrt": (1, 1), "exp": (1, 1), "log": (1, 2), "log10": (1, 1), "log2": (1, 1),
+    "pow": (2, 2), "fmod": (2, 2), "hypot": (2, 2),
+    "min": (1, 16), "max": (1, 16),
+    "radians": (1, 1), "degrees": (1, 1),
+    "clamp": (1, 3), "lerp": (3, 3), "smoothstep": (3, 3), "signum": (1, 1),
+}
+
+BINARY_OPERATORS = {
+    ast.Add: '+', ast.Sub: '-', ast.Mult: '*', ast.Div: '/',
+    ast.FloorDiv: '//', ast.Mod: '%', ast.Pow: '**',
+}
+UNARY_OPERATORS = {ast.USub: '-', ast.UAdd: '+', ast.Not: 'not'}
+COMPARE_OPERATORS = {
+    ast.Lt: '<', ast.LtE: '<=', ast.Gt: '>', ast.GtE: '>=', ast.Eq: '==', ast.NotEq: '!=',
+}
+
+MAX_EXPRESSION_LENGTH = 1024
+
+# (owner, data path, array index, expression) of the unsupported drivers already reported, serialize_driver runs for
+# every tree fingerprint too
+reported_drivers = set()
+
+class UnsupportedExpression(Exception):
+    pass
+
+def compile_expression(expression, variable_names):
+    """
+    Parse a driver expression into an expression tree.
+
+    Raises:
+        UnsupportedExpression: syntax errors, unknown names and anything outside the supported subset
+    """
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise UnsupportedExpression('expression too long')
+
+    try:
+        tree = ast.parse(expression.strip(), mode='eval')
+    except SyntaxError as error:
+        raise UnsupportedExpression(f'syntax error: {error.msg}')
+
+    return compile_node(tree.body, set(variable_names))
+
+def compile_node(node, variable_names):
+    if isinstance(node, ast.Constant):
+        # bool is an int subclass, True / False become 1.0 / 0.0
+        if not isinstance(node.value, (int, float)):
+            raise UnsupportedExpression(f'constant {node.value!r}')
+        return {"op": "number", "value": float(node.value)}
+
+    if isinstance(node, ast.Name):
+        if node.id in variable_names:
+            return {"op": "variable", "name": node.id}
+        if node.id == 'frame':
+            return {"op": "frame"}
+        if node.id in CONSTANTS:
+            return {"op": "number", "value": CONSTANTS[node.id]}
+        raise UnsupportedExpression(f'unknown name {node.id}')
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+        operand = compile_node(node.operand, variable_names)
+        if operand['op'] == 'number' and UNARY_OPERATORS[type(node.op)] == '-':
+            return {"op": "number", "value": -operand['value']}
+        return {"op": "unary", "operator": UNARY_OPERATORS[type(node.op)], "operand": operand}
+
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+        return {
+            "op": "binary",
+            "operator": BINARY_OPERATORS[type(node.op)],
+            "left": compile_node(node.left, variable_names),
+            "right": compile_node(node.right, variable_names),
+        }
+
+    if isinstance(node, ast.Compare):
+        # a < b < c -> (a < b) and (b < c)
+        operands = [node.left] + node.comparators
+        comparisons = []
+        for operator, left, right in zip(node.ops, operands, operands[1:]):
+            if type(operator) not in COMPARE_OPERATORS:
+                raise UnsupportedExpression(f'comparison {type(operator).__name__}')
+            comparisons.append({
+                "op": "compare",
+                "operator": COMPARE_OPERATORS[type(operator)],
+                "left": compile_node(left, variable_names),
+                "right": compile_node(right, variable_names),
+            })
+        return comparisons[0] if len(comparisons) == 1 else {"op": "logical", "operator": "and", "operands": comparisons}
+
+    if isinstance(node, ast.BoolOp):
+        return {
+            "op": "logical",
+            "operator": 'and' if isinstance(node.op, ast.And) else 'or',
+            "operands": [compile_node(value, variable_names) for value in node.values],
+        }
+
+    if isinstance(node, ast.IfExp):
+        return {
+            "op": "condition",
+            "test": compile_node(node.test, variable_names),
+            "then": compile_node(node.body, variable_names),
+            "else": compile_node(node.orelse, variable_names),
+        }
+
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+            raise UnsupportedExpression(f'function {ast.unparse(node.func)}')
+        if node.keywords:
+            raise UnsupportedExpression(f'keyword arguments to {node.func.id}')
+
+        (minimum, maximum) = FUNCTIONS[node.func.id]
+        if not minimum <= len(node.args) <= maximum:
+            raise UnsupportedExpression(f'{node.func.id} takes {minimum}-{maximum} arguments, got {len(node.args)}')
+
+        return {
+            "op": "call",
+            "function": node.func.id,
+            "arguments": [compile_node(argument, variable_names) for argument in node.args],
+        }
+
+    raise UnsupportedExpression(f'{type(node).__name__} ({ast.unparse(node)})')
+
+def compile_aggregate(driver_type, variable_names):
+    """Expression tree for AVERAGE / SUM / MIN / MAX drivers"""
+    if not variable_names:
+        return {"op": "number", "value": 0.0}
+
+    variables = [{"op": "variable", "name": name} for name in variable_names]
+    if driver_type in ('MIN', 'MAX'):
+        return {"op": "call", "function": driver_type.lower(), "arguments": variables}
+
+    total = variables[0]
+    for variable in variables[1:]:
+        total = {"op": "binary", "operator": "+", "left": total, "right": variable}
+
+    if driver_type == 'AVERAGE':
+        return {"op": "binary", "operator": "/", "left": total, "right": {"op": "number", "value": float(len(variables))}}
+    return total
+
+def serialize_target(target):
+    target_data = {
+        "id_type": target.id_type,
+        "id": target.id.name if target.id else None,
+        "data_path": target.data_path,
+        "transform_type": target.transform_type,
+        "transform_space": target.transform_space,
+        "rotation_mode": target.rotation_mode,
+        "bone_target": target.bone_target,
+    }
+
+    # the value at export time, a fallback for runtimes that can't resolve the target
+    if target.id and target.data_path:
+        try:
+            value = target.id.path_resolve(target.data_path)
+            if isinstance(value, (int, float, bool)):
+                target_data["value"] = float(value)
+        except ValueError:
+            pass
+
+    return target_data
+
+def serialize_variable(variable):
+    return {
+        "name": variable.name,
+        "type": variable.type,
+        "targets": [serialize_target(target) for target in list(variable.targets)[:1 if variable.type in ('SINGLE_PROP', 'TRANSFORMS', 'CONTEXT_PROP') else 2]],
+    }
+
+def serialize_driver(fcurve):
+    """
+    Driver type, variables and compiled expression tree of a driver FCurve.
+    Unsupported expressions get `"ast": None` and the reason in `"unsupported"`, the raw expression is always kept.
+    """
+    driver = fcurve.driver
+    variable_names = [variable.name for variable in driver.variables]
+
+    driver_data = {
+        "type": driver.type,
+        "expression": driver.expression,
+        "array_index": fcurve.array_index,
+        "variables": [serialize_variable(variable) for variable in driver.variables],
+        "ast": None,
+    }
+
+    try:
+        if driver.type == 'SCRIPTED':
+            if driver.use_self:
+                raise UnsupportedExpression('use_self')
+            driver_data["ast"] = compile_expression(driver.expression, variable_names)
+        else:
+            driver_data["ast"] = compile_aggregate(driver.type, variable_names)
+    except UnsupportedExpression as error:
+        driver_data["unsupported"] = str(error)
+        owner = getattr(fcurve, 'id_data', None)
+        key = (owner.name if owner else None, fcurve.data_path, fcurve.array_index, driver.expression)
+        if key not in reported_drivers:
+            reported_drivers.add(key)
+            print('[Sprixle.Export Driver] unsupported expression', repr(driver.expression), error)
+
+    return driver_data
@@ -0,0 +1,216 @@
+"""
+Offline image based lighting for the world's Environment Texture: a GGX prefiltered specular mip chain
+(equirectangular, RGBA float16) and spherical harmonics for diffuse irradiance, computed with NumPy.
+
+Results are cached in `//environments/` by a hash of the source image and the settings, the scene
+references them with the `worldEnvironment` extra.
+"""
+import bpy
+import hashlib
+import json
+import math
+import os
+import numpy as np
+
+DEFAULT_SETTINGS = {
+    # width of mip level 0, every level halves it, height is width / 2
+    "size": 256,
+    "levels": 6,
+    # largest source width the convolution reads, higher is sharper low roughness levels but slower
+    "max_source_size": 128,
+}
+
+# output texels convolved at once, bounds memory to chunk * source texels floats
+CHUNK_TEXELS = 512
+
+CACHE_DIRECTORY = 'environments'
+
+def image_hash(image):
+    """Hash of the image file (or packed data), falls back to the pixels for generated images"""
+    digest = hashlib.blake2b(digest_size=16)
+    if image.packed_file:
+        digest.update(image.packed_file.data)
+    elif image.filepath and os.path.exists(bpy.path.abspath(image.filepath)):
+        with open(bpy.path.abspath(image.filepath), 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                digest.update(block)
+    else:
+        digest.update(image_pixels(image).tobytes())
+
+    return digest.hexdigest()
+
+def image_pixels(image):
+    """(height, width, 3) float32 RGB, row 0 at the bottom like Blender stores it"""
+    (width, height) = image.size
+    pixels = np.empty(width * height * image.channels, np.float32)
+    image.pixels.foreach_get(pixels)
+    pixels = pixels.reshape(height, width, image.channels)
+
+    if image.channels == 1:
+        return np.repeat(pixels, 3, axis=2)
+    return pixels[:, :, :3]
+
+def resize(pixels, width, height):
+    """Box filter down to (height, width), nearest neighbour when upscaling"""
+    def axis_bins(size, target):
+        if size <= target:
+            return None
+        return np.linspace(0, size, target + 1).astype(int)
+
+    rows = axis_bins(pixels.shape[0], height)
+    if rows is None:
+        pixels = pixels[(np.arange(height) * pixels.shape[0] // height)]
+    else:
+        pixels = np.add.reduceat(pixels, rows[:-1], axis=0) / np.diff(rows)[:, None, None]
+
+    columns = axis_bins(pixels.shape[1], width)
+    if columns is None:
+        pixels = pixels[:, (np.arange(width) * pixels.shape[1] // width)]
+    else:
+        pixels = np.add.reduceat(pixels, columns[:-1], axis=1) / np.diff(columns)[None, :, None]
+
+    return pixels.astype(np.float32)
+
+def equirectangular_directions(width, height):
+    """
+    Unit directions (Blender space, z up) of texel centers and their solid angles,
+    the inverse of Blender's direction_to_equirectangular.
+
+    Returns:
+        tuple: ((height * width, 3) directions, (height * width,) solid angles)
+    """
+    u = (np.arange(width) + 0.5) / width
+    v = (np.arange(height) + 0.5) / height
+    phi = (0.5 - u) * 2 * math.pi
+    theta = (v - 0.5) * math.pi
+
+    (phi, theta) = np.meshgrid(phi, theta)
+    directions = np.stack([np.cos(phi) * np.cos(theta), np.sin(phi) * np.cos(theta), np.sin(theta)], axis=-1)
+    solid_angles = np.cos(theta) * (2 * math.pi / width) * (math.pi / height)
+
+    return (directions.reshape(-1, 3), solid_angles.reshape(-1))
+
+def ggx_prefilter(source, width, height, roughness):
+    """
+    Convolve an equirectangular radiance map with the GGX lobe (N = V = R, as in the split sum approximation).
+
+    Returns:
+        ndarray: (height, width, 3) prefiltered radiance
+    """
+    (source_directions, source_solid_angles) = equirectangular_directions(source.shape[1], source.shape[0])
+    source_radiance = source.reshape(-1, 3)
+    (directions, _) = equirectangular_directions(width, height)
+
+    alpha2 = max(roughness, 1e-3) ** 4
+    output = np.empty((len(directions), 3), np.float32)
+    for start in range(0, len(directions), CHUNK_TEXELS):
+        n_dot_l = directions[start:start + CHUNK_TEXELS] @ source_directions.T
+        # with N = V the half vector angle follows from N.L alone
+        n_dot_h2 = np.clip((1 + n_dot_l) / 2, 0, 1)
+        distribution = alpha2 / (math.pi * (n_dot_h2 * (alpha2 - 1) + 1) ** 2)
+        weights = distribution * np.maximum(n_dot_l, 0) * source_solid_angles
+
+        output[start:start + CHUNK_TEXELS] = (weights @ source_radiance) / np.maximum(weights.sum(axis=1, keepdims=True), 1e-12)
+
+    return output.reshape(height, width, 3)
+
+def spherical_harmonics(source):
+    """
+    Order 2 (9 coefficient) SH projection of the radiance, in three.js' basis and y up space
+    so the coefficients can be handed to `SphericalHarmonics3.fromArray` / a LightProbe as they are.
+
+    Returns:
+        list: 9 [r, g, b] coefficients
+    """
+    (directions, solid_angles) = equirectangular_directions(source.shape[1], source.shape[0])
+    # Blender z up -> glTF / three.js y up
+    x = directions[:, 0]
+    y = directions[:, 2]
+    z = -directions[:, 1]
+
+    basis = np.stack([
+        np.full_like(x, 0.282095),
+        0.488603 * y,
+        0.488603 * z,
+        0.488603 * x,
+        1.092548 * x * y,
+        1.092548 * y * z,
+        0.315392 * (3 * z * z - 1),
+        1.092548 * x * z,
+        0.546274 * (x * x - y * y),
+    ])
+
+    coefficients = (basis * solid_angles) @ source.reshape(-1, 3).astype(np.float64)
+    return coefficients.tolist()
+
+def prefilter(pixels, settings):
+    """
+    Returns:
+        tuple: (level descriptions, packed RGBA float16 bytes of all levels, SH coefficients)
+    """
+    levels = []
+    chunks = []
+    offset = 0
+    for level in range(settings['levels']):
+        width = max(settings['size'] >> level, 4)
+        height = width // 2
+        roughness = level / max(settings['levels'] - 1, 1)
+
+        if level == 0:
+            radiance = resize(pixels, width, height)
+        else:
+            source_width = min(settings['max_source_size'], max(width * 2, 32))
+            radiance = ggx_prefilter(resize(pixels, source_width, source_width // 2), width, height, roughness)
+
+        rgba = np.concatenate([radiance, np.ones((height, width, 1), np.float32)], axis=2).astype('<f2')
+        chunk = rgba.tobytes()
+        levels.append({"width": width, "height": height, "roughness": roughness, "offset": offset, "byteLength": len(chunk)})
+        chunks.append(chunk)
+        offset += len(chunk)
+
+    sh = spherical_harmonics(resize(pixels, 64, 32))
+
+    return (levels, b''.join(chunks), sh)
+
+def prefilter_world(scene, image, intensity=1.0, settings=None):
+    """
+    Prefilter the environment image (cached) and reference the result from `scene['worldEnvironment']`.
+
+    Returns:
+        dict: {"cached": bool, "uri": ...} for the export report
+    """
+    settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+    source_hash = image_hash(image)
+    key = hashlib.blake2b((source_hash + json.dumps(settings, sort_keys=True)).encode('utf-8'), digest_size=12).hexdigest()
+
+    directory = bpy.path.abspath('//' + CACHE_DIRECTORY)
+    uri = f'{CACHE_DIRECTORY}/{key}.bin'
+    metadata_path = os.path.join(directory, key + '.json')
+    binary_path = os.path.join(directory, key + '.bin')
+
+    cached = os.path.exists(metadata_path) and os.path.exists(binary_path)
+    if cached:
+        with open(metadata_path) as file:
+            metadata = json.load(file)
+    else:
+        (levels, binary, sh) = prefilter(image_pixels(image), settings)
+        metadata = {
+            "uri": uri,
+            "source": image.name,
+            "sourceHash": source_hash,
+            "projection": "equirectangular",
+            "format": "rgba16f",
+            "levels": levels,
+            "sphericalHarmonics": sh,
+        }
+
+        os.makedirs(directory, exist_ok=True)
+        with open(binary_path, 'wb') as file:
+            file.write(binary)
+        with open(metadata_path, 'w') as file:
+            json.dump(metadata, file)
+
+    scene['worldEnvironment'] = json.dumps(dict(metadata, intensity=intensity))
+    print('[Sprixle.Export Environment]', image.name, 'cached' if cached else 'prefiltered', '->', uri)
+
+    return {"cached": cached, "uri": uri}
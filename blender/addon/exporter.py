@@ -5,6 +5,12 @@
 # }
 
 import bpy
+import hashlib
+import sys
+from . import lod
+from . import node_trees
+from . import artifact_cache
+from .profiling import timed
 
 def prepareAttributesForExport(object):
     if not hasattr(object, 'modifiers'): return False
@@ -147,6 +153,73 @@ def realtime_export(object_names, filepath):
 
     return True
 
+# mesh attribute data type -> (foreach field, components, numpy dtype), other types are fingerprinted by name only
+ATTRIBUTE_FIELDS = {
+    'FLOAT': ('value', 1, 'f4'),
+    'INT': ('value', 1, 'i4'),
+    'INT8': ('value', 1, 'i4'),
+    'BOOLEAN': ('value', 1, '?'),
+    'FLOAT2': ('vector', 2, 'f4'),
+    'INT32_2D': ('value', 2, 'i4'),
+    'FLOAT_VECTOR': ('vector', 3, 'f4'),
+    'FLOAT_COLOR': ('color', 4, 'f4'),
+    'BYTE_COLOR': ('color', 4, 'f4'),
+    'QUATERNION': ('value', 4, 'f4'),
+}
+
+def mesh_fingerprint(mesh, digest):
+    """Feed the topology, corner normals and attributes of an (evaluated) mesh into digest"""
+    import numpy as np
+
+    def collection(items, field, components, dtype):
+        data = np.empty(len(items) * components, dtype=dtype)
+        items.foreach_get(field, data)
+        digest.update(f'{field}|{len(items)}'.encode('utf-8'))
+        digest.update(data.tobytes())
+
+    collection(mesh.loops, 'vertex_index', 1, 'i4')
+    collection(mesh.polygons, 'loop_start', 1, 'i4')
+    collection(mesh.polygons, 'material_index', 1, 'i4')
+    if hasattr(mesh, 'corner_normals'):
+        collection(mesh.corner_normals, 'vector', 3, 'f4')
+    else:
+        collection(mesh.loops, 'normal', 3, 'f4')
+
+    for attribute in mesh.attributes:
+        # selection, hiding and the topology above are internal attributes
+        if attribute.name.startswith('.'): continue
+        digest.update(f'attribute|{attribute.name}|{attribute.domain}|{attribute.data_type}'.encode('utf-8'))
+        field = ATTRIBUTE_FIELDS.get(attribute.data_type)
+        if field:
+            collection(attribute.data, *field)
+
+def realtime_cache_key(object_names):
+    """
+    Content key of realtime_export for the objects: their evaluated meshes, transforms, custom properties and
+    material trees, plus the Blender version and this module's source (the export settings).
+    """
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    digest = hashlib.blake2b(digest_size=16)
+
+    for name in sorted(object_names):
+        obj = bpy.data.objects.get(name)
+        if not obj or obj.type != 'MESH': continue
+
+        digest.update(f'object|{name}|{[tuple(row) for row in obj.matrix_world]}'.encode('utf-8'))
+        digest.update(repr(sorted((key, str(value)) for key, value in obj.items())).encode('utf-8'))
+        for slot in obj.material_slots:
+            material = slot.material
+            digest.update(f'material|{material.name}|{node_trees.tree_version(material)}'.encode('utf-8') if material else b'material|')
+
+        evaluated = obj.evaluated_get(depsgraph)
+        mesh = evaluated.to_mesh()
+        if mesh is not None:
+            mesh_fingerprint(mesh, digest)
+            evaluated.to_mesh_clear()
+
+    version = artifact_cache.source_version(sys.modules[__name__])
+    return artifact_cache.fingerprint('realtimeGeometry', bpy.app.version_string, version, digest.hexdigest())
+
 
 def cleanupInstanceExport(object):
     if not hasattr(object, 'modifiers'): return
@@ -160,15 +233,36 @@ def cleanupInstanceExport(object):
         return
 
 
-def export(sceneKey):
+def export(sceneKey, lod_ratios=None, lod_distances=None, lod_min_triangles=0, optimize=False, quantize=False, quantize_positions=False, position_error=0.0005, prefilter_environment=False, profile=None):
+    """
+    Export a scene to `//<sceneKey>.glb`
+
+    Args:
+        lod_ratios (list): decimation ratio per generated LOD level, no LODs are generated when empty.
+        lod_distances (list): switch distance per LOD level.
+        lod_min_triangles (int): meshes with fewer triangles don't get LODs.
+        optimize (bool): reorder indices and vertices of the written GLB for the vertex cache (see mesh_optimize).
+        quantize (bool): quantize normals and UVs with KHR_mesh_quantization, with or without optimize.
+        quantize_positions (bool): quantize positions, folding the dequantization into mesh node transforms.
+        position_error (float): maximum position quantization error in meters.
+        prefilter_environment (bool): precompute the world's specular mip chain and SH irradiance (see env_prefilter).
+        profile (ExportProfile): records stage and per object timings when given.
+
+    Returns:
+        dict: export report (triangle counts per LOD level keyed by object name, optimization results)
+    """
     scene = bpy.data.scenes.get(sceneKey)
     
-    bpy.context.window.scene = scene
+    # background (blender -b) runs have no window, batch.py overrides the context scene instead
+    if bpy.context.window:
+        bpy.context.window.scene = scene
 
     # add node tree baking
     
     compositorShaderTree = bpy.context.scene.compositing_node_group
 
+    environmentImage = None
+    environmentReport = None
     worldShaderTree = bpy.context.scene.world.node_tree
     worldShaderOutput = worldShaderTree.get_output_node('EEVEE')
     worldSurfaceInput = worldShaderOutput.inputs.get('Surface')
@@ -182,11 +276,19 @@ def export(sceneKey):
                 worldColorNode = worldColorInput.links[0].from_node
                 if worldColorNode.name == 'Environment Texture':
                     scene['worldTexture'] = worldColorNode.image
+                    environmentImage = worldColorNode.image
                 
             worldStrengthInput = worldSurfaceLinkedNode.inputs.get('Strength')
             if worldStrengthInput:
                 scene['worldIntensity'] = worldStrengthInput.default_value
 
+    if prefilter_environment and environmentImage:
+        with timed(profile, 'environment'):
+            from . import env_prefilter
+            environmentReport = env_prefilter.prefilter_world(scene, environmentImage, scene.get('worldIntensity', 1.0))
+    elif 'worldEnvironment' in scene:
+        del scene['worldEnvironment']
+
     scene['viewLayer'] = bpy.context.view_layer.name
     scene['worldShader'] = bpy.context.scene.world.name
     if compositorShaderTree:
@@ -194,50 +296,80 @@ def export(sceneKey):
     
     # sceneCollection = scene.collection;
     instanceObjectsToClean = []
-    for object in bpy.context.scene.objects:
-        prepareAttributesForExport(object)
-        if prepareInstancesForExport(object): instanceObjectsToClean.append(object)
+    lodObjects, lodBaseObjects, lodReport = [], [], {}
+    filepath = bpy.path.abspath('//'+sceneKey+'.glb')
+
+    # the scene is restored even when preparing or exporting fails
+    try:
+        with timed(profile, 'attributes_and_instances'):
+            for object in bpy.context.scene.objects:
+                with timed(profile, 'attributes_and_instances', object.name):
+                    prepareAttributesForExport(object)
+                    if prepareInstancesForExport(object): instanceObjectsToClean.append(object)
+
+        if lod_ratios:
+            with timed(profile, 'lods'):
+                (lodObjects, lodBaseObjects, lodReport) = lod.generate_lods(scene, lod_ratios, lod_distances, lod_min_triangles, instanceObjectsToClean)
     
 #    break
     
-    bpy.ops.export_scene.gltf(filepath=bpy.path.abspath('//'+sceneKey+'.glb'),
-        export_lights =True,
-        export_import_convert_lighting_mode='COMPAT',
-        gltf_export_id="Sprixle",
+        with timed(profile, 'gltf'):
+            bpy.ops.export_scene.gltf(filepath=filepath,
+                export_lights =True,
+                export_import_convert_lighting_mode='COMPAT',
+                gltf_export_id="Sprixle",
         
-        export_extras =True,
-        export_yup=True,
-        export_apply=True,
-        export_attributes=True,
-        # export_all_vertex_colors=True,
-        export_normals=True,
-        export_texcoords=True,
-        export_shared_accessors=True,
+                export_extras =True,
+                export_yup=True,
+                export_apply=True,
+                export_attributes=True,
+                # export_all_vertex_colors=True,
+                export_normals=True,
+                export_texcoords=True,
+                export_shared_accessors=True,
         
-#        use_mesh_edges=True,
-        # use_mesh_vertices =True,
+#            use_mesh_edges=True,
+                # use_mesh_vertices =True,
 
-        use_renderable=True,
-        use_active_scene=True,
+                use_renderable=True,
+                use_active_scene=True,
         
-        export_animations=True,
-#        export_animation_mode='NLA_TRACKS',
-#        export_pointer_animation=True,
-        export_force_sampling =True,
-        export_bake_animation=True,
-        export_anim_slide_to_zero=True,
+                export_animations=True,
+#            export_animation_mode='NLA_TRACKS',
+#            export_pointer_animation=True,
+                export_force_sampling =True,
+                export_bake_animation=True,
+                export_anim_slide_to_zero=True,
         
-        export_gpu_instances=True,
-        # export_gn_mesh=True,
-        export_original_specular=True,
+                export_gpu_instances=True,
+                # export_gn_mesh=True,
+                export_original_specular=True,
         
-        export_hierarchy_full_collections=True,
-        export_cameras=True,
-        export_materials='EXPORT',
-        export_format='GLB',
+                export_hierarchy_full_collections=True,
+                export_cameras=True,
+                export_materials='EXPORT',
+                export_format='GLB',
         
-#        export_texture_dir=bpy.path.abspath('//textures')
-    )
+#            export_texture_dir=bpy.path.abspath('//textures')
+            )
+    finally:
+        for object in instanceObjectsToClean:
+            cleanupInstanceExport(object)
+
+        lod.cleanup_lods(lodObjects, lodBaseObjects)
+
+    if lodObjects:
+        with timed(profile, 'lods'):
+            lod.link_lod_nodes(filepath)
+
+    report = {"lods": lodReport}
+    if optimize or quantize or quantize_positions:
+        with timed(profile, 'optimize'):
+            from . import mesh_optimize
+            report['optimize'] = mesh_optimize.optimize_glb(filepath, reorder=optimize, quantize=quantize, quantize_positions_enabled=quantize_positions, position_error=position_error)
+
+    if environmentReport:
+        report['environment'] = environmentReport
+    report['filepath'] = filepath
 
-    for object in instanceObjectsToClean:
-        cleanupInstanceExport(object)
\ No newline at end of file
+    return report
@@ -0,0 +1,215 @@
+import json
+import struct
+import numpy as np
+
+GLB_MAGIC = 0x46546C67
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+
+COMPONENT_DTYPES = {
+    5120: np.int8,
+    5121: np.uint8,
+    5122: np.int16,
+    5123: np.uint16,
+    5125: np.uint32,
+    5126: np.float32,
+}
+
+TYPE_COMPONENTS = {
+    'SCALAR': 1,
+    'VEC2': 2,
+    'VEC3': 3,
+    'VEC4': 4,
+    'MAT2': 4,
+    'MAT3': 9,
+    'MAT4': 16,
+}
+
+TARGET_ARRAY_BUFFER = 34962
+TARGET_ELEMENT_ARRAY_BUFFER = 34963
+
+def read_glb(source):
+    """
+    Parse a GLB file (path or bytes) into its JSON document and binary chunk.
+
+    Returns:
+        tuple: (gltf dict, bytes of the BIN chunk or b'' when absent)
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        data = bytes(source)
+    else:
+        with open(source, 'rb') as file:
+            data = file.read()
+
+    magic, version, length = struct.unpack_from('<III', data, 0)
+    if magic != GLB_MAGIC:
+        raise ValueError('not a GLB file')
+
+    gltf = None
+    binary = b''
+    offset = 12
+    while offset < length:
+        chunk_length, chunk_type = struct.unpack_from('<II', data, offset)
+        chunk = data[offset + 8:offset + 8 + chunk_length]
+        if chunk_type == CHUNK_JSON:
+            gltf = json.loads(chunk.decode('utf-8'))
+        elif chunk_type == CHUNK_BIN:
+            binary = chunk
+        offset += 8 + chunk_length
+
+    if gltf is None:
+        raise ValueError('GLB has no JSON chunk')
+
+    return (gltf, binary)
+
+def chunk_sizes(source):
+    """Byte length of every chunk in a GLB, keyed by chunk name ('JSON', 'BIN')"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        data = bytes(source)
+    else:
+        with open(source, 'rb') as file:
+            data = file.read()
+
+    sizes = {}
+    offset = 12
+    while offset < len(data):
+        chunk_length, chunk_type = struct.unpack_from('<II', data, offset)
+        sizes['JSON' if chunk_type == CHUNK_JSON else 'BIN' if chunk_type == CHUNK_BIN else hex(chunk_type)] = chunk_length
+        offset += 8 + chunk_length
+
+    return sizes
+
+def write_glb(gltf, binary):
+    """Serialize a glTF document and its binary chunk to GLB bytes"""
+    json_chunk = json.dumps(gltf, separators=(',', ':')).encode('utf-8')
+    json_chunk += b' ' * (-len(json_chunk) % 4)
+
+    binary = bytes(binary)
+    binary += b'\x00' * (-len(binary) % 4)
+
+    length = 12 + 8 + len(json_chunk)
+    if binary:
+        length += 8 + len(binary)
+
+    output = bytearray(struct.pack('<III', GLB_MAGIC, 2, length))
+    output += struct.pack('<II', len(json_chunk), CHUNK_JSON) + json_chunk
+    if binary:
+        output += struct.pack('<II', len(binary), CHUNK_BIN) + binary
+
+    return bytes(output)
+
+def accessor_element_size(accessor):
+    return np.dtype(COMPONENT_DTYPES[accessor['componentType']]).itemsize * TYPE_COMPONENTS[accessor['type']]
+
+def accessor_byte_length(accessor):
+    return accessor_element_size(accessor) * accessor['count']
+
+def read_accessor(gltf, binary, index):
+    """
+    Read an accessor into a (count, components) numpy array.
+    Sparse accessors are not supported.
+    """
+    accessor = gltf['accessors'][index]
+    dtype = np.dtype(COMPONENT_DTYPES[accessor['componentType']]).newbyteorder('<')
+    components = TYPE_COMPONENTS[accessor['type']]
+    count = accessor['count']
+
+    if 'sparse' in accessor:
+        raise ValueError('sparse accessors are not supported')
+
+    if 'bufferView' not in accessor:
+        return np.zeros((count, components), dtype)
+
+    view = gltf['bufferViews'][accessor['bufferView']]
+    offset = view.get('byteOffset', 0) + accessor.get('byteOffset', 0)
+    element_size = dtype.itemsize * components
+    stride = view.get('byteStride', element_size)
+
+    if stride == element_size:
+        return np.frombuffer(binary, dtype, count * components, offset).reshape(count, components).copy()
+
+    raw = np.frombuffer(binary, np.uint8, (count - 1) * stride + element_size, offset)
+    rows = np.lib.stride_tricks.as_strided(raw, (count, element_size), (stride, 1))
+    return rows.copy().view(dtype).reshape(count, components)
+
+def pack_elements(array, stride=None):
+    """
+    Pack a (count, components) array into bytes, padding every element to `stride` bytes.
+
+    Returns:
+        tuple: (bytes, byteStride or None when elements are tightly packed)
+    """
+    array = np.ascontiguousarray(array)
+    element_size = array.dtype.itemsize * array.shape[1]
+    if stride is None or stride == element_size:
+        return (array.astype(array.dtype.newbyteorder('<')).tobytes(), None)
+
+    padded = np.zeros((array.shape[0], stride), np.uint8)
+    padded[:, :element_size] = array.astype(array.dtype.newbyteorder('<')).view(np.uint8).reshape(array.shape[0], element_size)
+    return (padded.tobytes(), stride)
+
+def rebuild_buffer(gltf, binary, replaced):
+    """
+    Rebuild the GLB binary chunk, swapping in new data for some accessors and dropping unreferenced buffer views.
+
+    Args:
+        replaced (dict): accessor index -> (bytes, byteStride or None, target or None)
+
+    Returns:
+        bytes: the new binary chunk (gltf is updated in place)
+    """
+    old_views = gltf.get('bufferViews', [])
+    new_views = []
+    new_binary = bytearray()
+    view_remap = {}
+
+    def append(data):
+        new_binary.extend(b'\x00' * (-len(new_binary) % 4))
+        offset = len(new_binary)
+        new_binary.extend(data)
+        return offset
+
+    def keep_view(index):
+        if index in view_remap:
+            return view_remap[index]
+
+        view = dict(old_views[index])
+        start = view.get('byteOffset', 0)
+        view['byteOffset'] = append(binary[start:start + view['byteLength']])
+        view['buffer'] = 0
+        view_remap[index] = len(new_views)
+        new_views.append(view)
+        return view_remap[index]
+
+    for index, accessor in enumerate(gltf.get('accessors', [])):
+        if index in replaced:
+            continue
+        if 'bufferView' in accessor:
+            accessor['bufferView'] = keep_view(accessor['bufferView'])
+        sparse = accessor.get('sparse')
+        if sparse:
+            sparse['indices']['bufferView'] = keep_view(sparse['indices']['bufferView'])
+            sparse['values']['bufferView'] = keep_view(sparse['values']['bufferView'])
+
+    for image in gltf.get('images', []):
+        if 'bufferView' in image:
+            image['bufferView'] = keep_view(image['bufferView'])
+
+    for index in sorted(replaced):
+        (data, stride, target) = replaced[index]
+        view = {"buffer": 0, "byteOffset": append(data), "byteLength": len(data)}
+        if stride:
+            view['byteStride'] = stride
+        if target:
+            view['target'] = target
+
+        accessor = gltf['accessors'][index]
+        accessor['bufferView'] = len(new_views)
+        accessor.pop('byteOffset', None)
+        new_views.append(view)
+
+    gltf['bufferViews'] = new_views
+    if gltf.get('buffers'):
+        gltf['buffers'][0]['byteLength'] = len(new_binary)
+
+    return bytes(new_binary)
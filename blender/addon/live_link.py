@@ -0,0 +1,146 @@
+import fnmatch
+import json
+import struct
+from . import live_stats
+
+# websocket_server only sends text frames, binary frames are written to the client socket directly
+OPCODE_BINARY = 0x2
+FIN = 0x80
+
+def binary_payload(header, payload):
+    """
+    Pack a JSON header and binary payload into one message:
+    `[uint32 header length][JSON header][zero padding to 4 bytes][payload]`
+    """
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    padding = b'\x00' * (-(4 + len(header_bytes)) % 4)
+
+    return struct.pack('<I', len(header_bytes)) + header_bytes + padding + payload
+
+def binary_frame(payload):
+    frame = bytearray([FIN | OPCODE_BINARY])
+    length = len(payload)
+
+    if length <= 125:
+        frame.append(length)
+    elif length <= 65535:
+        frame.append(126)
+        frame.extend(struct.pack('>H', length))
+    else:
+        frame.append(127)
+        frame.extend(struct.pack('>Q', length))
+
+    return bytes(frame) + payload
+
+def send_binary(client, data):
+    handler = client['handler']
+    frame = binary_frame(data)
+
+    with handler._send_lock:
+        handler.request.sendall(frame)
+
+def send_binary_to_all(server, header, payload, clients=None):
+    data = binary_payload(header, payload)
+
+    for client in list(server.clients if clients is None else clients):
+        try:
+            send_binary(client, data)
+            live_stats.record_send(client, len(data))
+        except OSError as error:
+            live_stats.log('warning', 'failed to send binary message to client', client['id'], error)
+
+def send_text(server, client, text):
+    """server.send_message, counted in live_stats"""
+    server.send_message(client, text)
+    live_stats.record_send(client, len(text.encode('utf-8')))
+
+# Subscriptions
+#################################################
+
+# message types every client receives, whatever it subscribed to
+CONTROL_TYPES = {'sceneChange', 'sceneReady', 'export', 'subscribed'}
+
+# client id -> {"scenes", "types", "names", "pull"}: lists of fnmatch patterns, None matches anything.
+# Clients that never subscribed receive every message.
+# Only changed on Blender's main thread (the addon queues websocket events), where the sends read it.
+subscriptions = {}
+
+def subscribe(client, request):
+    """
+    Store a client's `{"type": "subscribe", "scenes": [...], "types": [...], "names": [...], "pull": bool}` request.
+    Pull clients get no initial state and, without names, only updates of the assets they requested (see watch).
+    """
+    subscription = {
+        key: [str(pattern) for pattern in request[key]] if isinstance(request.get(key), list) else None
+        for key in ('scenes', 'types', 'names')
+    }
+    subscription['pull'] = bool(request.get('pull'))
+    if subscription['pull'] and subscription['names'] is None:
+        subscription['names'] = []
+
+    subscriptions[client['id']] = subscription
+    return subscription
+
+def is_pull(client):
+    return subscriptions.get(client['id'], {}).get('pull', False)
+
+def watch(client, name):
+    """Send a pull client later updates of an asset it requested"""
+    subscription = subscriptions.get(client['id'])
+    if subscription and subscription['pull'] and not matches(subscription['names'], [name]):
+        subscription['names'].append(name)
+
+def unsubscribe(client):
+    subscriptions.pop(client['id'], None)
+
+def matches(patterns, values):
+    return patterns is None or any(fnmatch.fnmatchcase(value, pattern) for pattern in patterns for value in values)
+
+def is_interested(client, message_type, names, scene=None):
+    subscription = subscriptions.get(client['id'])
+    if subscription is None or message_type in CONTROL_TYPES:
+        return True
+
+    return (
+        matches(subscription['types'], [message_type])
+        and (scene is None or matches(subscription['scenes'], [scene]))
+        and matches(subscription['names'], names)
+    )
+
+def any_interested(server, message_type, names, scene=None):
+    """Whether a connected client would receive the message, checked before serializing it"""
+    return any(is_interested(client, message_type, names, scene) for client in list(server.clients))
+
+def send_to_subscribers(server, message, scene=None, names=None, clients=None):
+    """
+    Send a `{"type", "name", ...}` message to the clients (all or the given ones) subscribed to its type,
+    scene and name (or any of names). The message is only encoded when someone is interested.
+
+    Returns:
+        int: how many clients it was sent to
+    """
+    names = names or [message.get('name', '')]
+    text = None
+    sent = 0
+    for client in list(server.clients if clients is None else clients):
+        if not is_interested(client, message['type'], names, scene): continue
+
+        if text is None:
+            text = json.dumps(message, indent=0)
+        send_text(server, client, text)
+        sent += 1
+
+    if not sent:
+        live_stats.count('messages without subscribers')
+    return sent
+
+def send_binary_to_subscribers(server, header, payload, scene=None, names=None, clients=None):
+    """send_binary_to_all for the clients (all or the given ones) interested in the header's type, scene and name"""
+    names = names or [header.get('name', '')]
+    clients = [client for client in list(server.clients if clients is None else clients) if is_interested(client, header['type'], names, scene)]
+    if clients:
+        send_binary_to_all(server, header, payload, clients)
+    else:
+        live_stats.count('messages without subscribers')
+
+    return len(clients)
@@ -0,0 +1,91 @@
+"""
+Counters and timings of the live link, shown in the Sprixle panels and sent to clients as
+`{"type": "stats", "data": snapshot()}`, and its leveled log.
+
+The log level comes from `SPRIXLE_LOG_LEVEL` (error, warning, info, debug; info by default) and can be changed
+in the Sprixle panel.
+"""
+import os
+import threading
+import time
+
+LOG_LEVELS = {'error': 40, 'warning': 30, 'info': 20, 'debug': 10}
+DEFAULT_LOG_LEVEL = 'info'
+
+log_level = os.environ.get('SPRIXLE_LOG_LEVEL', DEFAULT_LOG_LEVEL).lower()
+if log_level not in LOG_LEVELS:
+    log_level = DEFAULT_LOG_LEVEL
+
+# sends happen on the websocket server's thread too
+lock = threading.Lock()
+started = time.time()
+# name -> count of skipped / deduplicated work and other events
+counters = {}
+# name -> {"count", "last_ms", "total_ms", "max_ms"}
+timings = {}
+# tree name -> {"count", "cached", "last_ms", "total_ms", "max_ms"}
+trees = {}
+# client id -> {"address", "messages", "bytes"}
+clients = {}
+
+def set_log_level(level):
+    global log_level
+    if level in LOG_LEVELS:
+        log_level = level
+
+def enabled(level):
+    """Check before building expensive log arguments"""
+    return LOG_LEVELS[level] >= LOG_LEVELS[log_level]
+
+def log(level, *args, scope='LiveLink'):
+    if enabled(level):
+        print(f'[Sprixle.{scope}]', *args)
+
+def count(name, amount=1):
+    with lock:
+        counters[name] = counters.get(name, 0) + amount
+
+def add_timing(entry, ms):
+    entry['count'] += 1
+    entry['last_ms'] = ms
+    entry['total_ms'] += ms
+    entry['max_ms'] = max(entry['max_ms'], ms)
+
+def record_timing(name, ms):
+    with lock:
+        add_timing(timings.setdefault(name, {"count": 0, "last_ms": 0.0, "total_ms": 0.0, "max_ms": 0.0}), ms)
+
+def record_tree(name, ms, cached=False):
+    with lock:
+        entry = trees.setdefault(name, {"count": 0, "cached": 0, "last_ms": 0.0, "total_ms": 0.0, "max_ms": 0.0})
+        add_timing(entry, ms)
+        entry['cached'] += cached
+
+def record_send(client, byte_count):
+    with lock:
+        entry = clients.setdefault(client['id'], {"address": '%s:%s' % tuple(client['address'][:2]) if client.get('address') else None, "messages": 0, "bytes": 0})
+        entry['messages'] += 1
+        entry['bytes'] += byte_count
+
+def forget_client(client):
+    with lock:
+        clients.pop(client['id'], None)
+
+def rounded(entry):
+    return {key: round(value, 3) if isinstance(value, float) else value for key, value in entry.items()}
+
+def snapshot(pending=None, scheduler=None, slowest=10):
+    """Everything recorded so far, the slowest trees by total serialize time, plus the given pending queue sizes"""
+    with lock:
+        slowest_trees = sorted(trees.items(), key=lambda item: -item[1]['total_ms'])[:slowest]
+        return {
+            "uptime_s": round(time.time() - started, 1),
+            "log_level": log_level,
+            "counters": dict(counters),
+            "timings": {name: rounded(entry) for name, entry in timings.items()},
+            "trees": {name: rounded(entry) for name, entry in slowest_trees},
+            "tree_count": len(trees),
+            "clients": {str(id): dict(entry) for id, entry in clients.items()},
+            "pending": dict(pending or {}),
+            "scheduler": scheduler or {},
+        }
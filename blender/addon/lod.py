@@ -0,0 +1,191 @@
+import bpy
+import json
+
+# custom property that opts a mesh object out of LOD generation
+LOD_OPT_OUT_PROPERTY = '+noLod'
+
+def parse_float_list(text):
+    """Parse a comma separated list of floats (e.g. "0.5, 0.25")"""
+    if not text:
+        return []
+
+    return [float(value) for value in text.split(',') if value.strip()]
+
+def triangle_count(object, depsgraph=None):
+    """Count the triangles of an object's evaluated mesh (modifiers applied)"""
+    if depsgraph is None:
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+
+    evaluated_object = object.evaluated_get(depsgraph)
+    mesh = evaluated_object.to_mesh()
+    if mesh is None:
+        return 0
+
+    mesh.calc_loop_triangles()
+    count = len(mesh.loop_triangles)
+    evaluated_object.to_mesh_clear()
+
+    return count
+
+def lod_distances(ratios, distances):
+    """Pad switch distances to one per ratio, doubling the last known distance"""
+    distances = list(distances)
+    if not distances:
+        distances = [10.0]
+
+    while len(distances) < len(ratios):
+        distances.append(distances[-1] * 2)
+
+    return distances[:len(ratios)]
+
+def is_lod_candidate(object, skip_objects):
+    if not object.type == 'MESH': return False
+    if object.hide_render: return False
+    if object.get(LOD_OPT_OUT_PROPERTY): return False
+    if '+lodOf' in object: return False
+    if object in skip_objects: return False
+
+    return True
+
+def generate_lods(scene, ratios, distances=None, min_triangles=0, skip_objects=()):
+    """
+    Create decimated copies of every mesh object in the scene so they're exported alongside the base mesh.
+
+    Each copy is named `<name>+lod(<level>)` and carries `+lodOf`, `+lodLevel` and `+lodDistance` extras,
+    the base object gets a `+lods` extra describing every level (level 0 being itself). After the glTF export
+    link_lod_nodes turns the copies into MSFT_lod levels of the base node.
+    The copies are removed again when generating fails, otherwise the caller removes them with cleanup_lods.
+
+    Returns:
+        tuple: (created LOD objects, base objects, report keyed by base object name)
+    """
+    report = {}
+    base_objects = []
+    lod_objects = []
+
+    try:
+        add_lods(scene, ratios, lod_distances(ratios, distances or []), min_triangles, skip_objects, report, base_objects, lod_objects)
+    except Exception:
+        cleanup_lods(lod_objects, base_objects)
+        raise
+
+    return (lod_objects, base_objects, report)
+
+def add_lods(scene, ratios, distances, min_triangles, skip_objects, report, base_objects, lod_objects):
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    levels_by_object = {}
+
+    for object in list(scene.objects):
+        if not is_lod_candidate(object, skip_objects): continue
+
+        base_triangles = triangle_count(object, depsgraph)
+        if base_triangles < min_triangles:
+            report[object.name] = {"skipped": True, "triangles": [base_triangles]}
+            continue
+
+        levels = []
+        for index, ratio in enumerate(ratios):
+            level = index + 1
+
+            lod = object.copy()
+            lod.data = object.data.copy()
+            lod.name = f'{object.name}+lod({level})'
+            # levels are switched by the runtime, animation channels on them would only duplicate the base's
+            lod.animation_data_clear()
+            if lod.data.shape_keys is not None:
+                lod.data.shape_keys.animation_data_clear()
+            for key in ('+lods', '+instances'):
+                if key in lod: del lod[key]
+
+            lod_objects.append(lod)
+            for collection in object.users_collection:
+                collection.objects.link(lod)
+
+            modifier = lod.modifiers.new(name='Sprixle LOD', type='DECIMATE')
+            modifier.ratio = ratio
+
+            lod['+lodOf'] = object.name
+            lod['+lodLevel'] = level
+            lod['+lodDistance'] = distances[index]
+
+            levels.append((lod, ratio, distances[index]))
+
+        base_objects.append(object)
+        levels_by_object[object.name] = (object, base_triangles, levels)
+
+    # decimate modifiers only evaluate after the depsgraph updates
+    bpy.context.view_layer.update()
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+
+    for name, (object, base_triangles, levels) in levels_by_object.items():
+        lods_data = [{"level": 0, "name": object.name, "ratio": 1.0, "distance": 0.0, "triangles": base_triangles}]
+
+        for lod, ratio, distance in levels:
+            lods_data.append({
+                "level": lod['+lodLevel'],
+                "name": lod.name,
+                "ratio": ratio,
+                "distance": distance,
+                "triangles": triangle_count(lod, depsgraph),
+            })
+
+        object['+lods'] = json.dumps(lods_data)
+        report[name] = {"skipped": False, "triangles": [level["triangles"] for level in lods_data]}
+
+        print('[Sprixle.Export LOD]', name, ':', ' -> '.join(str(level["triangles"]) for level in lods_data))
+
+def cleanup_lods(lod_objects, base_objects):
+    for lod in lod_objects:
+        mesh = lod.data
+        bpy.data.objects.remove(lod, do_unlink=True)
+        if mesh and mesh.users == 0:
+            bpy.data.meshes.remove(mesh)
+
+    for object in base_objects:
+        if '+lods' in object: del object['+lods']
+
+def link_lod_nodes(filepath):
+    """
+    Make the exported `+lod(<level>)` nodes MSFT_lod levels of their base node and take them out of the scene
+    graph, so loaders without LOD support only draw the base mesh.
+
+    Returns:
+        int: base nodes that got LOD levels
+    """
+    from . import glb
+    (gltf, binary) = glb.read_glb(filepath)
+    nodes = gltf.get('nodes', [])
+    node_indices = {node.get('name'): index for index, node in enumerate(nodes)}
+
+    levels = {}
+    for index, node in enumerate(nodes):
+        extras = node.get('extras') or {}
+        base = node_indices.get(extras.get('+lodOf'))
+        if base is not None:
+            levels.setdefault(base, []).append((extras.get('+lodLevel', 0), index))
+
+    if not levels:
+        return 0
+
+    lod_nodes = set()
+    for base, entries in levels.items():
+        ids = [index for (_, index) in sorted(entries)]
+        nodes[base].setdefault('extensions', {})['MSFT_lod'] = {"ids": ids}
+        lod_nodes.update(ids)
+
+    for scene in gltf.get('scenes', []):
+        scene['nodes'] = [index for index in scene.get('nodes', []) if index not in lod_nodes]
+    for node in nodes:
+        if 'children' in node:
+            node['children'] = [index for index in node['children'] if index not in lod_nodes]
+            if not node['children']:
+                del node['children']
+
+    extensions_used = gltf.setdefault('extensionsUsed', [])
+    if 'MSFT_lod' not in extensions_used:
+        extensions_used.append('MSFT_lod')
+
+    with open(filepath, 'wb') as file:
+        file.write(glb.write_glb(gltf, binary))
+
+    return len(levels)
@@ -0,0 +1,219 @@
+"""
+Execution plans for serialized logic trees, stored as `$executionPlan` next to the nodes:
+
+    {
+        "version": 1,
+        "nodes": [node id, ...],              node index -> id, in tree order
+        "slots": count,                       value slots, one per linked output socket
+        "constants": [value, ...],            hoisted unlinked input values, deduplicated
+        "instructions": [                     topological order, unreachable and cyclic nodes (and what they feed) left out
+            {"node": index, "inputs": {socket: ref | [ref, ...]}, "outputs": {socket: slot}},
+        ],
+        "cycles": [[node id, ...], ...],
+        "unreachable": [node id, ...],
+    }
+
+An input ref is ["slot", index], ["slots", [index, ...]] for multi-input sockets or ["constant", index].
+"""
+import json
+
+PLAN_VERSION = 1
+
+# nodes whose results leave the tree. Nodes without linked outputs are sinks too: logic trees are trigger / flow
+# graphs, an action at the end of a chain (setSceneState after a trigger) runs for its side effect
+SINK_TYPES = {'GROUP_OUTPUT', 'SIMULATION_OUTPUT', 'REPEAT_OUTPUT'}
+
+def tree_nodes(tree):
+    return [node for key, node in tree.items() if not key.startswith('$') and isinstance(node, dict) and 'id' in node and node.get('type') != 'FRAME']
+
+def socket_values(value):
+    """Serialized sockets with duplicate names are lists"""
+    return value if isinstance(value, list) else [value]
+
+def has_linked_outputs(node):
+    return any(
+        isinstance(socket, dict) and socket.get('type') == 'linked'
+        for value in node['outputs'].values() for socket in socket_values(value)
+    )
+
+def node_links(node):
+    """(input name, links) for the node's linked inputs, links as (node id, socket) pairs"""
+    for name, value in node['inputs'].items():
+        for socket in socket_values(value):
+            if isinstance(socket, dict) and socket.get('type') == 'linked':
+                yield (name, [(link['node'], link['socket']) for link in socket['links']])
+
+def dependencies(nodes):
+    """Node index -> set of node indices it reads from"""
+    index = {node['id']: i for i, node in enumerate(nodes)}
+    return [
+        {index[source] for (_, links) in node_links(node) for (source, _) in links if source in index}
+        for node in nodes
+    ]
+
+def strongly_connected_components(edges):
+    """Tarjan's algorithm, iterative so deep trees don't hit the recursion limit"""
+    count = len(edges)
+    indices = [None] * count
+    lowlinks = [0] * count
+    on_stack = [False] * count
+    stack = []
+    components = []
+    counter = 0
+
+    for root in range(count):
+        if indices[root] is not None: continue
+
+        work = [(root, iter(sorted(edges[root])))]
+        indices[root] = lowlinks[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+
+        while work:
+            (node, neighbours) = work[-1]
+            advanced = False
+            for neighbour in neighbours:
+                if indices[neighbour] is None:
+                    indices[neighbour] = lowlinks[neighbour] = counter
+                    counter += 1
+                    stack.append(neighbour)
+                    on_stack[neighbour] = True
+                    work.append((neighbour, iter(sorted(edges[neighbour]))))
+                    advanced = True
+                    break
+                if on_stack[neighbour]:
+                    lowlinks[node] = min(lowlinks[node], indices[neighbour])
+            if advanced: continue
+
+            work.pop()
+            if work:
+                lowlinks[work[-1][0]] = min(lowlinks[work[-1][0]], lowlinks[node])
+
+            if lowlinks[node] == indices[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node: break
+                components.append(component)
+
+    return components
+
+def find_cycles(edges):
+    return [
+        sorted(component) for component in strongly_connected_components(edges)
+        if len(component) > 1 or component[0] in edges[component[0]]
+    ]
+
+def find_unreachable(nodes, edges):
+    """
+    Nodes that don't feed a sink: an output node or a node whose outputs aren't linked. What's left are nodes
+    whose links only lead out of the serialized tree (to muted or skipped nodes)
+    """
+    sinks = [i for i, node in enumerate(nodes) if node['type'] in SINK_TYPES or not has_linked_outputs(node)]
+
+    reached = set(sinks)
+    pending = list(sinks)
+    while pending:
+        for source in edges[pending.pop()]:
+            if source not in reached:
+                reached.add(source)
+                pending.append(source)
+
+    return set(range(len(nodes))) - reached
+
+def topological_order(edges, excluded):
+    """Kahn's algorithm, ties broken by tree order so plans are stable between exports"""
+    remaining = {i: len(edges[i] - excluded) for i in range(len(edges)) if i not in excluded}
+    dependents = {i: [] for i in remaining}
+    for i in remaining:
+        for source in edges[i] - excluded:
+            dependents[source].append(i)
+
+    ready = sorted(i for i, count in remaining.items() if count == 0)
+    order = []
+    while ready:
+        node = ready.pop(0)
+        order.append(node)
+        for dependent in dependents[node]:
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                ready.append(dependent)
+        ready.sort()
+
+    return order
+
+def execution_plan(tree):
+    """
+    Flatten a serialized logic tree into an instruction list.
+
+    Returns:
+        dict: the `$executionPlan`, see the module docstring
+    """
+    nodes = tree_nodes(tree)
+    edges = dependencies(nodes)
+
+    cycles = find_cycles(edges)
+    unreachable = find_unreachable(nodes, edges)
+    excluded = unreachable | {i for cycle in cycles for i in cycle}
+    # nodes reading from a cycle can't run either, nor anything downstream of them; sources come first
+    # in topological order, so one pass spreads the exclusion along whole chains
+    order = []
+    for i in topological_order(edges, excluded):
+        if edges[i] & excluded:
+            excluded.add(i)
+        else:
+            order.append(i)
+
+    slots = {}
+    constants = []
+    constant_indices = {}
+
+    def slot(node_id, socket):
+        return slots.setdefault((node_id, socket), len(slots))
+
+    def constant(value):
+        key = json.dumps(value, sort_keys=True)
+        if key not in constant_indices:
+            constant_indices[key] = len(constants)
+            constants.append(value)
+        return constant_indices[key]
+
+    def input_ref(socket):
+        if isinstance(socket, dict) and socket.get('type') == 'linked':
+            if len(socket['links']) == 1:
+                return ['slot', slot(socket['links'][0]['node'], socket['links'][0]['socket'])]
+            return ['slots', [slot(link['node'], link['socket']) for link in socket['links']]]
+
+        return ['constant', constant(socket.get('value') if isinstance(socket, dict) else socket)]
+
+    instructions = []
+    for i in order:
+        node = nodes[i]
+        inputs = {}
+        for name, value in node['inputs'].items():
+            refs = [input_ref(socket) for socket in socket_values(value)]
+            inputs[name] = refs if isinstance(value, list) else refs[0]
+
+        outputs = {
+            name: slot(node['id'], name)
+            for name, value in node['outputs'].items()
+            if isinstance(value, dict) and value.get('type') == 'linked'
+        }
+
+        instructions.append({"node": i, "inputs": inputs, "outputs": outputs})
+
+    for cycle in cycles:
+        print('[Sprixle.Export LogicTree] cycle between', ', '.join(nodes[i]['id'] for i in cycle))
+
+    return {
+        "version": PLAN_VERSION,
+        "nodes": [node['id'] for node in nodes],
+        "slots": len(slots),
+        "constants": constants,
+        "instructions": instructions,
+        "cycles": [[nodes[i]['id'] for i in cycle] for cycle in cycles],
+        "unreachable": [nodes[i]['id'] for i in sorted(unreachable)],
+    }
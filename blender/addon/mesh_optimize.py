@@ -0,0 +1,454 @@
+import os
+from collections import deque
+import numpy as np
+from . import glb
+
+# post-vertex-transform cache size assumed when optimizing and estimating vertex shader invocations
+CACHE_SIZE = 16
+
+def simulate_cache_misses(indices, cache_size=CACHE_SIZE):
+    """Count vertex shader invocations for an index buffer with a FIFO post-transform cache"""
+    cache = deque()
+    cached = set()
+    misses = 0
+
+    for index in indices:
+        if index in cached: continue
+
+        misses += 1
+        cache.append(index)
+        cached.add(index)
+        if len(cache) > cache_size:
+            cached.discard(cache.popleft())
+
+    return misses
+
+def tipsify(indices, vertex_count, cache_size=CACHE_SIZE):
+    """
+    Reorder triangles for the post-transform vertex cache
+    (Sander, Nehab, Barczak - Fast Triangle Reordering for Vertex Locality and Reduced Overdraw).
+
+    Returns:
+        tuple: (reordered flat index list, list of triangle offsets where a new cluster starts)
+    """
+    triangle_count = len(indices) // 3
+
+    live = [0] * vertex_count
+    for index in indices:
+        live[index] += 1
+
+    # vertex -> triangles adjacency in CSR form
+    offsets = [0] * (vertex_count + 1)
+    for vertex in range(vertex_count):
+        offsets[vertex + 1] = offsets[vertex] + live[vertex]
+    fill = offsets[:-1]
+    adjacency = [0] * len(indices)
+    for triangle in range(triangle_count):
+        for corner in range(3):
+            vertex = indices[triangle * 3 + corner]
+            adjacency[fill[vertex]] = triangle
+            fill[vertex] += 1
+
+    cache_time = [0] * vertex_count
+    emitted = [False] * triangle_count
+    dead_end = deque()
+    output = []
+    clusters = [0]
+
+    timestamp = cache_size + 1
+    cursor = 0
+    fanning = 0 if vertex_count else -1
+
+    while fanning >= 0:
+        candidates = []
+
+        for position in range(offsets[fanning], offsets[fanning + 1]):
+            triangle = adjacency[position]
+            if emitted[triangle]: continue
+
+            for corner in range(3):
+                vertex = indices[triangle * 3 + corner]
+                output.append(vertex)
+                dead_end.append(vertex)
+                candidates.append(vertex)
+                live[vertex] -= 1
+
+                if timestamp - cache_time[vertex] > cache_size:
+                    cache_time[vertex] = timestamp
+                    timestamp += 1
+
+            emitted[triangle] = True
+
+        best = -1
+        best_priority = -1
+        for vertex in candidates:
+            if live[vertex] <= 0: continue
+
+            priority = 0
+            if timestamp - cache_time[vertex] + 2 * live[vertex] <= cache_size:
+                priority = timestamp - cache_time[vertex]
+            if priority > best_priority:
+                best_priority = priority
+                best = vertex
+
+        if best == -1:
+            # nothing useful left in the cache, this is where a new cluster starts
+            while dead_end:
+                vertex = dead_end.pop()
+                if live[vertex] > 0:
+                    best = vertex
+                    break
+
+            while best == -1 and cursor < vertex_count:
+                if live[cursor] > 0:
+                    best = cursor
+                cursor += 1
+
+            if best >= 0 and len(output) // 3 > clusters[-1]:
+                clusters.append(len(output) // 3)
+
+        fanning = best
+
+    return (output, clusters)
+
+def sort_clusters_for_overdraw(indices, clusters, positions):
+    """Order triangle clusters so outward facing clusters on the outside of the mesh are drawn first"""
+    if len(clusters) < 2:
+        return indices
+
+    triangles = np.asarray(indices, np.int64).reshape(-1, 3)
+    corners = positions[triangles]
+    mesh_center = positions.mean(axis=0)
+    face_normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    face_centers = corners.mean(axis=1)
+
+    bounds = clusters + [len(triangles)]
+    scored = []
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        normal = face_normals[start:end].sum(axis=0)
+        length = np.linalg.norm(normal)
+        if length > 0:
+            normal = normal / length
+        center = face_centers[start:end].mean(axis=0)
+        scored.append((-float(np.dot(center - mesh_center, normal)), start, end))
+
+    scored.sort(key=lambda cluster: cluster[0])
+
+    return np.concatenate([triangles[start:end] for (_, start, end) in scored]).reshape(-1).tolist()
+
+def fetch_remap(index_lists, vertex_count):
+    """Map old vertex index -> new index in order of first use, unused vertices are kept at the end"""
+    remap = np.full(vertex_count, -1, np.int64)
+    next_index = 0
+    for indices in index_lists:
+        for index in indices:
+            if remap[index] < 0:
+                remap[index] = next_index
+                next_index += 1
+
+    unused = np.nonzero(remap < 0)[0]
+    remap[unused] = np.arange(next_index, next_index + len(unused))
+
+    return remap
+
+def quantize_positions(positions, max_error):
+    """
+    Quantize positions to int16 around their center with a uniform step.
+
+    Returns:
+        tuple: (int16 array, center, step) or None when the step would exceed max_error
+    """
+    low = positions.min(axis=0)
+    high = positions.max(axis=0)
+    center = (low + high) / 2
+    extent = float((high - low).max())
+    step = extent / 65534 if extent > 0 else 1.0
+
+    if step / 2 > max_error:
+        return None
+
+    quantized = np.clip(np.round((positions - center) / step), -32767, 32767).astype(np.int16)
+    return (quantized, center, step)
+
+def quantize_normalized(values, dtype):
+    """Quantize [-1, 1] (signed dtype) or [0, 1] (unsigned dtype) values to a normalized integer type"""
+    info = np.iinfo(dtype)
+    return np.clip(np.round(values * info.max), info.min if info.min == 0 else -info.max, info.max).astype(dtype)
+
+def rotate_by_quaternion(vector, quaternion):
+    x, y, z, w = quaternion
+    u = np.array([x, y, z])
+    return 2 * np.dot(u, vector) * u + (w * w - np.dot(u, u)) * vector + 2 * w * np.cross(u, vector)
+
+def apply_dequantization(node, center, step):
+    """Fold the position dequantization transform (translate center, scale step) into a node's local transform"""
+    if 'matrix' in node:
+        matrix = np.array(node['matrix'], np.float64).reshape(4, 4).T
+        dequantize = np.diag([step, step, step, 1.0])
+        dequantize[:3, 3] = center
+        node['matrix'] = (matrix @ dequantize).T.reshape(-1).tolist()
+        return
+
+    translation = np.array(node.get('translation', [0, 0, 0]), np.float64)
+    rotation = node.get('rotation', [0, 0, 0, 1])
+    scale = np.array(node.get('scale', [1, 1, 1]), np.float64)
+
+    node['translation'] = (translation + rotate_by_quaternion(scale * center, rotation)).tolist()
+    node['scale'] = (scale * step).tolist()
+
+def optimize_glb(filepath, reorder=True, quantize=False, quantize_positions_enabled=False, position_error=0.0005, normal_error=0.01, uv_error=0.0001, cache_size=CACHE_SIZE):
+    """
+    Rewrite a GLB with vertex cache / overdraw optimized index order and vertex fetch order (reorder),
+    and / or quantizing normals and UVs (quantize) and positions (quantize_positions_enabled) using
+    KHR_mesh_quantization.
+
+    Position quantization folds a dequantization transform into the mesh nodes, it is skipped for
+    meshes whose nodes have children, skins, extensions, cameras or animated transforms.
+
+    Returns:
+        dict: report keyed by mesh name with byte sizes and estimated vertex shader invocations
+    """
+    original_size = os.path.getsize(filepath)
+    (gltf, binary) = glb.read_glb(filepath)
+
+    report = {"file": {"bytes_before": original_size}, "meshes": {}}
+
+    if len(gltf.get('buffers', [])) != 1 or 'uri' in gltf['buffers'][0]:
+        report['file']['skipped'] = 'external buffers are not supported'
+        return report
+
+    accessors = gltf.get('accessors', [])
+    meshes = gltf.get('meshes', [])
+
+    # count which primitive groups use each accessor so shared data is only rewritten when safe
+    accessor_users = {}
+    # morph target accessor -> groups whose primitives use it, targets follow their group's vertex order
+    target_users = {}
+    groups = {}
+    for mesh_index, mesh in enumerate(meshes):
+        for primitive in mesh.get('primitives', []):
+            if primitive.get('mode', 4) != 4 or 'indices' not in primitive: continue
+            if 'extensions' in primitive: continue
+
+            signature = tuple(sorted(primitive['attributes'].items()))
+            groups.setdefault(signature, []).append((mesh_index, primitive))
+
+            for accessor in list(primitive['attributes'].values()) + [primitive['indices']]:
+                accessor_users.setdefault(accessor, set()).add(signature)
+            for target in primitive.get('targets', []):
+                for accessor in target.values():
+                    accessor_users.setdefault(accessor, set()).add(None)
+                    target_users.setdefault(accessor, set()).add(signature)
+
+    for accessor in accessor_users:
+        if 'sparse' in accessors[accessor]:
+            accessor_users[accessor].add(None)
+
+    replaced = {}
+    new_data = {}
+
+    def mesh_report(mesh_index):
+        name = meshes[mesh_index].get('name', str(mesh_index))
+        return report['meshes'].setdefault(name, {
+            "bytes_before": 0, "bytes_after": 0,
+            "vertex_invocations_before": 0, "vertex_invocations_after": 0,
+            "quantized": [],
+        })
+
+    for signature, primitives in groups.items():
+        for (mesh_index, _) in primitives:
+            mesh_report(mesh_index)
+        if not reorder: continue
+
+        attributes = dict(signature)
+        index_accessors = {primitive['indices'] for (_, primitive) in primitives}
+        target_accessors = {accessor for (_, primitive) in primitives for target in primitive.get('targets', []) for accessor in target.values()}
+        # the vertex fetch remap permutes targets too, so they have to be dense and used by this group alone
+        exclusive = (
+            all(accessor_users[accessor] == {signature} for accessor in list(attributes.values()) + list(index_accessors))
+            and all(
+                accessor_users[accessor] == {None} and target_users[accessor] == {signature} and 'sparse' not in accessors[accessor]
+                for accessor in target_accessors
+            )
+        )
+
+        vertex_count = accessors[attributes['POSITION']]['count'] if 'POSITION' in attributes else 0
+        positions = glb.read_accessor(gltf, binary, attributes['POSITION']).astype(np.float64) if 'POSITION' in attributes else None
+
+        optimized = {}
+        for accessor in index_accessors:
+            indices = glb.read_accessor(gltf, binary, accessor).reshape(-1).tolist()
+            (ordered, clusters) = tipsify(indices, vertex_count, cache_size)
+            if positions is not None:
+                ordered = sort_clusters_for_overdraw(ordered, clusters, positions)
+            optimized[accessor] = (indices, ordered)
+
+        remap = None
+        if exclusive and vertex_count:
+            remap = fetch_remap([optimized[accessor][1] for accessor in sorted(index_accessors)], vertex_count)
+            order = np.argsort(remap)
+            for name, accessor in attributes.items():
+                new_data[accessor] = glb.read_accessor(gltf, binary, accessor)[order]
+            for accessor in target_accessors:
+                if 'bufferView' in accessors[accessor]:
+                    new_data[accessor] = glb.read_accessor(gltf, binary, accessor)[order]
+
+        for accessor, (indices, ordered) in optimized.items():
+            ordered = np.asarray(ordered, np.int64)
+            if remap is not None:
+                ordered = remap[ordered]
+            dtype = glb.COMPONENT_DTYPES[accessors[accessor]['componentType']]
+            new_data[accessor] = ordered.astype(dtype).reshape(-1, 1)
+
+            for (mesh_index, primitive) in primitives:
+                if primitive['indices'] != accessor: continue
+                mesh = mesh_report(mesh_index)
+                mesh['vertex_invocations_before'] += simulate_cache_misses(indices, cache_size)
+                mesh['vertex_invocations_after'] += simulate_cache_misses(ordered.tolist(), cache_size)
+
+    # quantizing changes the component types, so measure every mesh accessor up front
+    bytes_before = {accessor: glb.accessor_byte_length(accessors[accessor]) for (_, accessor) in mesh_accessors(meshes)}
+
+    if quantize or quantize_positions_enabled:
+        quantize_attributes(gltf, new_data, binary, accessor_users, position_error, normal_error, uv_error, quantize, quantize_positions_enabled, report)
+
+    for mesh_index, accessor in mesh_accessors(meshes):
+        if accessor in new_data:
+            mesh_report(mesh_index)['bytes_before'] += bytes_before[accessor]
+
+    for accessor, data in new_data.items():
+        (packed, stride) = glb.pack_elements(data, accessor_stride(accessors[accessor], data))
+        target = glb.TARGET_ELEMENT_ARRAY_BUFFER if is_index_accessor(meshes, accessor) else glb.TARGET_ARRAY_BUFFER
+        replaced[accessor] = (packed, stride, target)
+
+    new_binary = glb.rebuild_buffer(gltf, binary, replaced)
+
+    for mesh_index, accessor in mesh_accessors(meshes):
+        if accessor in new_data:
+            mesh_report(mesh_index)['bytes_after'] += gltf['bufferViews'][accessors[accessor]['bufferView']]['byteLength']
+
+    with open(filepath, 'wb') as file:
+        file.write(glb.write_glb(gltf, new_binary))
+
+    report['file']['bytes_after'] = os.path.getsize(filepath)
+
+    for name, entry in report['meshes'].items():
+        print('[Sprixle.Export Optimize]', name, ':',
+            entry['bytes_before'], '->', entry['bytes_after'], 'bytes,',
+            entry['vertex_invocations_before'], '->', entry['vertex_invocations_after'], 'vertex invocations',
+            ('quantized ' + ','.join(entry['quantized'])) if entry['quantized'] else '')
+    print('[Sprixle.Export Optimize]', filepath, ':', report['file']['bytes_before'], '->', report['file']['bytes_after'], 'bytes')
+
+    return report
+
+def mesh_accessors(meshes):
+    """Yield (mesh index, accessor index) for every attribute and index accessor, once per mesh"""
+    for mesh_index, mesh in enumerate(meshes):
+        counted = set()
+        for primitive in mesh.get('primitives', []):
+            for accessor in list(primitive.get('attributes', {}).values()) + ([primitive['indices']] if 'indices' in primitive else []):
+                if accessor in counted: continue
+                counted.add(accessor)
+                yield (mesh_index, accessor)
+
+def is_index_accessor(meshes, accessor):
+    return any(primitive.get('indices') == accessor for mesh in meshes for primitive in mesh.get('primitives', []))
+
+def accessor_stride(accessor, data):
+    """Vertex attribute elements must be 4 byte aligned"""
+    element_size = data.dtype.itemsize * data.shape[1]
+    if accessor['type'] == 'SCALAR' or element_size % 4 == 0:
+        return None
+
+    return element_size + (-element_size % 4)
+
+def quantize_attributes(gltf, new_data, binary, accessor_users, position_error, normal_error, uv_error, quantize_attributes_enabled, quantize_positions_enabled, report):
+    accessors = gltf['accessors']
+    meshes = gltf.get('meshes', [])
+    nodes = gltf.get('nodes', [])
+
+    def data_for(accessor):
+        if accessor not in new_data:
+            new_data[accessor] = glb.read_accessor(gltf, binary, accessor)
+        return new_data[accessor]
+
+    def exclusive(accessor):
+        return None not in accessor_users.get(accessor, {None})
+
+    animated_nodes = {
+        channel['target'].get('node')
+        for animation in gltf.get('animations', [])
+        for channel in animation.get('channels', [])
+    }
+
+    quantized_any = False
+    for mesh_index, mesh in enumerate(meshes):
+        name = mesh.get('name', str(mesh_index))
+        entry = report['meshes'].get(name)
+        primitives = [primitive for primitive in mesh.get('primitives', []) if 'indices' in primitive and primitive.get('mode', 4) == 4]
+        if entry is None or not primitives: continue
+        if any('targets' in primitive or 'JOINTS_0' in primitive['attributes'] for primitive in primitives): continue
+
+        done = set()
+        for primitive in primitives if quantize_attributes_enabled else ():
+            for attribute, accessor in primitive['attributes'].items():
+                if accessor in done or not exclusive(accessor): continue
+                if accessors[accessor]['componentType'] != 5126: continue
+                done.add(accessor)
+
+                values = data_for(accessor).astype(np.float64)
+                if attribute in ('NORMAL', 'TANGENT'):
+                    if 0.5 / 127 > normal_error: continue
+                    new_data[accessor] = quantize_normalized(values, np.int8)
+                    accessors[accessor]['componentType'] = 5120
+                elif attribute.startswith('TEXCOORD_'):
+                    if values.size == 0 or values.min() < 0 or values.max() > 1 or 0.5 / 65535 > uv_error: continue
+                    new_data[accessor] = quantize_normalized(values, np.uint16)
+                    accessors[accessor]['componentType'] = 5123
+                else:
+                    continue
+
+                accessors[accessor]['normalized'] = True
+                accessors[accessor].pop('min', None)
+                accessors[accessor].pop('max', None)
+                entry['quantized'].append(attribute)
+                quantized_any = True
+
+        if not quantize_positions_enabled: continue
+
+        position_accessors = {primitive['attributes']['POSITION'] for primitive in primitives if 'POSITION' in primitive['attributes']}
+        if not position_accessors or not all(exclusive(accessor) and accessors[accessor]['componentType'] == 5126 for accessor in position_accessors): continue
+        if any(len(accessor_users[accessor]) > 1 for accessor in position_accessors): continue
+
+        mesh_nodes = [node for node in nodes if node.get('mesh') == mesh_index]
+        shared_elsewhere = any(
+            other.get('attributes', {}).get('POSITION') in position_accessors
+            for other_index, other_mesh in enumerate(meshes) if other_index != mesh_index
+            for other in other_mesh.get('primitives', [])
+        )
+        if not mesh_nodes or shared_elsewhere: continue
+        if any(node.get('children') or 'skin' in node or 'extensions' in node or 'camera' in node or nodes.index(node) in animated_nodes for node in mesh_nodes): continue
+
+        positions = np.concatenate([data_for(accessor).astype(np.float64) for accessor in sorted(position_accessors)])
+        result = quantize_positions(positions, position_error)
+        if result is None: continue
+        (_, center, step) = result
+
+        for accessor in position_accessors:
+            quantized = np.clip(np.round((data_for(accessor).astype(np.float64) - center) / step), -32767, 32767).astype(np.int16)
+            new_data[accessor] = quantized
+            accessors[accessor]['componentType'] = 5122
+            accessors[accessor]['min'] = quantized.min(axis=0).tolist()
+            accessors[accessor]['max'] = quantized.max(axis=0).tolist()
+
+        for node in mesh_nodes:
+            apply_dequantization(node, center, step)
+
+        entry['quantized'].append('POSITION')
+        quantized_any = True
+
+    if quantized_any:
+        for key in ('extensionsUsed', 'extensionsRequired'):
+            extensions = gltf.setdefault(key, [])
+            if 'KHR_mesh_quantization' not in extensions:
+                extensions.append('KHR_mesh_quantization')
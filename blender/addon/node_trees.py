@@ -3,11 +3,170 @@ import json
 import mathutils
 import os
 import re
+import sys
 import hashlib
+import time
+from . import driver_expressions
+from . import logic_plan
+from . import compact_trees
+from . import compositor_passes
+from . import artifact_cache
+from . import live_stats
 
 def is_struct(val):
     return val.__class__.__name__ == "bpy_prop_array" or isinstance(val, bpy.types.bpy_struct)
 
+def value_signature(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return repr(value)
+    if isinstance(value, bpy.types.ID):
+        return 'ID:' + value.name
+    try:
+        return repr(tuple(value))
+    except TypeError:
+        return type(value).__name__
+
+def socket_signature(socket):
+    links = ','.join(f'{link.from_node.name}.{link.from_socket.name}>{link.to_node.name}.{link.to_socket.name}' for link in socket.links) if socket.is_linked else ''
+    return f'{socket.name}|{socket.type}|{socket.enabled}|{socket.is_unavailable}|{socket.hide_value}|{socket.label}|{value_signature(getattr(socket, "default_value", None))}|{links}'
+
+# (target pointer, tree format) -> memoised tree_cache_key, dropped by invalidate_tree_keys
+tree_keys = {}
+# datablock pointer -> tree_keys entries whose fingerprint read it
+tree_key_dependents = {}
+
+def tree_fingerprint(node_tree, digest, visited, dependencies=None):
+    """
+    Feed everything serialize reads from a node tree (and the group trees it uses) into digest,
+    adding the pointers of the trees and images it read to dependencies.
+    """
+    if node_tree.name in visited: return
+    visited.add(node_tree.name)
+    if dependencies is not None:
+        dependencies.add(node_tree.as_pointer())
+
+    base_properties = bpy.types.Node.bl_rna.properties.keys()
+    digest.update(f'tree|{node_tree.name}|{len(node_tree.nodes)}'.encode('utf-8'))
+    for node in node_tree.nodes:
+        parts = [node.name, node.type, str(node.mute)]
+        parts.extend(f'{attribute}={value_signature(getattr(node, attribute, None))}' for attribute in node.bl_rna.properties.keys() if attribute not in base_properties)
+        parts.extend(socket_signature(socket) for socket in node.inputs)
+        parts.extend(socket_signature(socket) for socket in node.outputs)
+
+        if node.type == 'VALTORGB':
+            ramp = node.color_ramp
+            parts.append(f'{ramp.color_mode}|{ramp.interpolation}|{ramp.hue_interpolation}')
+            parts.extend(f'{element.position}|{tuple(element.color)}' for element in ramp.elements)
+        if node.type == 'TEX_IMAGE' and node.image:
+            parts.append(node.image.filepath)
+            if dependencies is not None:
+                dependencies.add(node.image.as_pointer())
+
+        digest.update('\x00'.join(parts).encode('utf-8'))
+
+        if node.type == 'GROUP' and node.node_tree:
+            tree_fingerprint(node.node_tree, digest, visited, dependencies)
+
+    if node_tree.animation_data:
+        for driver in node_tree.animation_data.drivers:
+            digest.update(json.dumps([driver.data_path, driver_expressions.serialize_driver(driver)], sort_keys=True, default=str).encode('utf-8'))
+
+def tree_cache_key(target, node_group, name, tree_format):
+    """
+    Content key of a serialized tree: its source, the target kind, output format and serializer sources.
+    Memoised per target until a datablock it read is updated, see invalidate_tree_keys.
+    """
+    memo = (target.as_pointer(), tree_format)
+    key = tree_keys.get(memo)
+    if key is not None:
+        return key
+
+    digest = hashlib.blake2b(digest_size=16)
+    dependencies = {target.as_pointer()}
+    tree_fingerprint(node_group, digest, set(), dependencies)
+    version = artifact_cache.source_version(sys.modules[__name__], driver_expressions, logic_plan, compact_trees, compositor_passes)
+
+    key = tree_keys[memo] = artifact_cache.fingerprint(type(target).__name__, name, tree_format, version, digest.hexdigest())
+    for pointer in dependencies:
+        tree_key_dependents.setdefault(pointer, set()).add(memo)
+    return key
+
+def invalidate_tree_keys(id):
+    """Forget the memoised cache keys that read the datablock, called for every depsgraph update"""
+    for memo in tree_key_dependents.pop(id.original.as_pointer(), ()):
+        tree_keys.pop(memo, None)
+
+def clear_tree_keys():
+    """Forget every memoised cache key, datablock pointers change on file load and undo"""
+    tree_keys.clear()
+    tree_key_dependents.clear()
+
+def save_texture(image):
+    """
+    Save an image node's image to //textures unless it's already there.
+
+    Returns:
+        str: the file name the serialized node refers to
+    """
+    filepath = image.filepath
+    splitPath = re.split(r"[\\/]", filepath)
+    filename = splitPath[-1]
+    if '.' not in filename: filename = filename + '.png'
+    if not filepath.startswith('//textures'):
+        newpath = '//textures/' + filename
+        print('[SAVE_IMAGE]', filepath, newpath)
+        image.filepath = newpath
+        # the file path is part of the fingerprint
+        invalidate_tree_keys(image)
+        try:
+            image.save()
+        except:
+            print('unable to save', filepath)
+            # try:
+            #     image.unpack(method='WRITE_LOCAL')
+            # except:
+            #     pass
+
+            # try:
+            #     image.pack()
+            # except:
+            #     pass
+    print('[IMAGE]', filepath, filename)
+    return filename
+
+def save_tree_textures(node_tree, visited):
+    """Save the images of a tree and its group trees, what serializing does for a tree served from the cache"""
+    if node_tree.name in visited: return
+    visited.add(node_tree.name)
+
+    for node in node_tree.nodes:
+        if node.type == 'TEX_IMAGE' and node.image:
+            save_texture(node.image)
+        elif node.type == 'GROUP' and node.node_tree:
+            save_tree_textures(node.node_tree, visited)
+
+def tree_file_name(target, name, tree_format='full'):
+    """Path of the tree json relative to the .blend, compact trees are written as `<name>.compact.json`"""
+    fileName = name.replace('.', '-')
+    if tree_format == 'compact':
+        fileName = fileName + '.compact'
+    if isinstance(target, (bpy.types.Material, bpy.types.World, bpy.types.Scene)):
+        return 'shaders/' + fileName
+    return 'logic-trees/' + fileName
+
+def write_tree_file(target, name, output, tree_format='full'):
+    """Write the tree json, skipped when the file already holds the same output"""
+    path = bpy.path.abspath('//' + tree_file_name(target, name, tree_format) + '.json')
+    if os.path.exists(path):
+        with open(path) as file:
+            if file.read() == output:
+                return False
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as file:
+        file.write(output)
+    return True
+
 vector_space_rules = {
     'output_spaces': {
         'R_LAYERS': {'__ALL__': 'OBJECT'},
@@ -127,33 +286,62 @@ def calculate_vector_space(node, socket, type = 'output'):
     else:
         return 'PRESERVE'
 
-def serialize(target):
-    modifier = None
-    node_group = None
-    name = ''
+def tree_source(target):
+    """
+    The node tree serialize reads from a +logic object, material, compositor (scene) or world, without serializing it.
+
+    Returns:
+        tuple: (node tree, name) or (None, None) when the target has no tree
+    """
+    if target is None:
+        return (None, None)
     if hasattr(target, 'modifiers'):
         modifier = next((m for m in target.modifiers if m.type == 'NODES' and m.node_group and '+logic' in m.node_group.name), None)
         if modifier is None:
             return (None, None)
-        node_group = modifier.node_group
-        name = node_group.name
+        return (modifier.node_group, modifier.node_group.name)
     elif isinstance(target, bpy.types.Material):
         # if not '+compile' in target.name: return (None, None)
-        modifier = target
-        node_group = modifier.node_tree
-        name = target.name
+        return (target.node_tree, target.name) if target.node_tree else (None, None)
     elif isinstance(target, bpy.types.Scene):
-        modifier = target
-        node_group = modifier.compositing_node_group
-        if not node_group: return (None, None)
-        name = node_group.name or target.name
+        node_group = target.compositing_node_group
+        return (node_group, node_group.name or target.name) if node_group else (None, None)
     elif isinstance(target, bpy.types.World):
-        modifier = target
-        node_group = modifier.node_tree
-        if not node_group: return (None, None)
-        name = target.name
-
-    if not modifier or not node_group: return (None, None)
+        return (target.node_tree, target.name) if target.node_tree else (None, None)
+
+    return (None, None)
+
+def tree_version(target, tree_format='full'):
+    """Content version of the target's serialized tree (its artifact cache key), None when it has no tree"""
+    (node_group, name) = tree_source(target)
+    if not node_group:
+        return None
+    return tree_cache_key(target, node_group, name, tree_format)
+
+def serialize(target, tree_format='full'):
+    """
+    Serialize the node tree of a +logic object, material, compositor (scene) or world and write it to json.
+    tree_format 'compact' writes and returns the string table format from compact_trees.
+
+    Returns:
+        tuple: (serialized tree, name) or (None, None) when the target has no tree
+    """
+    (node_group, name) = tree_source(target)
+    if not node_group: return (None, None)
+    started = time.perf_counter()
+
+    cache = artifact_cache.blend_cache()
+    if cache:
+        cache_key = tree_cache_key(target, node_group, name, tree_format)
+        cached = cache.get('tree', cache_key)
+        if cached is not None:
+            output = cached.decode('utf-8')
+            save_tree_textures(node_group, set())
+            write_tree_file(target, name, output, tree_format)
+            serialized_tree = json.loads(output)
+            del serialized_tree['hash']
+            live_stats.record_tree(name, (time.perf_counter() - started) * 1000, cached=True)
+            return (serialized_tree, name)
 
     def serialize_tree(node_tree, internal_trees = None):
         nodes_data = {}
@@ -192,7 +380,11 @@ def serialize(target):
                     # print(attribute)
         
         if node_tree.animation_data:
-            drivers = [{"socket": node_tree.path_resolve('.'.join(driver.data_path.split('.')[:-1])).name, 'expression': driver.driver.expression} for driver in node_tree.animation_data.drivers if node_tree.path_resolve('.'.join(driver.data_path.split('.')[:-1])).node.name == node.name]
+            drivers = []
+            for driver in node_tree.animation_data.drivers:
+                socket = node_tree.path_resolve('.'.join(driver.data_path.split('.')[:-1]))
+                if not socket.node.name == node.name: continue
+                drivers.append({"socket": socket.name, **driver_expressions.serialize_driver(driver)})
 
             if len(drivers):
                 node_data['properties']['drivers'] = drivers
@@ -213,31 +405,7 @@ def serialize(target):
                 })
 
         if node.type == 'TEX_IMAGE' and not node.image == None:
-            image = node.image
-            name = image.name
-            filepath = image.filepath
-            splitPath = re.split(r"[\\/]", filepath)
-            filename = splitPath[-1]
-            if '.' not in filename: filename = filename + '.png'
-            if not filepath.startswith('//textures'):
-                newpath = '//textures/' + filename
-                print('[SAVE_IMAGE]', filepath, newpath)
-                image.filepath = newpath
-                try:
-                    image.save()
-                except:
-                    print('unable to save', filepath)
-                    # try:
-                    #     image.unpack(method='WRITE_LOCAL')
-                    # except:
-                    #     pass
-
-                    # try:
-                    #     image.pack()
-                    # except:
-                    #     pass
-            print('[IMAGE]', filepath, filename)
-            node_data['properties']['image'] = filename
+            node_data['properties']['image'] = save_texture(node.image)
         
         # TODO handle vectors
         for input in node.inputs:
@@ -414,35 +582,26 @@ def serialize(target):
         
     serialized_tree = serialize_tree(node_group)
 
-    output = json.dumps(serialized_tree, indent=2)
-    fileName = name.replace('.', '-')
-    if isinstance(target, bpy.types.Material):
-        os.makedirs(bpy.path.abspath('//shaders'), exist_ok=True)
-        fileName = 'shaders/' + fileName
-        # target['shaderTree'] = output
-    elif isinstance(target, bpy.types.World):
-        os.makedirs(bpy.path.abspath('//shaders'), exist_ok=True)
-        fileName = 'shaders/' + fileName
-        # bpy.context.scene['worldShaderTree'] = output
+    if hasattr(target, 'modifiers'):
+        serialized_tree['$executionPlan'] = logic_plan.execution_plan(serialized_tree)
+        for internal_tree in serialized_tree['$internalTrees'].values():
+            internal_tree['$executionPlan'] = logic_plan.execution_plan(internal_tree)
     elif isinstance(target, bpy.types.Scene):
-        os.makedirs(bpy.path.abspath('//shaders'), exist_ok=True)
-        fileName = 'shaders/' + fileName
-        # bpy.context.scene['compositionShaderTree'] = output
-    else:
-        os.makedirs(bpy.path.abspath('//logic-trees'), exist_ok=True)
-        fileName = 'logic-trees/' + fileName
-    #     bpy.context.scene[name] = output
-    #     target['logicTree'] = name
-    # print('set custom attrib?')
+        serialized_tree['$passes'] = compositor_passes.fusion_plan(serialized_tree)
 
-    
+    if tree_format == 'compact':
+        serialized_tree = compact_trees.compact(serialized_tree)
+        output = json.dumps(serialized_tree, separators=(',', ':'))
+    else:
+        output = json.dumps(serialized_tree, indent=2)
     hash = hashlib.md5(output.encode('utf-8')).hexdigest()
     output = output[:1] + '"hash": "' + hash + '",' + output[1:]
 
-    with open(bpy.path.abspath('//'+fileName+'.json'), "w") as file:
-        file.write(output)
-
+    write_tree_file(target, name, output, tree_format)
+    if cache:
+        cache.put('tree', cache_key, output.encode('utf-8'))
 
+    live_stats.record_tree(name, (time.perf_counter() - started) * 1000)
     return (serialized_tree, name)
 
 
@@ -0,0 +1,144 @@
+import bpy
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+
+class ExportProfile:
+    """Collects wall time per export stage and per object, written as a JSON report next to the export"""
+
+    def __init__(self, scene_name):
+        self.scene_name = scene_name
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.objects = {}
+        self.extra = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    @contextmanager
+    def object(self, stage, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings = self.objects.setdefault(stage, {})
+            timings[name] = timings.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def report(self, glb_path=None):
+        data = {
+            "scene": self.scene_name,
+            "blend": bpy.data.filepath,
+            "blender_version": bpy.app.version_string,
+            "created": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "stages_ms": {name: round(ms, 3) for name, ms in self.stages.items()},
+            "objects_ms": {
+                stage: dict(sorted(((name, round(ms, 3)) for name, ms in timings.items()), key=lambda item: -item[1]))
+                for stage, timings in self.objects.items()
+            },
+        }
+        data.update(self.extra)
+
+        if glb_path and os.path.exists(glb_path):
+            data['glb'] = glb_breakdown(glb_path)
+
+        return data
+
+    def write(self, glb_path=None):
+        data = self.report(glb_path)
+
+        os.makedirs(bpy.path.abspath('//export-reports'), exist_ok=True)
+        path = bpy.path.abspath('//export-reports/' + self.scene_name + '.json')
+        with open(path, 'w') as file:
+            file.write(json.dumps(data, indent=2))
+
+        data['report_path'] = path
+        data['glb_path'] = glb_path
+
+        print('[Sprixle.Export Profile]', self.scene_name, ':', data['total_ms'], 'ms', ', '.join(f'{name} {ms}ms' for name, ms in data['stages_ms'].items()))
+
+        return data
+
+def timed(profile, stage, name=None):
+    """Time a stage (or an object within a stage) when profiling, otherwise do nothing"""
+    if profile is None:
+        return nullcontext()
+
+    return profile.object(stage, name) if name else profile.stage(stage)
+
+def glb_breakdown(path):
+    """Byte breakdown of a GLB: chunks, meshes, accessors, textures and animations"""
+    # numpy heavy, only exports need it
+    from . import glb
+    (gltf, binary) = glb.read_glb(path)
+    accessors = gltf.get('accessors', [])
+    views = gltf.get('bufferViews', [])
+
+    def accessor_bytes(index):
+        accessor = accessors[index]
+        if 'bufferView' not in accessor:
+            return 0
+
+        stride = views[accessor['bufferView']].get('byteStride')
+        return stride * accessor['count'] if stride else glb.accessor_byte_length(accessor)
+
+    def accessor_name(index):
+        accessor = accessors[index]
+        return f"{index}:{accessor['type']}:{glb.COMPONENT_DTYPES[accessor['componentType']].__name__}"
+
+    accessor_usage = {}
+    meshes = {}
+    for mesh_index, mesh in enumerate(gltf.get('meshes', [])):
+        name = mesh.get('name', str(mesh_index))
+        counted = set()
+        size = 0
+        for primitive in mesh.get('primitives', []):
+            used = [(attribute, accessor) for attribute, accessor in primitive.get('attributes', {}).items()]
+            if 'indices' in primitive:
+                used.append(('indices', primitive['indices']))
+            for target in primitive.get('targets', []):
+                used.extend(('target ' + attribute, accessor) for attribute, accessor in target.items())
+
+            for usage, accessor in used:
+                accessor_usage.setdefault(accessor, set()).add(f'{name}/{usage}')
+                if accessor in counted: continue
+                counted.add(accessor)
+                size += accessor_bytes(accessor)
+        meshes[name] = size
+
+    animations = {}
+    for animation_index, animation in enumerate(gltf.get('animations', [])):
+        name = animation.get('name', str(animation_index))
+        counted = set()
+        size = 0
+        for sampler in animation.get('samplers', []):
+            for accessor in (sampler['input'], sampler['output']):
+                accessor_usage.setdefault(accessor, set()).add(f'animation {name}')
+                if accessor in counted: continue
+                counted.add(accessor)
+                size += accessor_bytes(accessor)
+        animations[name] = size
+
+    textures = {}
+    for image_index, image in enumerate(gltf.get('images', [])):
+        name = image.get('name', str(image_index))
+        textures[name] = views[image['bufferView']]['byteLength'] if 'bufferView' in image else 0
+
+    return {
+        "file_bytes": os.path.getsize(path),
+        "chunks": glb.chunk_sizes(path),
+        "meshes": dict(sorted(meshes.items(), key=lambda item: -item[1])),
+        "textures": dict(sorted(textures.items(), key=lambda item: -item[1])),
+        "animations": dict(sorted(animations.items(), key=lambda item: -item[1])),
+        "accessors": {
+            accessor_name(index): {"bytes": accessor_bytes(index), "count": accessors[index]['count'], "used_by": sorted(accessor_usage.get(index, []))}
+            for index in sorted(range(len(accessors)), key=lambda index: -accessor_bytes(index))
+        },
+    }
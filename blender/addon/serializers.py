@@ -2,65 +2,161 @@ import json
 import bpy
 import os
 
-def view_layer(vlayer):
-    data = serialize_bpy_object(vlayer, skip_attributes=['objects'])
+BASE_SKIP_ATTRIBUTES = ('rna_type', 'name_full', 'path_from_id', 'users_group', '_RNA_UI')
+
+# per RNA type: "skip" properties, "include" whitelist (None for all) and "max_depth" of collections followed below it
+TYPE_RULES = {
+    'ViewLayer': {"skip": ('objects',)},
+    'LayerCollection': {"max_depth": 16},
+}
+DEFAULT_MAX_DEPTH = 6
+
+SCALAR_PROPERTY_TYPES = {'BOOLEAN', 'INT', 'FLOAT', 'STRING', 'ENUM'}
+
+# (RNA type identifier, skip attributes) -> [(property identifier, kind)]
+property_plans = {}
+
+# view layer file path -> last written json, see view_layer
+written_view_layers = {}
+# view layer file path -> view_layer_fingerprint when it was last serialized
+view_layer_fingerprints = {}
+
+def read_property(bl_object, name):
+    try:
+        return getattr(bl_object, name)
+    except (AttributeError, TypeError):
+        return None
+
+def scalar_fingerprint(bl_object):
+    """Scalar values, pointer names and collection lengths of a struct, in its property plan's order"""
+    values = []
+    for (name, kind) in property_plan(bl_object.bl_rna):
+        value = read_property(bl_object, name)
+        if kind == 'value':
+            values.append(value if isinstance(value, (int, float, str, bool)) else None)
+        elif kind == 'pointer':
+            values.append(getattr(value, 'name', None))
+        else:
+            values.append(len(value) if value is not None else None)
+    return tuple(values)
+
+def view_layer_fingerprint(vlayer):
+    """
+    What the view layer's serialization depends on, without building it: its scalars and pointer names and the
+    scalars of its collection items (AOVs, light groups), the items have no collections of their own to walk.
+    """
+    collections = tuple(
+        tuple(scalar_fingerprint(item) for item in (read_property(vlayer, name) or ()) if isinstance(item, bpy.types.bpy_struct))
+        for (name, kind) in property_plan(vlayer.bl_rna) if kind == 'collection'
+    )
+    return (scalar_fingerprint(vlayer), collections)
+
+def view_layer(vlayer, force=False):
+    """
+    Write `//view-layers/<name>.json`. Depsgraph updates only serialize the view layer again when its fingerprint
+    changed (force skips that check), and the file is only written when the serialization changed.
+
+    Returns:
+        bool: whether the file was written
+    """
+    path = bpy.path.abspath('//view-layers/' + vlayer.name + '.json')
+    fingerprint = view_layer_fingerprint(vlayer)
+    if not force and view_layer_fingerprints.get(path) == fingerprint:
+        return False
+    view_layer_fingerprints[path] = fingerprint
+
+    data = serialize_bpy_object(vlayer)
     output = json.dumps(data, indent=2)
 
+    if path not in written_view_layers and os.path.exists(path):
+        with open(path) as file:
+            written_view_layers[path] = file.read()
+
+    if written_view_layers.get(path) == output:
+        return False
+
     os.makedirs(bpy.path.abspath('//view-layers'), exist_ok=True)
-    with open(bpy.path.abspath('//view-layers/' + vlayer.name + '.json'), 'w') as file:
+    with open(path, 'w') as file:
         file.write(output)
+    written_view_layers[path] = output
+
+    return True
+
+def property_plan(rna, skip_attributes=()):
+    """
+    Which properties of an RNA type get serialized and how, computed once per type.
+
+    Returns:
+        list: (property identifier, 'value' | 'collection' | 'pointer') pairs
+    """
+    key = (rna.identifier, skip_attributes)
+    plan = property_plans.get(key)
+    if plan is not None:
+        return plan
+
+    rules = TYPE_RULES.get(rna.identifier, {})
+    skip = set(BASE_SKIP_ATTRIBUTES) | set(skip_attributes) | set(rules.get('skip', ()))
+    include = rules.get('include')
 
+    plan = []
+    for prop in rna.properties:
+        name = prop.identifier
+        if name in skip or (include is not None and name not in include):
+            continue
 
+        if prop.type == 'COLLECTION':
+            plan.append((name, 'collection'))
+        elif prop.type == 'POINTER':
+            plan.append((name, 'pointer'))
+        elif prop.type in SCALAR_PROPERTY_TYPES and not getattr(prop, 'is_array', False) and not getattr(prop, 'is_enum_flag', False):
+            plan.append((name, 'value'))
 
+    property_plans[key] = plan
+    return plan
 
-def serialize_bpy_object(bl_object, skip_attributes=None):
+def serialize_bpy_object(bl_object, skip_attributes=None, depth=0, ancestors=None):
     """
     Serializes a bpy object's relevant properties into a dictionary.
-    
+
     Args:
         bl_object (bpy.types.bpy_struct): The Blender object instance.
         skip_attributes (list): List of attribute names to ignore.
+        depth (int): collection nesting of bl_object, collections stop at the type's max_depth.
+        ancestors (set): as_pointer() of the structs being serialized above, items already on the path are skipped.
 
     Returns:
         dict: A dictionary containing the serializable properties.
     """
-    if skip_attributes is None:
-        skip_attributes = ['rna_type', 'name_full', 'path_from_id', 'users_group', '_RNA_UI']
-    else:
-        skip_attributes = skip_attributes + ['rna_type', 'name_full', 'path_from_id', 'users_group', '_RNA_UI']
+    plan = property_plan(bl_object.bl_rna, tuple(skip_attributes or ()))
+    max_depth = TYPE_RULES.get(bl_object.bl_rna.identifier, {}).get('max_depth', DEFAULT_MAX_DEPTH)
 
-    data = {}
-    # Iterate over all properties defined by the RNA structure
-    for prop in bl_object.bl_rna.properties:
-        name = prop.identifier
-        if name in skip_attributes:
-            continue
+    ancestors = set() if ancestors is None else ancestors
+    pointer = bl_object.as_pointer()
+    ancestors.add(pointer)
 
+    data = {}
+    for (name, kind) in plan:
         try:
             value = getattr(bl_object, name)
-            # print(name, type(value))
-            # Handle different bpy property types
-            if isinstance(value, (int, float, str, bool)):
-                data[name] = value
-            elif isinstance(value, bpy.types.bpy_prop_collection):
-                # print('attempt collection', name, value)
-                data[name] = list(serialize_bpy_object(item) for item in list(value))
-            elif isinstance(value, (list, tuple)):
-                # Convert list/tuple of basic types (like colors or vectors)
-                data[name] = list(value)
-            elif isinstance(value, bpy.types.bpy_struct):
-                # Recursively serialize nested bpy structures if necessary, 
-                # or just store a reference (e.g., object name)
-                # This example stores the name if available, otherwise skips
-                data[name] = value.name if hasattr(value, 'name') else None
-            # Note: Complex types like meshes, materials, or collections require
-            # much more specific handling to capture all relevant data.
-
-        except AttributeError:
+        except (AttributeError, TypeError):
             # Skip properties that are not readable
             continue
-        except TypeError:
-            # Skip properties that are not easily convertible
-            continue
 
-    return data
\ No newline at end of file
+        if kind == 'value':
+            if isinstance(value, (int, float, str, bool)):
+                data[name] = value
+        elif kind == 'collection':
+            if depth >= max_depth:
+                continue
+            data[name] = [
+                serialize_bpy_object(item, None, depth + 1, ancestors)
+                for item in value
+                if isinstance(item, bpy.types.bpy_struct) and item.as_pointer() not in ancestors
+            ]
+        elif isinstance(value, bpy.types.bpy_struct):
+            # store a reference (e.g. object name) for nested structs
+            data[name] = value.name if hasattr(value, 'name') else None
+
+    ancestors.discard(pointer)
+
+    return data
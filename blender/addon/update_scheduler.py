@@ -0,0 +1,170 @@
+"""
+Adaptive debounce of live link updates. Every pending update has a key (one tree, the realtime export batch, the
+edited actions) and a kind with its own settings:
+
+- leading edge: the first update after a quiet period runs on the next tick
+- trailing edge: later updates wait until the key was quiet for the kind's debounce, which adapts to the
+  measured cost of the kind (an export taking 200ms isn't worth repeating every 80ms) within its bounds
+- max latency: an update pending that long runs even while edits keep coming, so a continuous drag can't starve it
+- priority: due updates run cheapest kind first, within a per tick budget, the rest wait for the next tick
+
+Decisions are counted per kind, see UpdateScheduler.metrics.
+"""
+import bpy
+import time
+from . import live_stats
+
+KIND_SETTINGS = {
+    # priority (lower runs first), debounce bounds and the longest an update may stay pending, in ms
+    'shaderTree': {"priority": 0, "min_debounce_ms": 60, "max_debounce_ms": 250, "max_latency_ms": 300},
+    'logicTree': {"priority": 1, "min_debounce_ms": 100, "max_debounce_ms": 300, "max_latency_ms": 500},
+    'action': {"priority": 1, "min_debounce_ms": 100, "max_debounce_ms": 400, "max_latency_ms": 600},
+    'realtimeGeometry': {"priority": 2, "min_debounce_ms": 300, "max_debounce_ms": 1000, "max_latency_ms": 1500},
+}
+DEFAULT_SETTINGS = {"priority": 1, "min_debounce_ms": 300, "max_debounce_ms": 300, "max_latency_ms": 1000}
+
+# the debounce of a kind is its average cost times this, clamped to its bounds
+COST_FACTOR = 2.0
+# weight of the last run in the average cost
+COST_SMOOTHING = 0.2
+# time spent running updates per tick, at least one update runs every tick
+TICK_BUDGET_MS = 30
+
+class UpdateScheduler:
+    def __init__(self, settings=None):
+        self.settings = settings or KIND_SETTINGS
+        # key -> {"kind", "run", "first", "last", "due"}, times in perf_counter seconds
+        self.pending = {}
+        # key -> when it last ran, for the leading edge
+        self.last_run = {}
+        # kind -> counters and timings, see metrics
+        self.kinds = {}
+        self.wake = None
+        # bpy.app.timers identifies timers by function, keep one bound method
+        self.timer = self.tick
+
+    def kind_settings(self, kind):
+        return self.settings.get(kind, DEFAULT_SETTINGS)
+
+    def kind_metrics(self, kind):
+        metrics = self.kinds.get(kind)
+        if metrics is None:
+            metrics = self.kinds[kind] = {
+                "scheduled": 0, "coalesced": 0, "runs": 0, "leading": 0, "trailing": 0, "forced": 0, "deferred": 0,
+                "cost_ms": None, "last_latency_ms": None, "max_latency_ms": 0.0,
+            }
+        return metrics
+
+    def debounce(self, kind):
+        """Current trailing edge delay of a kind in seconds"""
+        settings = self.kind_settings(kind)
+        cost = self.kind_metrics(kind)['cost_ms']
+        delay = settings['min_debounce_ms'] if cost is None else min(max(cost * COST_FACTOR, settings['min_debounce_ms']), settings['max_debounce_ms'])
+        return delay / 1000.0
+
+    def schedule(self, kind, key, run):
+        """
+        Run `run()` for key according to its kind's settings, replacing the function of an update still pending for
+        the same key (it sees the latest state when it runs).
+        """
+        now = time.perf_counter()
+        metrics = self.kind_metrics(kind)
+        metrics['scheduled'] += 1
+
+        entry = self.pending.get(key)
+        if entry:
+            metrics['coalesced'] += 1
+            entry['run'] = run
+            entry['last'] = now
+            if entry['leading']:
+                # still runs on the next tick with the latest state
+                return
+            entry['due'] = min(now + self.debounce(kind), entry['first'] + self.kind_settings(kind)['max_latency_ms'] / 1000.0)
+        else:
+            leading = now - self.last_run.get(key, 0.0) >= self.debounce(kind)
+            entry = self.pending[key] = {
+                "kind": kind, "run": run, "first": now, "last": now,
+                "due": now if leading else now + self.debounce(kind), "leading": leading,
+            }
+
+        self.wake_at(entry['due'])
+
+    def wake_at(self, due):
+        """Make sure the timer fires by due, re-registering it when it sleeps longer"""
+        if self.wake is not None and self.wake <= due and bpy.app.timers.is_registered(self.timer):
+            return
+
+        if bpy.app.timers.is_registered(self.timer):
+            bpy.app.timers.unregister(self.timer)
+        self.wake = due
+        bpy.app.timers.register(self.timer, first_interval=max(due - time.perf_counter(), 0.0))
+
+    def tick(self):
+        now = time.perf_counter()
+        due = [(key, entry) for key, entry in self.pending.items() if entry['due'] <= now]
+        due.sort(key=lambda item: (self.kind_settings(item[1]['kind'])['priority'], item[1]['first']))
+
+        start = now
+        for index, (key, entry) in enumerate(due):
+            if index > 0 and (time.perf_counter() - start) * 1000 >= TICK_BUDGET_MS:
+                for (_, deferred) in due[index:]:
+                    self.kind_metrics(deferred['kind'])['deferred'] += 1
+                break
+            self.run(key, entry)
+
+        if not self.pending:
+            self.wake = None
+            return None
+
+        self.wake = min(entry['due'] for entry in self.pending.values())
+        return max(self.wake - time.perf_counter(), 0.0)
+
+    def run(self, key, entry):
+        del self.pending[key]
+        kind = entry['kind']
+        metrics = self.kind_metrics(kind)
+
+        start = time.perf_counter()
+        if entry['leading']:
+            metrics['leading'] += 1
+        elif start - entry['last'] >= self.debounce(kind) - 0.001:
+            metrics['trailing'] += 1
+        else:
+            metrics['forced'] += 1
+
+        try:
+            entry['run']()
+        except Exception as error:
+            # keep the timer alive for the other pending updates
+            live_stats.log('error', 'update failed', key, repr(error), scope='Scheduler')
+        finally:
+            end = time.perf_counter()
+            self.last_run[key] = end
+            cost = (end - start) * 1000
+            metrics['runs'] += 1
+            metrics['cost_ms'] = cost if metrics['cost_ms'] is None else metrics['cost_ms'] * (1 - COST_SMOOTHING) + cost * COST_SMOOTHING
+            metrics['last_latency_ms'] = (end - entry['first']) * 1000
+            metrics['max_latency_ms'] = max(metrics['max_latency_ms'], metrics['last_latency_ms'])
+
+    def pending_count(self):
+        return len(self.pending)
+
+    def metrics(self):
+        """Per kind counters: updates scheduled, coalesced into a pending one, runs by leading edge / trailing edge /
+        forced by max latency, deferred by the tick budget, average cost, latencies and the current debounce"""
+        return {
+            kind: dict(
+                {key: round(value, 2) if isinstance(value, float) else value for key, value in metrics.items()},
+                debounce_ms=round(self.debounce(kind) * 1000, 1),
+                pending=sum(1 for entry in self.pending.values() if entry['kind'] == kind),
+            )
+            for kind, metrics in self.kinds.items()
+        }
+
+    def clear(self):
+        self.pending.clear()
+        if bpy.app.timers.is_registered(self.timer):
+            bpy.app.timers.unregister(self.timer)
+        self.wake = None
+
+scheduler = UpdateScheduler()
@@ -1,7 +1,61 @@
 import { NodeTree } from '../plugins/nodeTrees/createCompiler';
+import { expandNodeTree } from '../plugins/nodeTrees/compactTree';
 
 let ws: WebSocket | null = null;
 
+/**
+ * action as serialized by `animation_clips.serialize_action_with_slots`
+ */
+export type SerializedFCurve = {
+    data_path: string;
+    array_index: number;
+    [key: string]: unknown;
+};
+export type SerializedAction = {
+    name: string;
+    frame_range: [number, number];
+    slots: Record<string, { name: string; is_selected: boolean; strip?: { fcurves?: SerializedFCurve[] } }>;
+};
+/**
+ * changed fcurves by slot name, replace the curves with matching data_path and array_index
+ */
+export type ActionFCurves = Record<string, SerializedFCurve[]>;
+
+/**
+ * what this client wants to receive, see `live_link.subscribe`. Each list holds names or
+ * glob patterns (`Level*`), a missing list matches everything. `pull` clients get no initial
+ * trees and, without `names`, only updates of what they fetched with `requestBlender`
+ */
+export type BlenderSubscription = {
+    scenes?: string[];
+    types?: string[];
+    names?: string[];
+    pull?: boolean;
+};
+
+let subscription: BlenderSubscription | null = null;
+
+export type BlenderAssetKind = 'shaderTree' | 'logicTree' | 'action' | 'viewLayer' | 'realtimeGeometry';
+
+/**
+ * answer to `requestBlender`, see `asset_requests.py`: the asset (`type` is its kind, also emitted
+ * on `blenderEvents`), `notModified`, `requestError` or `assetIndex`
+ */
+export type BlenderResponse = {
+    type: BlenderAssetKind | 'notModified' | 'requestError' | 'assetIndex' | 'stats';
+    name: string;
+    kind?: BlenderAssetKind | 'index';
+    version?: string;
+    data?: any;
+    payload?: ArrayBuffer;
+    error?: string;
+};
+
+let nextRequestId = 1;
+const pendingRequests = new Map<number, { key: string; resolve: (response: BlenderResponse) => void }>();
+// `${kind}:${name}` -> last received version, sent with the next request for it
+const assetVersions = new Map<string, string>();
+
 let promiseToAwait: Promise<any> = Promise.resolve();
 
 export function setBlenderRealtimePromise(promise: Promise<any>) {
@@ -10,14 +64,21 @@ export function setBlenderRealtimePromise(promise: Promise<any>) {
 }
 
 class BlenderEvents extends EventTarget {
-    emit(type: string, name: string, tree?: NodeTree) {
+    emit(type: string, name: string, tree?: NodeTree | SerializedAction | ActionFCurves | Record<string, unknown>, buffer?: ArrayBuffer) {
         const event = new CustomEvent(type, {
             detail: {
                 name,
                 tree,
+                buffer,
             },
         });
-        if (type === 'logicTree' || type === 'shaderTree' || type === 'realtimeGeometry') {
+        if (
+            type === 'logicTree' ||
+            type === 'shaderTree' ||
+            type === 'realtimeGeometry' ||
+            type === 'action' ||
+            type === 'actionFCurves'
+        ) {
             requestAnimationFrame(() => {
                 promiseToAwait.then(() => {
                     console.log('[BlenderRealtime]', type, name, tree);
@@ -37,41 +98,160 @@ class BlenderEvents extends EventTarget {
         options?: AddEventListenerOptions | boolean
     );
     addEventListener(
-        type: 'sceneChange' | 'export' | 'realtimeGeometry',
+        type: 'realtimeGeometry',
+        callback: (
+            event: CustomEvent<{ name: string; buffer?: ArrayBuffer }>
+        ) => void,
+        options?: AddEventListenerOptions | boolean
+    );
+    addEventListener(
+        type: 'action',
+        callback: (event: CustomEvent<{ tree: SerializedAction; name: string }>) => void,
+        options?: AddEventListenerOptions | boolean
+    );
+    addEventListener(
+        type: 'actionFCurves',
+        callback: (event: CustomEvent<{ tree: ActionFCurves; name: string }>) => void,
+        options?: AddEventListenerOptions | boolean
+    );
+    addEventListener(
+        type: 'viewLayer',
+        callback: (event: CustomEvent<{ tree: Record<string, unknown>; name: string }>) => void,
+        options?: AddEventListenerOptions | boolean
+    );
+    addEventListener(
+        type: 'sceneChange' | 'sceneReady' | 'export',
         callback: (event: CustomEvent<{ name: string }>) => void,
         options?: AddEventListenerOptions | boolean
     );
     addEventListener(
-        type: 'logicTree' | 'shaderTree' | 'export' | 'sceneChange' | 'realtimeGeometry',
+        type: 'logicTree' | 'shaderTree' | 'export' | 'sceneChange' | 'realtimeGeometry' | 'action' | 'actionFCurves',
         callback:
             | ((event: CustomEvent<{ name: string }>) => void)
-            | ((event: CustomEvent<{ tree: NodeTree; name: string }>) => void),
+            | ((event: CustomEvent<{ name: string; buffer?: ArrayBuffer }>) => void)
+            | ((event: CustomEvent<{ tree: NodeTree; name: string }>) => void)
+            | ((event: CustomEvent<{ tree: SerializedAction; name: string }>) => void)
+            | ((event: CustomEvent<{ tree: ActionFCurves; name: string }>) => void),
         options?: AddEventListenerOptions | boolean
     ) {
         super.addEventListener(type, callback, options);
     }
 }
 export const blenderEvents = new BlenderEvents();
+
+/**
+ * binary messages are `[uint32 header length][JSON header][padding to 4 bytes][payload]`
+ */
+function parseBinaryMessage(data: ArrayBuffer) {
+    const headerLength = new DataView(data).getUint32(0, true);
+    const header = JSON.parse(
+        new TextDecoder().decode(new Uint8Array(data, 4, headerLength))
+    );
+    const payloadOffset = Math.ceil((4 + headerLength) / 4) * 4;
+
+    return { header, payload: data.slice(payloadOffset) };
+}
+
+function sendSubscription() {
+    if (!subscription || !ws || ws.readyState !== WebSocket.OPEN) return;
+
+    ws.send(JSON.stringify({ type: 'subscribe', ...subscription }));
+}
+
+/**
+ * only receive the updates matching the subscription, it is re-sent on every reconnect
+ */
+export function subscribeBlender(newSubscription: BlenderSubscription) {
+    subscription = newSubscription;
+    sendSubscription();
+}
+
+/**
+ * ask the addon for one asset, it is only serialized and sent when it changed since the version
+ * received last. `kind: 'index'` lists what can be requested
+ */
+export function requestBlender(kind: BlenderAssetKind | 'index', name = ''): Promise<BlenderResponse> {
+    if (!ws || ws.readyState !== WebSocket.OPEN) {
+        return Promise.reject(new Error('[blenderRealtime] not connected'));
+    }
+
+    const id = nextRequestId++;
+    const key = `${kind}:${name}`;
+    ws.send(JSON.stringify({ type: 'request', id, kind, name, version: assetVersions.get(key) ?? null }));
+
+    return new Promise((resolve) => pendingRequests.set(id, { key, resolve }));
+}
+
+/**
+ * the addon's live link counters and timings (`live_stats.snapshot`): serialize time per tree, messages and
+ * bytes sent per client, pending queue sizes, realtime export timings, skipped updates and scheduler metrics
+ */
+export function requestBlenderStats(): Promise<BlenderResponse> {
+    if (!ws || ws.readyState !== WebSocket.OPEN) {
+        return Promise.reject(new Error('[blenderRealtime] not connected'));
+    }
+
+    const id = nextRequestId++;
+    ws.send(JSON.stringify({ type: 'stats', id }));
+
+    return new Promise((resolve) => pendingRequests.set(id, { key: 'stats', resolve }));
+}
+
+function settleRequest(requestId: number | undefined, response: BlenderResponse) {
+    const request = requestId == null ? undefined : pendingRequests.get(requestId);
+    if (!request) return;
+
+    if (response.version && response.type !== 'notModified' && response.type !== 'requestError') {
+        assetVersions.set(request.key, response.version);
+    }
+
+    pendingRequests.delete(requestId);
+    request.resolve(response);
+}
+
 export function enableNodeTreeBlenderConnection() {
     if (ws) return;
 
     ws = new WebSocket(`ws://${window.location.hostname}:9001`);
+    ws.binaryType = 'arraybuffer';
 
     let pingInterval: NodeJS.Timeout | null = null;
 
     ws.addEventListener('open', () => {
         console.log('[NodeTreeBlenderConnection] Connected to server');
+        sendSubscription();
         pingInterval = setInterval(() => {
             ws.send('ping');
         }, 5000);
     });
 
     ws.addEventListener('message', (event: MessageEvent) => {
-        const { data, name, type } = JSON.parse(event.data);
+        if (event.data instanceof ArrayBuffer) {
+            const { header, payload } = parseBinaryMessage(event.data);
+
+            console.log('[blenderRealtime] binary message', header.type, header.name, payload.byteLength);
+
+            settleRequest(header.requestId, { ...header, payload });
+
+            blenderEvents.emit(header.type, header.name, undefined, payload);
+            return;
+        }
+
+        const message = JSON.parse(event.data);
+        const { data, name, type } = message;
 
         console.log('[blenderRealtime] message', type, name);
 
-        blenderEvents.emit(type, name, data as NodeTree);
+        if (type === 'subscribed') return;
+
+        settleRequest(message.requestId, message);
+        if (type === 'notModified' || type === 'requestError' || type === 'assetIndex' || type === 'stats') return;
+
+        blenderEvents.emit(
+            type,
+            name,
+            type === 'logicTree' || type === 'shaderTree' ? expandNodeTree(data) : data
+        );
     });
 
     ws.addEventListener('close', () => {
@@ -79,6 +259,11 @@ export function enableNodeTreeBlenderConnection() {
 
         clearInterval(pingInterval);
 
+        for (const [id, request] of pendingRequests) {
+            request.resolve({ type: 'requestError', name: '', error: 'connection closed' });
+            pendingRequests.delete(id);
+        }
+
         ws = null;
 
         setTimeout(() => enableNodeTreeBlenderConnection(), 1000);
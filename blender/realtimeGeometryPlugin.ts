@@ -58,15 +58,20 @@ function replaceMesh(existing: THREE.Mesh, fresh: THREE.Mesh, config: RealtimeGe
 export function applyRealtimeGeometryPlugin(config: RealtimeGeometryConfig) {
     const resolveUrl = config.resolveUrl ?? ((filename: string) => `/${filename}`);
 
-    blenderEvents.addEventListener('realtimeGeometry', async (event: CustomEvent<{ name: string }>) => {
+    blenderEvents.addEventListener('realtimeGeometry', async (event: CustomEvent<{ name: string; buffer?: ArrayBuffer }>) => {
         const filename = event.detail.name;
+        const buffer = event.detail.buffer;
         const url = resolveUrl(filename);
 
-        console.log('[RealtimeGeometry] loading', url);
+        console.log('[RealtimeGeometry] loading', buffer ? `${filename} (${buffer.byteLength} bytes over ws)` : url);
 
         try {
             const gltf = await new Promise<THREE.GLTF>((resolve, reject) => {
-                config.loader.load(url, resolve, undefined, reject);
+                if (buffer) {
+                    config.loader.parse(buffer, '', resolve, reject);
+                } else {
+                    config.loader.load(url, resolve, undefined, reject);
+                }
             });
 
             if (!gltf.scene) return;
@@ -0,0 +1,135 @@
+"""
+Compare keys-only animation export evaluated by `animation_eval` against `fcurve.evaluate`, used by
+verify_animation_parity.py. Needs Blender, the addon is imported as its package so its relative imports resolve.
+"""
+import bpy
+import glob
+import importlib
+import os
+import sys
+import numpy as np
+
+ADDON_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'addon')
+
+sys.path.insert(0, os.path.dirname(ADDON_DIRECTORY))
+sys.path.extend(glob.glob(os.path.join(ADDON_DIRECTORY, 'wheels', '*.whl')))
+animation_clips = importlib.import_module(os.path.basename(ADDON_DIRECTORY) + '.animation_clips')
+animation_eval = importlib.import_module(os.path.basename(ADDON_DIRECTORY) + '.animation_eval')
+
+INTERPOLATIONS = ['CONSTANT', 'LINEAR', 'BEZIER', 'SINE', 'QUAD', 'CUBIC', 'QUART', 'QUINT', 'EXPO', 'CIRC', 'BACK', 'BOUNCE', 'ELASTIC']
+EASINGS = ['AUTO', 'EASE_IN', 'EASE_OUT', 'EASE_IN_OUT']
+EXTRAPOLATIONS = ['CONSTANT', 'LINEAR']
+# per key interpolations of the mixed curves, BEZIER segments ending on LINEAR / CONSTANT keys
+MIXED_INTERPOLATIONS = ['BEZIER', 'LINEAR', 'BEZIER', 'CONSTANT', 'BEZIER']
+
+# keys for the generated curves, uneven spacing and direction changes exercise handles and easing
+TEST_KEYS = [(1.0, 0.0), (11.0, 2.0), (17.0, -1.5), (18.5, -1.25), (40.0, 3.0)]
+
+# extra samples around every key, inside and outside the distance Blender snaps to the key's value
+KEY_OFFSETS = [-0.005, -0.00005, 0.00005, 0.005]
+
+def action_fcurves(action):
+    for slot in action.slots:
+        channelbag = action.layers[0].strips[0].channelbag(slot) if action.layers and action.layers[0].strips else None
+        if channelbag:
+            yield from channelbag.fcurves
+
+def verify_fcurve(fcurve, samples_per_frame=10, margin=5.0):
+    """
+    Compare the exported keyframes evaluated by animation_eval, and the curve sampled by
+    animation_clips.sample_keyframes, against fcurve.evaluate.
+
+    Returns:
+        dict: worst errors and where they happened, None for curves that can't be exported keys-only (modifiers)
+    """
+    if len(fcurve.modifiers) or not len(fcurve.keyframe_points):
+        return None
+
+    keyframes = animation_clips.serialize_keyframes(fcurve.keyframe_points)
+    frames = animation_clips.sample_frames(keyframes[0]['frame'] - margin, keyframes[-1]['frame'] + margin, samples_per_frame)
+    near_keys = np.array([keyframe['frame'] + offset for keyframe in keyframes for offset in KEY_OFFSETS])
+    frames = np.sort(np.concatenate([frames, near_keys]))
+
+    expected = np.fromiter((fcurve.evaluate(frame) for frame in frames.tolist()), np.float64, len(frames))
+    actual = np.fromiter((animation_eval.evaluate(keyframes, frame, fcurve.extrapolation) for frame in frames.tolist()), np.float64, len(frames))
+    error = np.abs(expected - actual)
+    worst = int(np.argmax(error))
+
+    (sampled_frames, sampled) = animation_clips.sample_keyframes(fcurve, samples_per_frame)
+    sampled_expected = np.fromiter((fcurve.evaluate(frame) for frame in sampled_frames.tolist()), np.float64, len(sampled_frames))
+    sampled_error = np.abs(sampled_expected - sampled) if len(sampled) else np.zeros(1)
+    sampled_worst = int(np.argmax(sampled_error))
+
+    return {
+        "data_path": fcurve.data_path,
+        "array_index": fcurve.array_index,
+        "max_error": float(error[worst]),
+        "frame": float(frames[worst]),
+        "expected": float(expected[worst]),
+        "actual": float(actual[worst]),
+        "sampled_max_error": float(sampled_error[sampled_worst]),
+        "sampled_frame": float(sampled_frames[sampled_worst]) if len(sampled) else None,
+    }
+
+def verify_actions(actions=None, tolerance=1e-4, samples_per_frame=10):
+    """
+    Verify every fcurve of the given actions (all actions by default).
+
+    Returns:
+        tuple: (results, failures) lists of verify_fcurve results with the action name added
+    """
+    results = []
+    for action in (bpy.data.actions if actions is None else actions):
+        for fcurve in action_fcurves(action):
+            result = verify_fcurve(fcurve, samples_per_frame)
+            if result is None: continue
+            result['action'] = action.name
+            results.append(result)
+
+    failures = [result for result in results if max(result['max_error'], result['sampled_max_error']) > tolerance]
+    return (results, failures)
+
+def insert_test_keys(object, name):
+    object[name] = 0.0
+    for frame, value in TEST_KEYS:
+        object[name] = value
+        object.keyframe_insert(f'["{name}"]', frame=frame)
+
+def build_test_action():
+    """
+    Keyframe a temporary object with one custom property curve per interpolation / easing / extrapolation combination,
+    plus a mixed interpolation curve per extrapolation.
+
+    Returns:
+        tuple: (object, action) to pass to cleanup_test_action afterwards
+    """
+    object = bpy.data.objects.new('SprixleAnimationParity', None)
+    bpy.context.scene.collection.objects.link(object)
+
+    curves = []
+    for interpolation in INTERPOLATIONS:
+        for easing in EASINGS:
+            for extrapolation in EXTRAPOLATIONS:
+                name = f'{interpolation}_{easing}_{extrapolation}'
+                insert_test_keys(object, name)
+                curves.append((name, [interpolation] * len(TEST_KEYS), easing, extrapolation))
+    for extrapolation in EXTRAPOLATIONS:
+        name = f'MIXED_{extrapolation}'
+        insert_test_keys(object, name)
+        curves.append((name, MIXED_INTERPOLATIONS, 'AUTO', extrapolation))
+
+    action = object.animation_data.action
+    fcurves = {fcurve.data_path: fcurve for fcurve in action_fcurves(action)}
+    for (name, interpolations, easing, extrapolation) in curves:
+        fcurve = fcurves[f'["{name}"]']
+        fcurve.extrapolation = extrapolation
+        for keyframe, interpolation in zip(fcurve.keyframe_points, interpolations):
+            keyframe.interpolation = interpolation
+            keyframe.easing = easing
+        fcurve.update()
+
+    return (object, action)
+
+def cleanup_test_action(object, action):
+    bpy.data.objects.remove(object, do_unlink=True)
+    bpy.data.actions.remove(action)
@@ -0,0 +1,158 @@
+"""
+Export every .blend in a directory with a pool of background Blender processes.
+
+    python blender/tools/batch_export.py assets/ --jobs 8 --blender /path/to/blender -- --optimize
+
+Arguments after `--` are passed to `blender/addon/batch.py`. Files whose .blend, addon sources and
+export arguments are unchanged since the last successful run (and whose outputs still exist) are skipped,
+state is kept in `.sprixle-batch.json` inside the directory.
+"""
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+ADDON_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'addon')
+BATCH_SCRIPT = os.path.join(ADDON_DIRECTORY, 'batch.py')
+STATE_FILE = '.sprixle-batch.json'
+RESULT_PREFIX = 'SPRIXLE_BATCH_RESULT '
+
+def file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def addon_hash():
+    digest = hashlib.sha1()
+    for name in sorted(os.listdir(ADDON_DIRECTORY)):
+        if name.endswith('.py'):
+            with open(os.path.join(ADDON_DIRECTORY, name), 'rb') as file:
+                digest.update(name.encode('utf-8') + file.read())
+    return digest.hexdigest()
+
+def find_blend_files(directory):
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.endswith('.blend'):
+                yield os.path.join(root, name)
+
+def fingerprint(path, previous):
+    """Cheap size/mtime check first, content hash only when those changed"""
+    stat = os.stat(path)
+    if previous and previous.get('size') == stat.st_size and previous.get('mtime_ns') == stat.st_mtime_ns:
+        return previous['sha1'], stat
+
+    return file_hash(path), stat
+
+def is_unchanged(entry, sha1, inputs_key):
+    if not entry or not entry.get('ok'): return False
+    if entry.get('sha1') != sha1 or entry.get('inputs') != inputs_key: return False
+
+    return all(os.path.exists(output) for output in entry.get('outputs', []))
+
+def run_blender(blender, path, batch_args):
+    start = time.perf_counter()
+    process = subprocess.run(
+        [blender, '-b', path, '--python', BATCH_SCRIPT, '--'] + batch_args,
+        capture_output=True, text=True,
+    )
+    seconds = time.perf_counter() - start
+
+    result = None
+    for line in process.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            result = json.loads(line[len(RESULT_PREFIX):])
+
+    ok = process.returncode == 0 and result is not None
+    return {
+        "ok": ok,
+        "seconds": seconds,
+        "result": result,
+        "log": None if ok else (process.stdout[-4000:] + process.stderr[-4000:]),
+    }
+
+def main(argv):
+    if '--' in argv:
+        batch_args = argv[argv.index('--') + 1:]
+        argv = argv[:argv.index('--')]
+    else:
+        batch_args = []
+
+    parser = argparse.ArgumentParser(description='Sprixle export of every .blend in a directory')
+    parser.add_argument('directory')
+    parser.add_argument('--blender', default=os.environ.get('BLENDER', 'blender'))
+    parser.add_argument('--jobs', type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument('--force', action='store_true', help='export files even when unchanged')
+    args = parser.parse_args(argv)
+
+    state_path = os.path.join(args.directory, STATE_FILE)
+    state = {}
+    if os.path.exists(state_path):
+        with open(state_path) as file:
+            state = json.load(file)
+
+    inputs_key = hashlib.sha1((addon_hash() + json.dumps(batch_args)).encode('utf-8')).hexdigest()
+
+    queued = []
+    skipped = 0
+    for path in find_blend_files(args.directory):
+        key = os.path.relpath(path, args.directory)
+        (sha1, stat) = fingerprint(path, state.get(key))
+        if not args.force and is_unchanged(state.get(key), sha1, inputs_key):
+            skipped += 1
+            continue
+        queued.append((key, path, sha1, stat))
+
+    print(f'[Sprixle.Batch] {len(queued)} to export, {skipped} unchanged, {args.jobs} workers')
+
+    start = time.perf_counter()
+    failures = []
+    exported_bytes = 0
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {pool.submit(run_blender, args.blender, path, batch_args): (key, path, sha1, stat) for (key, path, sha1, stat) in queued}
+
+        for future in as_completed(futures):
+            (key, path, sha1, stat) = futures[future]
+            outcome = future.result()
+            outputs = [output for scene in (outcome['result'] or {}).get('scenes', []) for output in scene.get('outputs', [])]
+            exported_bytes += sum(os.path.getsize(output) for output in outputs if os.path.exists(output))
+
+            state[key] = {
+                "ok": outcome['ok'],
+                "sha1": sha1,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "inputs": inputs_key,
+                "outputs": outputs,
+                "seconds": round(outcome['seconds'], 3),
+            }
+
+            print(f"[Sprixle.Batch] {'ok ' if outcome['ok'] else 'FAILED'} {key} {outcome['seconds']:.1f}s")
+            if not outcome['ok']:
+                failures.append(key)
+                print(outcome['log'])
+
+            # persist after every file so an interrupted run keeps its progress
+            with open(state_path, 'w') as file:
+                json.dump(state, file, indent=2)
+
+    elapsed = time.perf_counter() - start
+    exported = len(queued) - len(failures)
+    print(f'[Sprixle.Batch] exported {exported}/{len(queued)} files in {elapsed:.1f}s'
+        + (f' ({len(queued) / elapsed * 60:.1f} files/min, {exported_bytes / 1e6:.1f}MB written)' if queued and elapsed > 0 else '')
+        + f', {skipped} skipped')
+
+    if failures:
+        print('[Sprixle.Batch] failed:', ', '.join(failures))
+        return 1
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,380 @@
+"""
+Load test the websocket live link without Blender:
+
+    python blender/tools/benchmark_live_link.py [--clients 8] [--slow-clients 2] [--events 300] [--rate 30] [--json]
+    python blender/tools/benchmark_live_link.py --recording live.jsonl [--speed 2]
+    python blender/tools/benchmark_live_link.py --record live.jsonl [--url ws://localhost:9001] [--duration 60]
+
+Starts the addon's `WebsocketServer` on a free port with a stand-in for the Blender side that sends
+messages the way `__init__.py` does (`send_message_to_all` for trees, `live_link.send_binary_to_all`
+for realtime GLBs), connects N simulated clients and replays either a recording or a synthetic stream
+of `shaderTree` / `logicTree` / `realtimeGeometry` events built from `assets/shaders`.
+
+Reports end-to-end latency percentiles per message type, how long each send blocked the sender (Blender's
+main thread in the addon), throughput and per-client backlog (messages sent but not yet received) over time.
+Slow clients sleep after every message to stand in for phones and headsets.
+
+`--record` connects to a running Blender as a client and writes every received message with its time
+offset, binary payloads are stored as their header and byte length and replayed as zero bytes.
+"""
+import argparse
+import base64
+import glob
+import importlib
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+import types
+
+ADDON_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'addon')
+REPOSITORY = os.path.dirname(os.path.dirname(ADDON_DIRECTORY))
+
+OPCODE_TEXT = 0x1
+OPCODE_BINARY = 0x2
+OPCODE_CLOSE = 0x8
+
+DEFAULT_MIX = 'shaderTree:4,logicTree:2,realtimeGeometry:1'
+
+# live_link and live_stats don't need bpy, they are imported as this package without running its __init__
+ADDON_PACKAGE = 'sprixle_addon'
+
+def load_live_link():
+    package = types.ModuleType(ADDON_PACKAGE)
+    package.__path__ = [ADDON_DIRECTORY]
+    sys.modules.setdefault(ADDON_PACKAGE, package)
+    return importlib.import_module(f'{ADDON_PACKAGE}.live_link')
+
+def load_websocket_server():
+    sys.path.extend(glob.glob(os.path.join(ADDON_DIRECTORY, 'wheels', 'websocket_server-*.whl')))
+    from websocket_server import WebsocketServer
+    return WebsocketServer
+
+# Client side
+#################################################
+
+def connect(host, port):
+    """Open a websocket, returns (socket, buffered reader positioned at the first frame)"""
+    connection = socket.create_connection((host, port))
+    key = base64.b64encode(os.urandom(16)).decode('ascii')
+    connection.sendall((
+        f'GET / HTTP/1.1\r\nHost: {host}:{port}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+        f'Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n'
+    ).encode('ascii'))
+
+    reader = connection.makefile('rb')
+    status = reader.readline()
+    if b' 101 ' not in status:
+        raise ConnectionError(f'websocket handshake failed: {status!r}')
+    while reader.readline() not in (b'\r\n', b''):
+        pass
+
+    return (connection, reader)
+
+def read_frame(reader):
+    """(opcode, payload) of the next (unmasked, unfragmented) server frame, None when the connection closed"""
+    head = reader.read(2)
+    if len(head) < 2:
+        return None
+
+    opcode = head[0] & 0x0f
+    length = head[1] & 0x7f
+    if length == 126:
+        (length,) = struct.unpack('>H', reader.read(2))
+    elif length == 127:
+        (length,) = struct.unpack('>Q', reader.read(8))
+
+    return (opcode, reader.read(length))
+
+def message_sequence(opcode, payload):
+    """Sequence number the stand-in put at the start of text messages or in the binary header"""
+    if opcode == OPCODE_BINARY:
+        (length,) = struct.unpack_from('<I', payload)
+        return json.loads(payload[4:4 + length])['seq']
+
+    prefix = payload[:32]
+    return int(prefix[len(b'{"seq":'):prefix.index(b',')])
+
+class SimulatedClient:
+    def __init__(self, index, host, port, delay):
+        self.index = index
+        self.delay = delay
+        self.received = 0
+        self.received_bytes = 0
+        # seq -> receive time
+        self.arrivals = {}
+        (self.connection, self.reader) = connect(host, port)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while True:
+            frame = read_frame(self.reader)
+            if frame is None or frame[0] == OPCODE_CLOSE:
+                return
+
+            (opcode, payload) = frame
+            if opcode not in (OPCODE_TEXT, OPCODE_BINARY):
+                continue
+
+            self.arrivals[message_sequence(opcode, payload)] = time.perf_counter()
+            self.received += 1
+            self.received_bytes += len(payload)
+
+            if self.delay:
+                time.sleep(self.delay)
+
+    def close(self):
+        try:
+            self.connection.close()
+        except OSError:
+            pass
+
+# Event streams
+#################################################
+
+def parse_mix(mix):
+    weights = {}
+    for part in mix.split(','):
+        (name, weight) = part.split(':')
+        weights[name.strip()] = int(weight)
+    return weights
+
+def synthetic_stream(count, rate, mix, geometry_bytes, directory):
+    """Events at `rate` per second cycling through the tree jsons of directory and GLB sized binaries"""
+    trees = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+        with open(path) as file:
+            tree = json.load(file)
+        trees.append((os.path.splitext(os.path.basename(path))[0], tree))
+    if not trees:
+        raise SystemExit(f'[Sprixle.Benchmark] no tree json in {directory}')
+
+    pattern = [name for name, weight in parse_mix(mix).items() for _ in range(weight)]
+    events = []
+    for index in range(count):
+        message_type = pattern[index % len(pattern)]
+        offset = index / rate
+        if message_type == 'realtimeGeometry':
+            events.append({"t": offset, "kind": "binary", "header": {"type": message_type, "name": "benchmark.realtime.glb"}, "bytes": geometry_bytes})
+        else:
+            (name, tree) = trees[index % len(trees)]
+            events.append({"t": offset, "kind": "text", "message": json.dumps({"name": name, "type": message_type, "data": tree}, indent=0)})
+    return events
+
+def load_recording(path, speed):
+    events = []
+    with open(path) as file:
+        for line in file:
+            if line.strip():
+                event = json.loads(line)
+                event['t'] /= speed
+                events.append(event)
+    return events
+
+def event_type(event):
+    if event['kind'] == 'binary':
+        return event['header'].get('type', 'binary')
+    # messages start with {"name", "type", ... or {"type", keep parsing cheap for large trees
+    head = event['message'][:256]
+    marker = head.find('"type":')
+    return head[marker + 7:].lstrip().split('"')[1] if marker >= 0 else 'text'
+
+# Blender stand-in
+#################################################
+
+def replay(server, live_link, events, sends):
+    """Send every event at its time offset like the addon does, recording (seq, type, start, blocked ms)"""
+    start = time.perf_counter()
+    for (seq, event) in enumerate(events):
+        wait = start + event['t'] - time.perf_counter()
+        if wait > 0:
+            time.sleep(wait)
+
+        send_start = time.perf_counter()
+        if event['kind'] == 'binary':
+            live_link.send_binary_to_all(server, dict(event['header'], seq=seq), bytes(event['bytes']))
+        else:
+            server.send_message_to_all('{"seq":%d,' % seq + event['message'][1:])
+        sends.append((seq, event_type(event), send_start, (time.perf_counter() - send_start) * 1000))
+
+def sample_backlog(clients, sends, stop, interval, samples):
+    start = time.perf_counter()
+    while not stop.is_set():
+        sent = len(sends)
+        samples.append((time.perf_counter() - start, [sent - client.received for client in clients]))
+        time.sleep(interval)
+
+# Report
+#################################################
+
+def percentiles(values):
+    if not values:
+        return {}
+    values = sorted(values)
+    def at(fraction):
+        return round(values[min(len(values) - 1, int(fraction * len(values)))], 3)
+    return {"p50": at(0.5), "p90": at(0.9), "p99": at(0.99), "max": round(values[-1], 3), "count": len(values)}
+
+def report(clients, sends, samples, elapsed, replay_elapsed):
+    send_start = {seq: start for (seq, _, start, _) in sends}
+    send_type = {seq: message_type for (seq, message_type, _, _) in sends}
+
+    latency = {}
+    for client in clients:
+        for seq, arrival in client.arrivals.items():
+            latency.setdefault(send_type[seq], []).append((arrival - send_start[seq]) * 1000)
+    all_latency = [value for values in latency.values() for value in values]
+
+    per_client = []
+    for (index, client) in enumerate(clients):
+        backlog = [counts[index] for (_, counts) in samples]
+        # messages per second the backlog grew while the stream was being sent, before draining
+        during = [(offset, counts[index]) for (offset, counts) in samples if offset <= replay_elapsed]
+        growth = (during[-1][1] - during[0][1]) / (during[-1][0] - during[0][0]) if len(during) > 1 and during[-1][0] > during[0][0] else 0.0
+        per_client.append({
+            "client": index,
+            "delay_ms": round(client.delay * 1000, 3),
+            "received": client.received,
+            "missing": len(sends) - client.received,
+            "backlog_max": max(backlog, default=0),
+            "backlog_final": backlog[-1] if backlog else 0,
+            "backlog_growth_per_s": round(growth, 3),
+        })
+
+    delivered = sum(client.received for client in clients)
+    return {
+        "clients": len(clients),
+        "messages_sent": len(sends),
+        "elapsed_s": round(elapsed, 3),
+        "throughput": {
+            "messages_per_s": round(delivered / elapsed, 3) if elapsed else 0,
+            "bytes_per_s": round(sum(client.received_bytes for client in clients) / elapsed, 3) if elapsed else 0,
+        },
+        "latency_ms": dict(percentiles(all_latency), by_type={message_type: percentiles(values) for message_type, values in latency.items()}),
+        "send_blocked_ms": percentiles([blocked for (_, _, _, blocked) in sends]),
+        "per_client": per_client,
+    }
+
+def print_report(data):
+    latency = data['latency_ms']
+    print(f"[Sprixle.Benchmark] {data['messages_sent']} messages to {data['clients']} clients in {data['elapsed_s']}s, "
+        f"{data['throughput']['messages_per_s']} msg/s delivered, {data['throughput']['bytes_per_s'] / 1e6:.2f} MB/s")
+    print(f"{'latency ms':<20}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}{'count':>8}")
+    for (name, values) in [('all', latency)] + list(latency.get('by_type', {}).items()) + [('send blocked', data['send_blocked_ms'])]:
+        if values:
+            print(f"{name:<20}{values['p50']:>10}{values['p90']:>10}{values['p99']:>10}{values['max']:>10}{values['count']:>8}")
+    print(f"{'client':<8}{'delay ms':>10}{'received':>10}{'missing':>9}{'backlog max':>13}{'final':>7}{'growth/s':>10}")
+    for client in data['per_client']:
+        print(f"{client['client']:<8}{client['delay_ms']:>10}{client['received']:>10}{client['missing']:>9}"
+            f"{client['backlog_max']:>13}{client['backlog_final']:>7}{client['backlog_growth_per_s']:>10}")
+
+# Recording
+#################################################
+
+def record(url, path, duration):
+    (host, _, port) = url.split('://', 1)[-1].split('/', 1)[0].partition(':')
+    (connection, reader) = connect(host, int(port or 9001))
+    connection.settimeout(1.0)
+
+    start = time.perf_counter()
+    count = 0
+    with open(path, 'w') as file:
+        while time.perf_counter() - start < duration:
+            try:
+                frame = read_frame(reader)
+            except socket.timeout:
+                continue
+            if frame is None or frame[0] == OPCODE_CLOSE:
+                break
+
+            (opcode, payload) = frame
+            offset = round(time.perf_counter() - start, 4)
+            if opcode == OPCODE_BINARY:
+                (length,) = struct.unpack_from('<I', payload)
+                header = json.loads(payload[4:4 + length])
+                padded = 4 + length + (-(4 + length) % 4)
+                event = {"t": offset, "kind": "binary", "header": header, "bytes": len(payload) - padded}
+            elif opcode == OPCODE_TEXT:
+                event = {"t": offset, "kind": "text", "message": payload.decode('utf-8')}
+            else:
+                continue
+
+            file.write(json.dumps(event) + '\n')
+            count += 1
+
+    connection.close()
+    print('[Sprixle.Benchmark] recorded', count, 'messages to', path)
+    return 0
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='websocket live link load test')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--slow-clients', type=int, default=0, help='clients that sleep --slow-delay-ms after every message')
+    parser.add_argument('--slow-delay-ms', type=float, default=20.0)
+    parser.add_argument('--recording', help='replay a jsonl recording instead of the synthetic stream')
+    parser.add_argument('--speed', type=float, default=1.0, help='recording playback speed')
+    parser.add_argument('--events', type=int, default=300, help='synthetic stream length')
+    parser.add_argument('--rate', type=float, default=30.0, help='synthetic events per second')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='synthetic message type weights')
+    parser.add_argument('--geometry-bytes', type=int, default=256 * 1024, help='synthetic realtime GLB size')
+    parser.add_argument('--trees', default=os.path.join(REPOSITORY, 'assets', 'shaders'), help='tree json directory for the synthetic stream')
+    parser.add_argument('--drain-timeout', type=float, default=30.0, help='seconds to wait for clients to receive everything')
+    parser.add_argument('--sample-ms', type=float, default=50.0, help='backlog sampling interval')
+    parser.add_argument('--record', help='record a running live link to this jsonl file instead')
+    parser.add_argument('--url', default='ws://localhost:9001')
+    parser.add_argument('--duration', type=float, default=60.0, help='recording length in seconds')
+    parser.add_argument('--json', action='store_true', help='print results as json')
+    args = parser.parse_args(argv)
+
+    if args.record:
+        return record(args.url, args.record, args.duration)
+
+    events = load_recording(args.recording, args.speed) if args.recording else synthetic_stream(args.events, args.rate, args.mix, args.geometry_bytes, args.trees)
+
+    live_link = load_live_link()
+    WebsocketServer = load_websocket_server()
+    server = WebsocketServer(host='127.0.0.1', port=0)
+    server.run_forever(threaded=True)
+
+    clients = [
+        SimulatedClient(index, '127.0.0.1', server.port, args.slow_delay_ms / 1000 if index < args.slow_clients else 0.0)
+        for index in range(args.clients)
+    ]
+    while len(server.clients) < len(clients):
+        time.sleep(0.01)
+
+    sends = []
+    samples = []
+    stop = threading.Event()
+    sampler = threading.Thread(target=sample_backlog, args=(clients, sends, stop, args.sample_ms / 1000, samples), daemon=True)
+
+    start = time.perf_counter()
+    sampler.start()
+    replay(server, live_link, events, sends)
+    replay_elapsed = time.perf_counter() - start
+
+    deadline = time.perf_counter() + args.drain_timeout
+    while any(client.received < len(sends) for client in clients) and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    sampler.join()
+
+    data = report(clients, sends, samples, elapsed, replay_elapsed)
+    for client in clients:
+        client.close()
+    server.shutdown_abruptly()
+
+    if args.json:
+        print(json.dumps(data, indent=2))
+    else:
+        print_report(data)
+
+    return 0 if all(client['missing'] == 0 for client in data['per_client']) else 1
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,191 @@
+"""
+Time the addon's serializers outside Blender, against the `standin/` bpy:
+
+    python blender/tools/benchmark_serializers.py [--sizes 1000,5000,20000] [--repeat 3] [--snapshots assets] [--json]
+
+Cases:
+- `serialize` (node_trees) of every tree json in `<snapshots>/shaders` and `<snapshots>/logic-trees`,
+  rebuilt as stand-in node trees, and of synthetic material trees of each size (nodes). Uncached, and
+  again with the artifact cache warm.
+- `serialize_action_with_slots` (animation_clips) of `<snapshots>/actions/*.json` and synthetic actions
+  of each size (keyframes).
+- `serialize_bpy_object` (serializers) of `<snapshots>/view-layers/*.json` and the first view layer
+  with each size / 10 AOVs.
+
+Results are appended to `--history` (default `blender/tools/benchmark-history.jsonl`) with the git commit
+and machine, and compared to the last run of another commit on the same machine.
+"""
+import argparse
+import contextlib
+import glob
+import importlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+TOOLS_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+ADDON_DIRECTORY = os.path.join(os.path.dirname(TOOLS_DIRECTORY), 'addon')
+REPOSITORY = os.path.dirname(os.path.dirname(TOOLS_DIRECTORY))
+DEFAULT_HISTORY = os.path.join(TOOLS_DIRECTORY, 'benchmark-history.jsonl')
+
+# the addon modules are imported as this package without running its __init__ (which registers with Blender)
+ADDON_PACKAGE = 'sprixle_addon'
+
+def load_addon():
+    sys.path.insert(0, os.path.join(TOOLS_DIRECTORY, 'standin'))
+    package = types.ModuleType(ADDON_PACKAGE)
+    package.__path__ = [ADDON_DIRECTORY]
+    sys.modules[ADDON_PACKAGE] = package
+
+    import bpy
+    import snapshots
+    modules = {name: importlib.import_module(f'{ADDON_PACKAGE}.{name}') for name in ('node_trees', 'animation_clips', 'serializers', 'artifact_cache')}
+    return (bpy, snapshots, modules)
+
+def time_ms(function, repeat):
+    """Min and median wall time of repeat calls, prints of the serializers are swallowed"""
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            times.append((time.perf_counter() - start) * 1000)
+    return {"min": round(min(times), 3), "median": round(statistics.median(times), 3)}
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPOSITORY, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--', 'blender'], cwd=REPOSITORY, capture_output=True, text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return (None, False)
+    return (commit, dirty)
+
+def machine():
+    return f'{platform.node()} {platform.machine()} python {platform.python_version()}'
+
+def run_cases(bpy, snapshots, modules, sizes, repeat, snapshot_directory, blend_directory):
+    node_trees = modules['node_trees']
+    animation_clips = modules['animation_clips']
+    serializers = modules['serializers']
+    artifact_cache = modules['artifact_cache']
+
+    results = {}
+
+    def serialize_case(name, target):
+        # an unsaved file has no artifact cache, then the same target against a warm cache
+        bpy.data.filepath = ''
+        results[f'serialize {name}'] = time_ms(lambda: node_trees.serialize(target), repeat)
+
+        bpy.data.filepath = os.path.join(blend_directory, 'benchmark.blend')
+        with contextlib.redirect_stdout(io.StringIO()):
+            node_trees.serialize(target)
+        results[f'serialize {name} (cached)'] = time_ms(lambda: node_trees.serialize(target), repeat)
+        bpy.data.filepath = ''
+
+    for (name, tree) in snapshots.load_trees(os.path.join(snapshot_directory, 'shaders')):
+        serialize_case(f'shaders/{name}', snapshots.material(name, snapshots.node_tree_from_json(name, tree)))
+    for (name, tree) in snapshots.load_trees(os.path.join(snapshot_directory, 'logic-trees')):
+        serialize_case(f'logic-trees/{name}', snapshots.logic_object(name, snapshots.node_tree_from_json(name, tree)))
+    for size in sizes:
+        node_tree = snapshots.synthetic_node_tree(size)
+        serialize_case(f'synthetic {size} nodes', snapshots.material(node_tree.name, node_tree))
+
+    actions = []
+    for path in sorted(glob.glob(os.path.join(snapshot_directory, 'actions', '*.json'))):
+        with open(path) as file:
+            actions.append((f'actions/{os.path.basename(path)}', snapshots.action_from_json(json.load(file))))
+    actions.extend((f'synthetic {size} keys', snapshots.synthetic_action(size)) for size in sizes)
+    for (name, action) in actions:
+        results[f'serialize_action_with_slots {name}'] = time_ms(lambda: animation_clips.serialize_action_with_slots(action), repeat)
+        keys_only = dict(animation_clips.DEFAULT_EXPORT_SETTINGS, keys_only=True)
+        results[f'serialize_action_with_slots {name} (keys only)'] = time_ms(lambda: animation_clips.serialize_action_with_slots(action, keys_only), repeat)
+
+    view_layers = []
+    for path in sorted(glob.glob(os.path.join(snapshot_directory, 'view-layers', '*.json'))):
+        with open(path) as file:
+            view_layers.append((os.path.basename(path), json.load(file)))
+    cases = [(f'view-layers/{name}', snapshots.view_layer_from_json(data)) for (name, data) in view_layers]
+    if view_layers:
+        cases.extend((f'synthetic {size // 10} aovs', snapshots.synthetic_view_layer(view_layers[0][1], size // 10)) for size in sizes)
+    for (name, view_layer) in cases:
+        # the property plans are cached per RNA type, the first call pays for them
+        serializers.property_plans.clear()
+        results[f'serialize_bpy_object {name}'] = time_ms(lambda: serializers.serialize_bpy_object(view_layer), repeat)
+        results[f'view_layer_fingerprint {name}'] = time_ms(lambda: serializers.view_layer_fingerprint(view_layer), repeat)
+
+    artifact_cache.close()
+    return results
+
+def previous_run(history_path, entry):
+    """Last run on the same machine from another commit"""
+    if not os.path.exists(history_path):
+        return None
+
+    previous = None
+    with open(history_path) as file:
+        for line in file:
+            if not line.strip(): continue
+            run = json.loads(line)
+            if run['machine'] == entry['machine'] and run['commit'] != entry['commit']:
+                previous = run
+    return previous
+
+def print_results(entry, previous):
+    print(f"[Sprixle.Benchmark] {entry['commit'] or 'no git'}{' (dirty)' if entry['dirty'] else ''} on {entry['machine']}"
+        + (f", compared to {previous['commit'][:10]}" if previous else ''))
+    print(f"{'case':<72}{'min ms':>11}{'median ms':>11}{'vs prev':>9}")
+    for (name, timing) in entry['results'].items():
+        change = ''
+        if previous and name in previous['results'] and previous['results'][name]['min'] > 0:
+            change = f"{timing['min'] / previous['results'][name]['min'] - 1:+.0%}"
+        print(f"{name:<72}{timing['min']:>11}{timing['median']:>11}{change:>9}")
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='serializer benchmarks against the bpy stand-in')
+    parser.add_argument('--sizes', default='1000,5000,20000', help='synthetic nodes / keyframes, comma separated')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--snapshots', default=os.path.join(REPOSITORY, 'assets'), help='directory with shaders/, logic-trees/, actions/, view-layers/ json')
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help='jsonl file results are appended to')
+    parser.add_argument('--no-history', action='store_true', help="don't record this run")
+    parser.add_argument('--json', action='store_true', help='print results as json')
+    args = parser.parse_args(argv)
+
+    (bpy, snapshots, modules) = load_addon()
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+
+    with tempfile.TemporaryDirectory() as directory:
+        # tree json files are written next to the (stand-in) .blend
+        bpy.blend_directory = directory
+        results = run_cases(bpy, snapshots, modules, sizes, args.repeat, args.snapshots, directory)
+
+    (commit, dirty) = git_commit()
+    entry = {
+        "commit": commit,
+        "dirty": dirty,
+        "created": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "machine": machine(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    previous = previous_run(args.history, entry)
+
+    if not args.no_history:
+        with open(args.history, 'a') as file:
+            file.write(json.dumps(entry) + '\n')
+
+    if args.json:
+        print(json.dumps(entry, indent=2))
+    else:
+        print_results(entry, previous)
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
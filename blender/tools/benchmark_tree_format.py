@@ -0,0 +1,209 @@
+"""
+Compare the full and compact node tree formats:
+
+    python blender/tools/benchmark_tree_format.py [assets/shaders] [--repeat 200] [--json] [--write-compact test/compact-trees]
+
+For every full tree json (`*.compact.json` exports are skipped) reports bytes (as written, minified, compact, and gzipped), Python parse time
+(json.loads vs json.loads + compact_trees.expand) and, when `node` is on the PATH, the JS runtime's load time
+of both payloads: JSON.parse + expandNodeTree, as `realtime.ts` does for every tree. Every compact tree is checked to expand back to the original.
+`--write-compact` writes the compact trees as `<name>.compact.json`, the fixtures of `test/compact-tree.test.ts`.
+"""
+import argparse
+import glob
+import gzip
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ADDON_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'addon')
+REPOSITORY = os.path.dirname(os.path.dirname(ADDON_DIRECTORY))
+
+# expandNodeTree of plugins/nodeTrees/compactTree.ts without the types, keep the two in step
+NODE_BENCHMARK = '''
+const fs = require('fs');
+
+function unpackDict(packed, strings, nodeIds) {
+    const data = {};
+    for (let i = 0; i < packed.length; i += 2) {
+        let value = packed[i + 1];
+        if (packed[i] < 0) {
+            data[strings[-packed[i] - 1]] = strings[value];
+            continue;
+        }
+        const key = strings[packed[i]];
+        if (key === 'links' && nodeIds) {
+            value = value.map((link) => (Array.isArray(link) ? { node: nodeIds[link[0]], socket: strings[link[1]] } : link));
+        }
+        data[key] = value;
+    }
+    return data;
+}
+
+function unpackSockets(packed, strings, nodeIds) {
+    const sockets = {};
+    for (const [name, duplicated, ...values] of packed) {
+        const unpacked = values.map((socket) => unpackDict(socket, strings, nodeIds));
+        sockets[strings[name]] = duplicated ? unpacked : unpacked[0];
+    }
+    return sockets;
+}
+
+function expandTree(compact, strings) {
+    const nodeIds = compact.nodes.map((node) => strings[node[0]]);
+    const tree = {};
+    for (let i = 0; i < compact.meta.length; i += 2) {
+        const key = strings[compact.meta[i]];
+        if (key === '$internalTrees') {
+            const internalTrees = {};
+            for (let j = 0; j < compact.internalTrees.length; j += 2) {
+                internalTrees[strings[compact.internalTrees[j]]] = expandTree(compact.internalTrees[j + 1], strings);
+            }
+            tree[key] = internalTrees;
+        } else {
+            tree[key] = compact.meta[i + 1];
+        }
+    }
+    for (const [id, type, name, properties, inputs, outputs, rest] of compact.nodes) {
+        const node = {
+            id: strings[id],
+            type: strings[type],
+            name: strings[name],
+            inputs: unpackSockets(inputs, strings, nodeIds),
+            outputs: unpackSockets(outputs, strings, nodeIds),
+            properties: unpackDict(properties, strings),
+            ...unpackDict(rest, strings),
+        };
+        tree[node.id] = node;
+    }
+    return tree;
+}
+
+function expandNodeTree(data) {
+    if (!(typeof data === 'object' && data !== null && data.$format === 'sprixle.compactTree')) return data;
+    return expandTree(data.tree, data.strings);
+}
+
+const [repeat, ...files] = process.argv.slice(1);
+const results = {};
+for (const file of files) {
+    const text = fs.readFileSync(file, 'utf8');
+    for (let i = 0; i < 20; i++) expandNodeTree(JSON.parse(text));
+    const start = process.hrtime.bigint();
+    for (let i = 0; i < Number(repeat); i++) expandNodeTree(JSON.parse(text));
+    results[file] = Number(process.hrtime.bigint() - start) / 1e6 / Number(repeat);
+}
+console.log(JSON.stringify(results));
+'''
+
+def load_compact_trees():
+    # compact_trees doesn't need bpy, load it without importing the addon package
+    spec = importlib.util.spec_from_file_location('compact_trees', os.path.join(ADDON_DIRECTORY, 'compact_trees.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def time_ms(function, repeat):
+    function()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+def node_load_ms(paths, repeat):
+    if not shutil.which('node'):
+        return None
+
+    process = subprocess.run(['node', '-e', NODE_BENCHMARK, str(repeat)] + paths, capture_output=True, text=True)
+    if process.returncode != 0:
+        print('[Sprixle.Benchmark] node failed', process.stderr)
+        return None
+
+    return json.loads(process.stdout)
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='full vs compact node tree format')
+    parser.add_argument('directory', nargs='?', default=os.path.join(REPOSITORY, 'assets', 'shaders'))
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--json', action='store_true', help='print results as json')
+    parser.add_argument('--write-compact', metavar='DIRECTORY', help='write every compact tree to this directory')
+    args = parser.parse_args(argv)
+
+    compact_trees = load_compact_trees()
+    paths = sorted(path for path in glob.glob(os.path.join(args.directory, '*.json')) if not path.endswith('.compact.json'))
+    if not paths:
+        print('[Sprixle.Benchmark] no json files in', args.directory)
+        return 1
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for path in paths:
+            with open(path) as file:
+                written = file.read()
+            tree = json.loads(written)
+            tree.pop('hash', None)
+
+            minified = json.dumps(tree, separators=(',', ':'))
+            compact = json.dumps(compact_trees.compact(tree), separators=(',', ':'))
+            if compact_trees.expand(json.loads(compact)) != tree:
+                print('[Sprixle.Benchmark] compact round trip differs for', path)
+                return 1
+            if args.write_compact:
+                os.makedirs(args.write_compact, exist_ok=True)
+                with open(os.path.join(args.write_compact, os.path.splitext(os.path.basename(path))[0] + '.compact.json'), 'w') as file:
+                    file.write(compact + '\n')
+
+            full_path = os.path.join(directory, 'full-' + os.path.basename(path))
+            compact_path = os.path.join(directory, 'compact-' + os.path.basename(path))
+            for (temp_path, text) in ((full_path, written), (compact_path, compact)):
+                with open(temp_path, 'w') as file:
+                    file.write(text)
+
+            results.append({
+                "file": os.path.basename(path),
+                "bytes": {
+                    "full": len(written.encode('utf-8')),
+                    "full_minified": len(minified.encode('utf-8')),
+                    "compact": len(compact.encode('utf-8')),
+                    "full_gzip": len(gzip.compress(written.encode('utf-8'))),
+                    "compact_gzip": len(gzip.compress(compact.encode('utf-8'))),
+                },
+                "python_parse_ms": {
+                    "full": time_ms(lambda: json.loads(written), args.repeat),
+                    "compact_expand": time_ms(lambda: compact_trees.expand(json.loads(compact)), args.repeat),
+                },
+                "paths": (full_path, compact_path),
+            })
+
+        node = node_load_ms([path for result in results for path in result['paths']], args.repeat)
+
+    for result in results:
+        (full_path, compact_path) = result.pop('paths')
+        if node:
+            result['node_load_ms'] = {"full": node[full_path], "compact_expand": node[compact_path]}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{'file':<28}{'full':>9}{'minified':>10}{'compact':>9}{'gz full':>9}{'gz cmp':>8}{'py full':>9}{'py cmp+exp':>11}{'js full':>9}{'js cmp+exp':>11}")
+    for result in results:
+        sizes = result['bytes']
+        python = result['python_parse_ms']
+        js = result.get('node_load_ms', {})
+        print(f"{result['file']:<28}{sizes['full']:>9}{sizes['full_minified']:>10}{sizes['compact']:>9}{sizes['full_gzip']:>9}{sizes['compact_gzip']:>8}"
+            f"{python['full']:>9.3f}{python['compact_expand']:>11.3f}"
+            + (f"{js['full']:>9.3f}{js['compact_expand']:>11.3f}" if js else ''))
+
+    total = {key: sum(result['bytes'][key] for result in results) for key in results[0]['bytes']}
+    print(f"[Sprixle.Benchmark] compact is {total['compact'] / total['full']:.0%} of the written size, "
+        f"{total['compact'] / total['full_minified']:.0%} of minified, {total['compact_gzip'] / total['full_gzip']:.0%} gzipped (times in ms)")
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
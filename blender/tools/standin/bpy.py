@@ -0,0 +1,278 @@
+"""
+Minimal stand-in for Blender's `bpy`, enough for the addon's serializers (`node_trees`, `serializers`,
+`animation_clips`) to run outside Blender. Objects are plain Python built by `snapshots.py`, RNA
+reflection is emulated with `RNAStruct` / `RNAProperty` derived from the attributes of each struct.
+
+Only used by the benchmarks in `blender/tools`, it doesn't try to behave like Blender beyond that.
+"""
+import bisect
+import os
+import types as _types
+from mathutils import Vector
+
+class bpy_prop_array(list):
+    """Float / int array property values (colors), named like Blender's so `node_trees.is_struct` treats them the same"""
+
+class RNAProperty:
+    def __init__(self, identifier, type, is_array=False, is_enum_flag=False):
+        self.identifier = identifier
+        self.type = type
+        self.is_array = is_array
+        self.is_enum_flag = is_enum_flag
+
+class PropertyCollection(list):
+    def keys(self):
+        return [prop.identifier for prop in self]
+
+class RNAStruct:
+    def __init__(self, identifier, properties):
+        self.identifier = identifier
+        self.properties = PropertyCollection(properties)
+
+def property_type(value):
+    if isinstance(value, bool):
+        return 'BOOLEAN'
+    if isinstance(value, int):
+        return 'INT'
+    if isinstance(value, float):
+        return 'FLOAT'
+    if isinstance(value, str):
+        return 'STRING'
+    if isinstance(value, (list, tuple)) and not isinstance(value, bpy_prop_array):
+        return 'COLLECTION'
+    return 'POINTER'
+
+def rna_from_attributes(identifier, attributes, base=()):
+    """RNA description of a struct from its attribute values, base properties first"""
+    properties = [RNAProperty(name, 'POINTER') for name in base]
+    properties.extend(RNAProperty(name, property_type(value), is_array=isinstance(value, bpy_prop_array)) for name, value in attributes.items() if name not in base)
+    return RNAStruct(identifier, properties)
+
+# Types
+#################################################
+
+class bpy_struct:
+    bl_rna = RNAStruct('Struct', [RNAProperty('rna_type', 'POINTER')])
+
+    def as_pointer(self):
+        return id(self)
+
+class ID(bpy_struct):
+    def __init__(self, name):
+        self.name = name
+
+    @property
+    def original(self):
+        return self
+
+class Object(ID):
+    def __init__(self, name, modifiers=()):
+        super().__init__(name)
+        self.modifiers = list(modifiers)
+        self.material_slots = []
+
+class Material(ID):
+    def __init__(self, name, node_tree=None):
+        super().__init__(name)
+        self.node_tree = node_tree
+
+class World(ID):
+    def __init__(self, name, node_tree=None):
+        super().__init__(name)
+        self.node_tree = node_tree
+
+class Scene(ID):
+    def __init__(self, name, compositing_node_group=None):
+        super().__init__(name)
+        self.compositing_node_group = compositing_node_group
+
+class NodeTree(ID):
+    def __init__(self, name, nodes=()):
+        super().__init__(name)
+        self.nodes = list(nodes)
+        self.animation_data = None
+
+class Action(ID):
+    def __init__(self, name, frame_range, slots, channelbags):
+        super().__init__(name)
+        self.frame_range = Vector(frame_range)
+        self.slots = list(slots)
+        self.layers = [Layer([Strip(channelbags)])]
+
+NODE_BASE_PROPERTIES = (
+    'rna_type', 'type', 'location', 'location_absolute', 'width', 'height', 'dimensions', 'name', 'label',
+    'inputs', 'outputs', 'internal_links', 'parent', 'warning_propagation', 'use_custom_color', 'color',
+    'color_tag', 'select', 'show_options', 'show_preview', 'hide', 'mute', 'show_texture', 'bl_idname',
+    'bl_label', 'bl_description', 'bl_icon', 'bl_static_type', 'bl_width_default', 'bl_width_min',
+    'bl_width_max', 'bl_height_default', 'bl_height_min', 'bl_height_max',
+)
+
+class Node(bpy_struct):
+    bl_rna = RNAStruct('Node', [RNAProperty(name, 'POINTER') for name in NODE_BASE_PROPERTIES])
+
+    def __init__(self, name, type, properties=None, mute=False):
+        self.name = name
+        self.type = type
+        self.mute = mute
+        self.label = ''
+        self.inputs = []
+        self.outputs = []
+        self.node_tree = None
+        self.image = None
+        self.color_ramp = None
+        for attribute, value in (properties or {}).items():
+            setattr(self, attribute, value)
+        self.bl_rna = rna_from_attributes('Node' + type.title().replace('_', ''), properties or {}, NODE_BASE_PROPERTIES)
+
+class NodeSocket(bpy_struct):
+    def __init__(self, node, name, type, default_value=None, hide_value=False, label=''):
+        self.node = node
+        self.name = name
+        self.type = type
+        self.default_value = default_value
+        self.hide_value = hide_value
+        self.label = label
+        self.enabled = True
+        self.is_unavailable = False
+        self.links = []
+
+    @property
+    def is_linked(self):
+        return bool(self.links)
+
+class NodeLink(bpy_struct):
+    def __init__(self, from_socket, to_socket):
+        self.from_node = from_socket.node
+        self.from_socket = from_socket
+        self.to_node = to_socket.node
+        self.to_socket = to_socket
+
+class Image(ID):
+    def __init__(self, name, filepath):
+        super().__init__(name)
+        self.filepath = filepath
+
+    def save(self):
+        pass
+
+class ColorRamp(bpy_struct):
+    def __init__(self, elements, color_mode='RGB', interpolation='LINEAR', hue_interpolation='NEAR'):
+        self.elements = elements
+        self.color_mode = color_mode
+        self.interpolation = interpolation
+        self.hue_interpolation = hue_interpolation
+
+class ColorRampElement(bpy_struct):
+    def __init__(self, position, color):
+        self.position = position
+        self.color = bpy_prop_array(color)
+
+class Modifier(bpy_struct):
+    def __init__(self, type, node_group=None):
+        self.type = type
+        self.node_group = node_group
+
+class Layer(bpy_struct):
+    def __init__(self, strips):
+        self.strips = strips
+
+class Strip(bpy_struct):
+    def __init__(self, channelbags):
+        # slot name -> Channelbag
+        self.channelbags = channelbags
+
+    def channelbag(self, slot):
+        return self.channelbags.get(slot.name_display)
+
+class Slot(bpy_struct):
+    def __init__(self, name_display, select=False):
+        self.name_display = name_display
+        self.select = select
+
+    def users(self):
+        return []
+
+class Channelbag(bpy_struct):
+    def __init__(self, slot, fcurves):
+        self.slot = slot
+        self.fcurves = fcurves
+
+class ActionGroup(bpy_struct):
+    def __init__(self, name):
+        self.name = name
+
+class Keyframe(bpy_struct):
+    def __init__(self, frame, value, interpolation='BEZIER', easing='AUTO', handle_left=None, handle_right=None,
+            handle_left_type='AUTO_CLAMPED', handle_right_type='AUTO_CLAMPED', back=1.70158, amplitude=0.0, period=0.0):
+        self.co = Vector((frame, value))
+        self.handle_left = Vector(handle_left or (frame - 1, value))
+        self.handle_right = Vector(handle_right or (frame + 1, value))
+        self.interpolation = interpolation
+        self.easing = easing
+        self.handle_left_type = handle_left_type
+        self.handle_right_type = handle_right_type
+        self.back = back
+        self.amplitude = amplitude
+        self.period = period
+
+class KeyframePoints(list):
+    def foreach_get(self, attribute, output):
+        values = []
+        for keyframe in self:
+            value = getattr(keyframe, attribute)
+            if isinstance(value, (list, tuple)):
+                values.extend(value)
+            else:
+                values.append(value)
+        output[:] = values
+
+class FCurve(bpy_struct):
+    def __init__(self, action, data_path, array_index, keyframes, extrapolation='CONSTANT', group=None):
+        self.id_data = action
+        self.data_path = data_path
+        self.array_index = array_index
+        self.keyframe_points = KeyframePoints(keyframes)
+        self.extrapolation = extrapolation
+        self.group = ActionGroup(group) if group else None
+        self.modifiers = []
+        self.frames = [keyframe.co[0] for keyframe in keyframes]
+
+    def evaluate(self, frame):
+        """Linear between keyframes, the stand-in only needs the per-call cost of Blender's evaluate"""
+        keyframes = self.keyframe_points
+        index = bisect.bisect_right(self.frames, frame)
+        if index == 0:
+            return keyframes[0].co[1]
+        if index >= len(keyframes):
+            return keyframes[-1].co[1]
+
+        (left, right) = (keyframes[index - 1].co, keyframes[index].co)
+        return left[1] + (right[1] - left[1]) * (frame - left[0]) / (right[0] - left[0])
+
+class Struct(bpy_struct):
+    """Generic RNA struct (view layers, AOVs, ...) with its RNA derived from its attributes"""
+
+    def __init__(self, identifier, attributes):
+        for name, value in attributes.items():
+            setattr(self, name, value)
+        self.bl_rna = rna_from_attributes(identifier, attributes, ('rna_type',))
+
+types = _types.SimpleNamespace(
+    bpy_struct=bpy_struct, ID=ID, Object=Object, Material=Material, World=World, Scene=Scene,
+    NodeTree=NodeTree, Node=Node, NodeSocket=NodeSocket, Action=Action, Image=Image,
+)
+
+# Modules
+#################################################
+
+data = _types.SimpleNamespace(filepath='', actions=[], materials=[], objects=[], scenes=[])
+# what `//` resolves to while data.filepath is empty (an unsaved file)
+blend_directory = os.getcwd()
+app = _types.SimpleNamespace(version=(4, 4, 0), version_string='4.4.0 (stand-in)', background=True)
+
+def abspath(path):
+    if path.startswith('//'):
+        return os.path.join(os.path.dirname(data.filepath) or blend_directory, path[2:])
+    return path
+
+path = _types.SimpleNamespace(abspath=abspath)
@@ -0,0 +1,7 @@
+"""Stand-in for Blender's `mathutils`, see `bpy.py` in this directory"""
+
+class Vector(list):
+    pass
+
+class Euler(list):
+    pass
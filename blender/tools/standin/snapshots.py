@@ -0,0 +1,242 @@
+"""
+Stand-in Blender data for the serializer benchmarks, rebuilt from the addon's own output (tree json,
+serialized actions and view layers written by an export are the recorded snapshots) or generated.
+"""
+import glob
+import json
+import os
+import random
+import bpy
+from mathutils import Vector
+
+# node properties the serializer derives from sockets / sub-structs rather than reading them as attributes
+DERIVED_PROPERTIES = {'drivers', 'vector_space', 'containsNodeTree', 'image'}
+DERIVED_BY_TYPE = {
+    'VALUE': {'value'},
+    'RGB': {'color'},
+    'VALTORGB': {'elements', 'color_mode', 'interpolation', 'hue_interpolation'},
+}
+
+# Node trees
+#################################################
+
+def socket_type(value):
+    socket_type = value.get('intended_type', value['type']) if value.get('type') == 'linked' else value['type']
+    return 'VECTOR' if socket_type.startswith('VECTOR') else socket_type
+
+def socket_value(socket_type, value, size=3):
+    """Default value as Blender holds it, array sockets written as null get zeros of their size"""
+    if socket_type == 'VECTOR':
+        return Vector(value if isinstance(value, list) else [0.0] * size)
+    if socket_type == 'RGBA':
+        return bpy.bpy_prop_array(value if isinstance(value, list) else [0.0, 0.0, 0.0, 1.0])
+    return value
+
+def add_sockets(node, sockets, serialized):
+    """Sockets of a serialized inputs / outputs dict (duplicated names are lists), returns their links"""
+    links = []
+    for (name, values) in serialized.items():
+        for value in (values if isinstance(values, list) else [values]):
+            kind = socket_type(value)
+            default = value.get('default_value') if value.get('type') == 'linked' else value.get('value')
+            size = int((value.get('intended_type') or value['type'])[len('VECTOR'):] or 3) if kind == 'VECTOR' else 3
+            socket = bpy.NodeSocket(node, name, kind, socket_value(kind, default, size), value.get('input_hidden', False), value.get('label', ''))
+            sockets.append(socket)
+            if value.get('type') == 'linked':
+                links.append((socket, value['links']))
+    return links
+
+def node_tree_from_json(name, tree, internal_trees=None, groups=None):
+    """NodeTree rebuilt from serialized tree json (group trees from `$internalTrees`)"""
+    internal_trees = tree.get('$internalTrees', {}) if internal_trees is None else internal_trees
+    groups = {} if groups is None else groups
+
+    node_tree = bpy.NodeTree(name)
+    nodes = {}
+    input_links = []
+    for (id, data) in tree.items():
+        if id.startswith('$') or not isinstance(data, dict) or 'type' not in data: continue
+
+        derived = DERIVED_PROPERTIES | DERIVED_BY_TYPE.get(data['type'], set())
+        node = bpy.Node(id, data['type'], {key: value for key, value in data['properties'].items() if key not in derived})
+
+        if data['type'] == 'VALTORGB':
+            properties = data['properties']
+            elements = [bpy.ColorRampElement(element['position'], element['color']) for element in properties.get('elements', [])]
+            node.color_ramp = bpy.ColorRamp(elements, properties.get('color_mode', 'RGB'), properties.get('interpolation', 'LINEAR'), properties.get('hue_interpolation', 'NEAR'))
+        if 'image' in data['properties']:
+            node.image = bpy.Image(data['properties']['image'], '//textures/' + data['properties']['image'])
+
+        group_name = data.get('internalNodeTree')
+        if data['type'] == 'GROUP' and group_name in internal_trees:
+            if group_name not in groups:
+                groups[group_name] = None
+                groups[group_name] = node_tree_from_json(group_name, internal_trees[group_name], internal_trees, groups)
+            node.node_tree = groups[group_name]
+
+        input_links.extend(add_sockets(node, node.inputs, data['inputs']))
+        add_sockets(node, node.outputs, data['outputs'])
+        nodes[id] = node
+
+    for (socket, links) in input_links:
+        for link in links:
+            from_node = nodes.get(link['node'])
+            if from_node is None: continue
+
+            from_socket = next((output for output in from_node.outputs if output.name == link['socket']), None)
+            if from_socket is None:
+                from_socket = bpy.NodeSocket(from_node, link['socket'], socket.type)
+                from_node.outputs.append(from_socket)
+
+            node_link = bpy.NodeLink(from_socket, socket)
+            socket.links.append(node_link)
+            from_socket.links.append(node_link)
+
+    node_tree.nodes = list(nodes.values())
+    return node_tree
+
+def load_trees(directory):
+    """[(name, tree json)] of every full format tree json in directory"""
+    trees = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+        if path.endswith('.compact.json'): continue
+        with open(path) as file:
+            tree = json.load(file)
+        tree.pop('hash', None)
+        trees.append((os.path.splitext(os.path.basename(path))[0], tree))
+    return trees
+
+def material(name, node_tree):
+    return bpy.Material(name, node_tree)
+
+def logic_object(name, node_tree):
+    if '+logic' not in node_tree.name:
+        node_tree.name += '+logic'
+    return bpy.Object(name, [bpy.Modifier('NODES', node_tree)])
+
+SYNTHETIC_NODES = {
+    # type: (properties, [(input name, socket type, default)], [(output name, socket type)])
+    'MATH': ({"operation": 'ADD', "use_clamp": False}, [('Value', 'VALUE', 0.5), ('Value', 'VALUE', 0.5), ('Value', 'VALUE', 0.5)], [('Value', 'VALUE')]),
+    'VECT_MATH': ({"operation": 'ADD'}, [('Vector', 'VECTOR', (0.0, 0.0, 0.0)), ('Vector', 'VECTOR', (0.0, 0.0, 0.0)), ('Scale', 'VALUE', 1.0)], [('Vector', 'VECTOR'), ('Value', 'VALUE')]),
+    'MIX': ({"data_type": 'RGBA', "blend_type": 'MIX', "clamp_factor": True, "clamp_result": False}, [('Factor', 'VALUE', 0.5), ('A', 'RGBA', (0.5, 0.5, 0.5, 1.0)), ('B', 'RGBA', (0.5, 0.5, 0.5, 1.0))], [('Result', 'RGBA')]),
+    'VALUE': ({}, [], [('Value', 'VALUE')]),
+    'RGB': ({}, [], [('Color', 'RGBA')]),
+}
+SYNTHETIC_WEIGHTS = {'MATH': 5, 'VECT_MATH': 2, 'MIX': 3, 'VALUE': 1, 'RGB': 1}
+
+def synthetic_node_tree(count, seed=0, link_probability=0.7, window=64):
+    """Material tree of count nodes, inputs linked to compatible outputs of the previous `window` nodes"""
+    rng = random.Random(seed)
+    types = [type for type, weight in SYNTHETIC_WEIGHTS.items() for _ in range(weight)]
+
+    node_tree = bpy.NodeTree(f'synthetic-{count}')
+    nodes = []
+    for index in range(count - 1):
+        type = rng.choice(types) if index > 1 else 'VALUE'
+        (properties, inputs, outputs) = SYNTHETIC_NODES[type]
+        node = bpy.Node(f'{type.title()}.{index:05d}', type, dict(properties))
+
+        for (name, kind, default) in inputs:
+            socket = bpy.NodeSocket(node, name, kind, socket_value(kind, list(default) if isinstance(default, tuple) else default))
+            node.inputs.append(socket)
+            candidates = [output for other in nodes[-window:] for output in other.outputs if output.type == kind]
+            if candidates and rng.random() < link_probability:
+                from_socket = rng.choice(candidates)
+                link = bpy.NodeLink(from_socket, socket)
+                socket.links.append(link)
+                from_socket.links.append(link)
+
+        for (name, kind) in outputs:
+            default = 0.0 if kind == 'VALUE' else [0.0, 0.0, 0.0] if kind == 'VECTOR' else [0.0, 0.0, 0.0, 1.0]
+            node.outputs.append(bpy.NodeSocket(node, name, kind, socket_value(kind, default)))
+        nodes.append(node)
+
+    output = bpy.Node('Material Output', 'OUTPUT_MATERIAL', {"is_active_output": True, "target": 'ALL'})
+    surface = bpy.NodeSocket(output, 'Surface', 'SHADER')
+    output.inputs.append(surface)
+    from_socket = nodes[-1].outputs[0]
+    link = bpy.NodeLink(from_socket, surface)
+    surface.links.append(link)
+    from_socket.links.append(link)
+    nodes.append(output)
+
+    node_tree.nodes = nodes
+    return node_tree
+
+# Actions
+#################################################
+
+EXPORTED_INTERPOLATIONS = {'STEP': 'CONSTANT'}
+
+def action_from_json(data):
+    """Action rebuilt from `serialize_action_with_slots` output (keyframes and handles are enough)"""
+    action = bpy.Action(data['name'], data['frame_range'], [], {})
+    channelbags = action.layers[0].strips[0].channelbags
+    for (slot_name, slot_data) in data['slots'].items():
+        slot = bpy.Slot(slot_name, slot_data.get('is_selected', False))
+        action.slots.append(slot)
+
+        fcurves = []
+        for fcurve in slot_data.get('strip', {}).get('fcurves', []):
+            keyframes = [
+                bpy.Keyframe(
+                    key['frame'], key['value'],
+                    key.get('easing_interpolation', EXPORTED_INTERPOLATIONS.get(key['interpolation'], key['interpolation'])),
+                    key.get('easing', 'AUTO'), key.get('handle_left'), key.get('handle_right'),
+                    key.get('handle_left_type', 'AUTO_CLAMPED'), key.get('handle_right_type', 'AUTO_CLAMPED'),
+                    key.get('back', 1.70158), key.get('amplitude', 0.0), key.get('period', 0.0),
+                )
+                for key in fcurve['keyframes']
+            ]
+            fcurves.append(bpy.FCurve(action, fcurve['data_path'], fcurve['array_index'], keyframes, fcurve.get('extrapolation', 'CONSTANT'), fcurve.get('group')))
+        channelbags[slot_name] = bpy.Channelbag(slot, fcurves)
+
+    return action
+
+SYNTHETIC_PATHS = [('location', 3), ('rotation_euler', 3), ('scale', 3), ('["value"]', 1)]
+SYNTHETIC_INTERPOLATIONS = ['BEZIER'] * 6 + ['LINEAR'] * 2 + ['CONSTANT', 'SINE']
+
+def synthetic_action(keyframe_count, keys_per_curve=50, curves_per_slot=10, seed=0):
+    """Action with about keyframe_count keys over curves of keys_per_curve keys, curves_per_slot curves per slot"""
+    rng = random.Random(seed)
+    curve_count = max(1, keyframe_count // keys_per_curve)
+    frames = keys_per_curve * 4
+
+    action = bpy.Action(f'synthetic-{keyframe_count}', (1.0, float(frames)), [], {})
+    channelbags = action.layers[0].strips[0].channelbags
+    for start in range(0, curve_count, curves_per_slot):
+        slot = bpy.Slot(f'Object.{start // curves_per_slot:04d}')
+        action.slots.append(slot)
+
+        fcurves = []
+        for index in range(start, min(start + curves_per_slot, curve_count)):
+            (data_path, size) = SYNTHETIC_PATHS[index % len(SYNTHETIC_PATHS)]
+            keyframes = []
+            for key in range(keys_per_curve):
+                frame = 1.0 + key * (frames - 1) / max(keys_per_curve - 1, 1)
+                value = rng.uniform(-1, 1)
+                keyframes.append(bpy.Keyframe(frame, value, rng.choice(SYNTHETIC_INTERPOLATIONS), handle_left=(frame - 1.5, value), handle_right=(frame + 1.5, value)))
+            fcurves.append(bpy.FCurve(action, data_path, index % size, keyframes, group='Object Transforms'))
+        channelbags[slot.name_display] = bpy.Channelbag(slot, fcurves)
+
+    return action
+
+# View layers
+#################################################
+
+COLLECTION_ITEM_TYPES = {'aovs': 'AOV', 'lightgroups': 'Lightgroup'}
+
+def view_layer_from_json(data, identifier='ViewLayer'):
+    attributes = {}
+    for (name, value) in data.items():
+        if isinstance(value, list):
+            value = [view_layer_from_json(item, COLLECTION_ITEM_TYPES.get(name, 'Struct')) for item in value if isinstance(item, dict)]
+        attributes[name] = value
+    return bpy.Struct(identifier, attributes)
+
+def synthetic_view_layer(snapshot, aov_count):
+    """The snapshot view layer with aov_count AOVs and a quarter as many light groups"""
+    data = dict(snapshot)
+    data['aovs'] = [{"name": f'aov.{index:05d}', "is_valid": True, "type": 'COLOR' if index % 2 else 'VALUE'} for index in range(aov_count)]
+    data['lightgroups'] = [{"name": f'lightgroup.{index:05d}'} for index in range(aov_count // 4)]
+    return view_layer_from_json(data)
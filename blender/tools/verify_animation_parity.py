@@ -0,0 +1,43 @@
+"""
+Check that keys-only animation export reproduces Blender's curves:
+
+    blender -b [file.blend] --python blender/tools/verify_animation_parity.py -- [--tolerance 1e-4] [--samples-per-frame 10]
+
+Evaluates the exported keyframes of every action in the file, plus a generated action covering every
+interpolation / easing / extrapolation combination, with `animation_eval` and compares against
+`fcurve.evaluate`, as are the samples `animation_clips.sample_keyframes` takes in bulk. Exits non-zero when
+any curve is off by more than the tolerance.
+"""
+import argparse
+import os
+import sys
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='verify_animation_parity.py')
+    parser.add_argument('--tolerance', type=float, default=1e-4)
+    parser.add_argument('--samples-per-frame', type=float, default=10)
+    parser.add_argument('--skip-generated', action='store_true', help="only check the file's own actions")
+    args = parser.parse_args(argv)
+
+    # blender --python doesn't put the script's directory on the path
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import animation_parity as parity
+
+    generated = None if args.skip_generated else parity.build_test_action()
+    try:
+        (results, failures) = parity.verify_actions(tolerance=args.tolerance, samples_per_frame=args.samples_per_frame)
+    finally:
+        if generated:
+            parity.cleanup_test_action(*generated)
+
+    for result in failures:
+        print(f"[Sprixle.AnimationParity] FAIL {result['action']} {result['data_path']}[{result['array_index']}]"
+            f" error {result['max_error']:.6g} at frame {result['frame']:.3f} (blender {result['expected']:.6g}, export {result['actual']:.6g}),"
+            f" sampled error {result['sampled_max_error']:.6g} at frame {result['sampled_frame']}")
+
+    print(f'[Sprixle.AnimationParity] {len(results) - len(failures)}/{len(results)} curves within {args.tolerance}')
+
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []))
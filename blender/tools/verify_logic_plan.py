@@ -0,0 +1,133 @@
+"""
+Check `logic_plan.execution_plan` against small hand written logic trees, no Blender needed:
+
+    python blender/tools/verify_logic_plan.py
+
+Every instruction has to read only slots written by an earlier instruction, and each case lists the
+nodes it expects in the plan. Exits non-zero when a case fails.
+"""
+import importlib
+import os
+import sys
+import types
+
+ADDON_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'addon')
+# logic_plan doesn't need bpy, it is imported as this package without running its __init__
+ADDON_PACKAGE = 'sprixle_addon'
+
+def load_logic_plan():
+    package = types.ModuleType(ADDON_PACKAGE)
+    package.__path__ = [ADDON_DIRECTORY]
+    sys.modules.setdefault(ADDON_PACKAGE, package)
+    return importlib.import_module(f'{ADDON_PACKAGE}.logic_plan')
+
+def node(id, type='MATH', inputs=None, outputs=('Value',)):
+    """Serialized node, inputs as {socket: [source node id or (node id, socket), ...] or a constant}"""
+    return {
+        "id": id,
+        "type": type,
+        "inputs": {
+            name: {"type": 'linked', "links": [{"node": source, "socket": 'Value'} if isinstance(source, str) else {"node": source[0], "socket": source[1]} for source in value]}
+            if isinstance(value, list) else {"type": 'VALUE', "value": value}
+            for name, value in (inputs or {}).items()
+        },
+        "outputs": {name: {"type": 'linked'} for name in outputs},
+    }
+
+def tree(*nodes):
+    return {node['id']: node for node in nodes}
+
+CASES = {
+    'chain': (
+        tree(
+            node('A', inputs={"Value": 1.0}),
+            node('B', inputs={"Value": ['A']}),
+            node('Output', 'GROUP_OUTPUT', inputs={"Value": ['B']}, outputs=()),
+        ),
+        ['A', 'B', 'Output'],
+    ),
+    # a cycle feeding a chain: nothing downstream of the cycle can run
+    'cycle feeding a chain': (
+        tree(
+            node('A', inputs={"Value": ['B']}),
+            node('B', inputs={"Value": ['A']}),
+            node('C', inputs={"Value": ['B']}),
+            node('D', inputs={"Value": ['C']}),
+            node('Output', 'GROUP_OUTPUT', inputs={"Value": ['D']}, outputs=()),
+        ),
+        [],
+    ),
+    'cycle beside a chain': (
+        tree(
+            node('A', inputs={"Value": ['B']}),
+            node('B', inputs={"Value": ['A']}),
+            node('C', inputs={"Value": 2.0}),
+            node('D', inputs={"Value": ['C'], "Other": ['B']}),
+            node('E', inputs={"Value": ['C']}),
+            node('Output', 'GROUP_OUTPUT', inputs={"Value": ['E'], "Other": ['D']}, outputs=()),
+        ),
+        ['C', 'E'],
+    ),
+    # a trigger graph: the action on Exited doesn't feed the output but runs for its side effect
+    'action without outputs': (
+        tree(
+            node('Group Input', 'GROUP_INPUT', outputs=('Geometry',)),
+            node('Trigger', 'GROUP', inputs={"Trigger": [('Group Input', 'Geometry')]}, outputs=('Entered', 'Exited')),
+            node('Toggle', 'GROUP', inputs={"Trigger": [('Trigger', 'Entered')], "stateName": 'lock'}, outputs=('Next',)),
+            node('Set', 'GROUP', inputs={"Trigger": [('Trigger', 'Exited')], "stateName": 'exited lock'}, outputs=()),
+            node('Output', 'GROUP_OUTPUT', inputs={"Geometry": [('Toggle', 'Next')]}, outputs=()),
+        ),
+        ['Group Input', 'Trigger', 'Toggle', 'Set', 'Output'],
+    ),
+    # Unused's output is linked to a node that isn't serialized, nothing in the tree reads it
+    'unreachable': (
+        tree(
+            node('A', inputs={"Value": 1.0}),
+            node('Unused', inputs={"Value": ['A']}),
+            node('Output', 'GROUP_OUTPUT', inputs={"Value": ['A']}, outputs=()),
+        ),
+        ['A', 'Output'],
+    ),
+}
+
+def refs(input):
+    """Slots an instruction input reads"""
+    inputs = input if input and isinstance(input[0], list) else [input]
+    for (kind, value) in inputs:
+        if kind == 'slot':
+            yield value
+        elif kind == 'slots':
+            yield from value
+
+def check(logic_plan, tree, expected):
+    plan = logic_plan.execution_plan(tree)
+    errors = []
+
+    planned = [plan['nodes'][instruction['node']] for instruction in plan['instructions']]
+    if planned != expected:
+        errors.append(f'planned {planned}, expected {expected}')
+
+    written = set()
+    for instruction in plan['instructions']:
+        for input in instruction['inputs'].values():
+            unwritten = [slot for slot in refs(input) if slot not in written]
+            if unwritten:
+                errors.append(f"{plan['nodes'][instruction['node']]} reads unwritten slots {unwritten}")
+        written.update(instruction['outputs'].values())
+
+    return errors
+
+def main():
+    logic_plan = load_logic_plan()
+
+    failed = 0
+    for (name, (tree, expected)) in CASES.items():
+        errors = check(logic_plan, tree, expected)
+        failed += bool(errors)
+        print(f"[Sprixle.LogicPlan] {'FAIL' if errors else 'ok'} {name}" + ''.join(f'\n    {error}' for error in errors))
+
+    print(f'[Sprixle.LogicPlan] {len(CASES) - failed}/{len(CASES)} cases passed')
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Check that `mesh_optimize.optimize_glb` only reorders meshes, no Blender needed:
+
+    python blender/tools/verify_mesh_optimize.py
+
+Writes small GLBs with shuffled vertices, runs the optimizer on them and compares every triangle's
+attributes and morph target deltas before and after. Exits non-zero when a case fails.
+"""
+import importlib
+import os
+import sys
+import tempfile
+import types
+import numpy as np
+
+ADDON_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'addon')
+# mesh_optimize and glb only need numpy, they are imported as this package without running its __init__
+ADDON_PACKAGE = 'sprixle_addon'
+
+def load_addon_module(name):
+    package = types.ModuleType(ADDON_PACKAGE)
+    package.__path__ = [ADDON_DIRECTORY]
+    sys.modules.setdefault(ADDON_PACKAGE, package)
+    return importlib.import_module(f'{ADDON_PACKAGE}.{name}')
+
+def grid(size, seed=0):
+    """(positions, normals, indices) of a size x size vertex grid with shuffled vertex and triangle order"""
+    random = np.random.default_rng(seed)
+    (x, y) = np.meshgrid(np.arange(size, dtype=np.float32), np.arange(size, dtype=np.float32))
+    positions = np.stack([x.ravel(), y.ravel(), np.sin(x.ravel()) * 0.25], axis=1).astype(np.float32)
+    normals = np.tile(np.array([0, 0, 1], np.float32), (len(positions), 1))
+
+    quads = [(row * size + column, row * size + column + 1, (row + 1) * size + column + 1, (row + 1) * size + column)
+        for row in range(size - 1) for column in range(size - 1)]
+    triangles = np.array([triangle for (a, b, c, d) in quads for triangle in ((a, b, c), (a, c, d))], np.int64)
+
+    shuffle = random.permutation(len(positions))
+    inverse = np.argsort(shuffle)
+    triangles = inverse[triangles][random.permutation(len(triangles))]
+    return (positions[shuffle], normals[shuffle], triangles.astype(np.uint16))
+
+def build_glb(meshes):
+    """GLB bytes for [(attributes, indices, targets)], every mesh on its own node"""
+    gltf = {"asset": {"version": '2.0'}, "buffers": [{}], "bufferViews": [], "accessors": [], "meshes": [], "nodes": []}
+    binary = bytearray()
+
+    def accessor(data, target):
+        binary.extend(b'\x00' * (-len(binary) % 4))
+        gltf['bufferViews'].append({"buffer": 0, "byteOffset": len(binary), "byteLength": data.nbytes, "target": target})
+        binary.extend(data.tobytes())
+        entry = {
+            "bufferView": len(gltf['bufferViews']) - 1,
+            "componentType": 5123 if data.dtype == np.uint16 else 5126,
+            "count": len(data),
+            "type": 'SCALAR' if data.ndim == 1 else 'VEC3',
+        }
+        if data.dtype == np.float32:
+            entry['min'] = data.min(axis=0).tolist()
+            entry['max'] = data.max(axis=0).tolist()
+        gltf['accessors'].append(entry)
+        return len(gltf['accessors']) - 1
+
+    for (attributes, indices, targets) in meshes:
+        primitive = {
+            "attributes": {name: accessor(data, 34962) for name, data in attributes.items()},
+            "indices": accessor(indices.reshape(-1), 34963),
+        }
+        if targets:
+            primitive['targets'] = [{name: accessor(data, 34962) for name, data in target.items()} for target in targets]
+        gltf['meshes'].append({"name": f'mesh{len(gltf["meshes"])}', "primitives": [primitive]})
+        gltf['nodes'].append({"mesh": len(gltf['meshes']) - 1})
+
+    gltf['buffers'][0]['byteLength'] = len(binary)
+    return (gltf, bytes(binary))
+
+def read_values(glb, gltf, binary, index):
+    """Accessor values as floats, normalized (quantized) integers mapped back to [-1, 1] / [0, 1]"""
+    values = glb.read_accessor(gltf, binary, index)
+    if gltf['accessors'][index].get('normalized'):
+        return np.maximum(values / np.iinfo(values.dtype).max, -1.0)
+    return values.astype(np.float64)
+
+def triangle_data(glb, gltf, binary):
+    """Per mesh: sorted rows of every triangle's attribute and target values, rotated to start at the lowest row"""
+    meshes = []
+    for mesh in gltf['meshes']:
+        rows = []
+        for primitive in mesh['primitives']:
+            sources = [primitive['attributes'][name] for name in sorted(primitive['attributes'])]
+            sources += [target[name] for target in primitive.get('targets', []) for name in sorted(target)]
+            values = np.concatenate([read_values(glb, gltf, binary, index) for index in sources], axis=1)
+            for triangle in glb.read_accessor(gltf, binary, primitive['indices']).reshape(-1, 3):
+                corners = [tuple(np.round(values[index], 5)) for index in triangle]
+                start = corners.index(min(corners))
+                rows.append(tuple(corners[start:] + corners[:start]))
+        meshes.append(sorted(rows))
+    return meshes
+
+def check(glb, mesh_optimize, meshes, **options):
+    (gltf, binary) = build_glb(meshes)
+    expected = triangle_data(glb, gltf, binary)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'case.glb')
+        with open(path, 'wb') as file:
+            file.write(glb.write_glb(gltf, binary))
+        mesh_optimize.optimize_glb(path, **options)
+        (gltf, binary) = glb.read_glb(path)
+
+    actual = triangle_data(glb, gltf, binary)
+    return [f'mesh{index} triangles changed' for index, (before, after) in enumerate(zip(expected, actual)) if before != after]
+
+def shape_key(positions, seed):
+    random = np.random.default_rng(seed)
+    return {"POSITION": random.normal(0, 0.1, positions.shape).astype(np.float32)}
+
+def cases():
+    (positions, normals, indices) = grid(12)
+    (other_positions, other_normals, other_indices) = grid(9, seed=1)
+    return {
+        'reorder': ([({"POSITION": positions, "NORMAL": normals}, indices, [])], {}),
+        'shape keys': ([({"POSITION": positions, "NORMAL": normals}, indices, [shape_key(positions, 2), shape_key(positions, 3)])], {}),
+        'shape keys, quantize': (
+            [
+                ({"POSITION": positions, "NORMAL": normals}, indices, [shape_key(positions, 4)]),
+                ({"POSITION": other_positions, "NORMAL": other_normals}, other_indices, []),
+            ],
+            {"quantize": True},
+        ),
+    }
+
+def main():
+    glb = load_addon_module('glb')
+    mesh_optimize = load_addon_module('mesh_optimize')
+
+    failed = 0
+    all_cases = cases()
+    for (name, (meshes, options)) in all_cases.items():
+        errors = check(glb, mesh_optimize, meshes, **options)
+        failed += bool(errors)
+        print(f"[Sprixle.MeshOptimize] {'FAIL' if errors else 'ok'} {name}" + ''.join(f'\n    {error}' for error in errors))
+
+    print(f'[Sprixle.MeshOptimize] {len(all_cases) - failed}/{len(all_cases)} cases passed')
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+import { Node, NodeTree } from './createCompiler';
+
+/**
+ * node trees written by `blender/addon/compact_trees.py`: a string table with integer node indices,
+ * see that module for the layout
+ */
+export const COMPACT_TREE_FORMAT = 'sprixle.compactTree';
+export const COMPACT_TREE_VERSION = 2;
+
+type PackedDict = unknown[];
+type PackedSockets = [number, 0 | 1, ...PackedDict[]][];
+type CompactNode = [number, number, number, PackedDict, PackedSockets, PackedSockets, PackedDict];
+type CompactTreeData = {
+    nodes: CompactNode[];
+    meta: unknown[];
+    internalTrees: unknown[];
+};
+
+export type CompactTree = {
+    $format: typeof COMPACT_TREE_FORMAT;
+    version: number;
+    strings: string[];
+    tree: CompactTreeData;
+};
+
+export function isCompactTree(data: unknown): data is CompactTree {
+    return (
+        typeof data === 'object' &&
+        data !== null &&
+        (data as CompactTree).$format === COMPACT_TREE_FORMAT
+    );
+}
+
+function unpackDict(packed: PackedDict, strings: string[], nodeIds?: string[]) {
+    const data: Record<string, any> = {};
+    for (let i = 0; i < packed.length; i += 2) {
+        let value = packed[i + 1];
+
+        // a negative key marks a string index value
+        if ((packed[i] as number) < 0) {
+            data[strings[-(packed[i] as number) - 1]] = strings[value as number];
+            continue;
+        }
+
+        const key = strings[packed[i] as number];
+        if (key === 'links' && nodeIds) {
+            value = (value as unknown[]).map((link) =>
+                Array.isArray(link)
+                    ? { node: nodeIds[link[0]], socket: strings[link[1]] }
+                    : link
+            );
+        }
+
+        data[key] = value;
+    }
+    return data;
+}
+
+function unpackSockets(packed: PackedSockets, strings: string[], nodeIds: string[]) {
+    const sockets: Record<string, any> = {};
+    for (const [name, duplicated, ...values] of packed) {
+        const unpacked = values.map((socket) => unpackDict(socket, strings, nodeIds));
+        sockets[strings[name]] = duplicated ? unpacked : unpacked[0];
+    }
+    return sockets;
+}
+
+function expandTree(compact: CompactTreeData, strings: string[]): NodeTree {
+    const nodeIds = compact.nodes.map((node) => strings[node[0]]);
+    const tree: Record<string, unknown> = {};
+
+    for (let i = 0; i < compact.meta.length; i += 2) {
+        const key = strings[compact.meta[i] as number];
+        if (key === '$internalTrees') {
+            const internalTrees: Record<string, NodeTree> = {};
+            for (let j = 0; j < compact.internalTrees.length; j += 2) {
+                internalTrees[strings[compact.internalTrees[j] as number]] = expandTree(
+                    compact.internalTrees[j + 1] as CompactTreeData,
+                    strings
+                );
+            }
+            tree[key] = internalTrees;
+        } else {
+            tree[key] = compact.meta[i + 1];
+        }
+    }
+
+    for (const [id, type, name, properties, inputs, outputs, rest] of compact.nodes) {
+        const node = {
+            id: strings[id],
+            type: strings[type],
+            name: strings[name],
+            inputs: unpackSockets(inputs, strings, nodeIds),
+            outputs: unpackSockets(outputs, strings, nodeIds),
+            properties: unpackDict(properties, strings),
+            ...unpackDict(rest, strings),
+        } as Node;
+        tree[node.id] = node;
+    }
+
+    return tree as NodeTree;
+}
+
+/**
+ * full node tree from a compact one, full trees are returned as-is
+ */
+export function expandNodeTree(data: NodeTree | CompactTree): NodeTree {
+    if (!isCompactTree(data)) return data;
+
+    if (data.version !== COMPACT_TREE_VERSION) {
+        throw new Error(
+            `[compactTree] version ${data.version} is not supported (${COMPACT_TREE_VERSION}), export the tree again`
+        );
+    }
+
+    return expandTree(data.tree, data.strings);
+}
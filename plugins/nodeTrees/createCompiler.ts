@@ -198,6 +198,17 @@ export type NodeTree = {
     $internalTrees: {
         [key: string]: NodeTree;
     };
+    /** logic trees, see blender/addon/logic_plan.py */
+    $executionPlan?: unknown;
+    /** compositor trees, see blender/addon/compositor_passes.py */
+    $passes?: {
+        version: number;
+        regions: { nodes: string[]; inputs: [string, string][]; outputs: [string, string][] }[];
+        boundaries: { [node: string]: string };
+        order: (['region', number] | ['node', string])[];
+        passes_before: number;
+        passes_after: number;
+    };
 };
 
 export interface LogicTreeMethods {
@@ -0,0 +1,36 @@
+import assert from 'assert';
+import { expandNodeTree } from '../plugins/nodeTrees/compactTree';
+
+// compact-trees/ holds the assets/shaders trees in the compact format, regenerate them with
+// `python blender/tools/benchmark_tree_format.py assets/shaders --write-compact test/compact-trees`
+const compactTrees = require.context('./compact-trees', false, /\.compact\.json$/);
+
+for (const key of compactTrees.keys()) {
+    const name = key.replace(/^\.\//, '').replace(/\.compact\.json$/, '');
+    const full = { ...require(`../assets/shaders/${name}.json`) };
+    delete full.hash;
+
+    assert.deepStrictEqual(expandNodeTree(compactTrees(key)), full, `${name} expands to its full tree`);
+    console.log(`Test ${name} PASS: compact tree expands to assets/shaders/${name}.json`);
+}
+
+// --- numbers under string fields stay numbers, only negative keys mark string indices ---
+
+const strings = ['A', 'MATH', 'label', 'type', 'ADD', '$treeType'];
+const expanded = expandNodeTree({
+    $format: 'sprixle.compactTree',
+    version: 2,
+    strings,
+    tree: {
+        nodes: [[0, 1, 0, [2, 3, -4, 4], [], [], []]],
+        meta: [5, 'material'],
+        internalTrees: [],
+    },
+});
+assert.deepStrictEqual(expanded.A.properties, { label: 3, type: 'ADD' });
+console.log('Test string fields PASS: only tagged values are string indices');
+
+assert.throws(() => expandNodeTree({ $format: 'sprixle.compactTree', version: 1, strings: [], tree: { nodes: [], meta: [], internalTrees: [] } }));
+console.log('Test version PASS: version 1 trees are rejected');
+
+console.log('\nAll compact tree tests passed.');